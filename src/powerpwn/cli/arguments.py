@@ -5,7 +5,14 @@ from powerpwn.copilot.enums.copilot_scenario_enum import CopilotScenarioEnum
 from powerpwn.copilot.enums.verbose_enum import VerboseEnum
 from powerpwn.nocodemalware.enums.code_exec_type_enum import CodeExecTypeEnum
 from powerpwn.powerdoor.enums.action_type import BackdoorActionType
-from powerpwn.powerdump.utils.const import CACHE_PATH
+from powerpwn.powerdump.utils.const import (
+    CACHE_PATH,
+    DEFAULT_DUMP_WORKERS,
+    DEFAULT_DUMP_WORKERS_PER_CONNECTOR,
+    DEFAULT_DUMP_WORKERS_PER_HOST,
+    DEFAULT_RECON_WORKERS,
+)
+from powerpwn.powerdump.utils.entity_store import EntityStoreType
 
 
 def module_gui(sub_parser: argparse.ArgumentParser):
@@ -23,6 +30,26 @@ def module_dump(sub_parser: argparse.ArgumentParser):
     dump_parser.add_argument("-t", "--tenant", required=False, type=str, help="Tenant id to connect.")
     dump_parser.add_argument("-g", "--gui", action="store_true", help="Run local server for gui.")
     dump_parser.add_argument("-r", "--recon", action="store_true", help="Run recon before dump. Should be used if recon command was not run before.")
+    dump_parser.add_argument(
+        "--dump-workers",
+        default=DEFAULT_DUMP_WORKERS,
+        type=int,
+        help=f"Number of connections to dump concurrently. Default is {DEFAULT_DUMP_WORKERS}.",
+    )
+    dump_parser.add_argument(
+        "--dump-workers-per-connector",
+        default=DEFAULT_DUMP_WORKERS_PER_CONNECTOR,
+        type=int,
+        help=f"Number of connections of the same connector type to dump concurrently. Default is {DEFAULT_DUMP_WORKERS_PER_CONNECTOR}.",
+    )
+    dump_parser.add_argument(
+        "--dump-workers-per-host",
+        default=DEFAULT_DUMP_WORKERS_PER_HOST,
+        type=int,
+        help=f"Number of data stores of the same host, e.g a SQL server, to dump concurrently. Default is {DEFAULT_DUMP_WORKERS_PER_HOST}.",
+    )
+    recon_modules(dump_parser)
+    transport_modules(dump_parser)
 
 
 def module_recon(sub_parser: argparse.ArgumentParser):
@@ -31,6 +58,42 @@ def module_recon(sub_parser: argparse.ArgumentParser):
     dump_parser.add_argument("--cache-path", default=CACHE_PATH, help="Path to store collected resources and data.")
     dump_parser.add_argument("-t", "--tenant", required=False, type=str, help="Tenant id to connect.")
     dump_parser.add_argument("-g", "--gui", action="store_true", help="Run local server for gui.")
+    recon_modules(dump_parser)
+    transport_modules(dump_parser)
+
+
+def recon_modules(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--workers",
+        default=DEFAULT_RECON_WORKERS,
+        type=int,
+        help=f"Number of environments to collect concurrently. Default is {DEFAULT_RECON_WORKERS}.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch resources that changed since the last recon of the same cache path, and remove records of deleted resources.",
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="Resume an interrupted run, skipping environments, connections and records that were completed."
+    )
+    parser.add_argument(
+        "--store",
+        default=EntityStoreType.json,
+        type=EntityStoreType,
+        choices=list(EntityStoreType),
+        help="Store resources as a JSON file per resource, or in a single indexed SQLite database for large tenants. Default is json.",
+    )
+    parser.add_argument("--export-json", required=False, type=str, help="Export collected resources as a JSON file tree to this directory.")
+
+
+def transport_modules(parser: argparse.ArgumentParser):
+    parser.add_argument("--record-path", required=False, type=str, help="Record every HTTP response to this directory for later offline replay.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--replay-path", required=False, type=str, help="Serve HTTP responses recorded with --record-path, with no network access.")
+    group.add_argument(
+        "--redirect-url", required=False, type=str, help="Send all HTTP requests to this base url, e.g. a local powerpwn.powerdump.emulator server."
+    )
 
 
 def module_nocodemalware(command_subparsers: argparse.ArgumentParser):
@@ -24,18 +24,39 @@ from powerpwn.powerdoor.backdoor_flow import BackdoorFlow
 from powerpwn.powerdoor.enums.action_type import BackdoorActionType
 from powerpwn.powerdoor.flow_factory_installer import FlowFlowInstaller
 from powerpwn.powerdump.collect.data_collectors.data_collector import DataCollector
+from powerpwn.powerdump.collect.data_collectors.dump_concurrency import DumpConcurrency
 from powerpwn.powerdump.collect.resources_collectors.resources_collector import ResourcesCollector
 from powerpwn.powerdump.gui.gui import Gui
 from powerpwn.powerdump.utils.auth import Auth, acquire_token, acquire_token_from_cached_refresh_token, get_cached_tenant
+from powerpwn.powerdump.utils.checkpoint import Checkpoint
 from powerpwn.powerdump.utils.const import API_HUB_SCOPE, POWER_APPS_SCOPE
-from powerpwn.powerdump.utils.path_utils import collected_data_path, entities_path
+from powerpwn.powerdump.utils.entity_store import JsonEntityStore, SqliteEntityStore, export_entities, open_entity_store
+from powerpwn.powerdump.utils.path_utils import (
+    checkpoints_path,
+    collected_data_path,
+    dump_checkpoint_path,
+    entities_db_path,
+    entities_path,
+    http_cache_path,
+    manifests_path,
+    specs_path,
+)
+from powerpwn.powerdump.utils.requests_wrapper import TransportOptions
+from powerpwn.powerdump.utils.spec_store import SpecStore
 from powerpwn.powerpages.powerpages import PowerPages
 from powerpwn.powerphishing.app_installer import AppInstaller
 
 logger = logging.getLogger(LOGGER_NAME)
 
+OFFLINE_TOKEN = "offline"
+OFFLINE_TENANT = "offline"
+
 
 def __init_command_token(args, scope: str) -> Auth:
+    if getattr(args, "replay_path", None) or getattr(args, "redirect_url", None):
+        # offline runs never reach the real tenant, so no credentials are needed
+        return Auth(token=OFFLINE_TOKEN, tenant=args.tenant or OFFLINE_TENANT, scope=scope)
+
     if args.clear_cache:
         TokenCache().clear_token_cache()
         return acquire_token(scope=scope, tenant=args.tenant)
@@ -61,17 +82,38 @@ def _get_scoped_cache_path(args, tenant) -> str:
     return os.path.join(args.cache_path, tenant)
 
 
+def _get_transport_options(args) -> TransportOptions:
+    return TransportOptions(record_path=args.record_path, replay_path=args.replay_path, redirect_url=args.redirect_url)
+
+
 def run_recon_command(args) -> str:
     auth = __init_command_token(args, POWER_APPS_SCOPE)
 
     # cache
-    if args.clear_cache:
-        __clear_cache(os.path.join(args.cache_path, os.path.join(auth.tenant, "resources")))
-
     scoped_cache_path = _get_scoped_cache_path(args, auth.tenant)
-    entities_fetcher = ResourcesCollector(token=auth.token, cache_path=scoped_cache_path)
+    if args.clear_cache:
+        __clear_cache(entities_path(scoped_cache_path))
+        SqliteEntityStore(entities_db_path(scoped_cache_path)).clear()
+        __clear_cache(http_cache_path(scoped_cache_path))
+        __clear_cache(specs_path(scoped_cache_path))
+        __clear_cache(manifests_path(scoped_cache_path))
+        __clear_cache(checkpoints_path(scoped_cache_path))
+
+    entities_fetcher = ResourcesCollector(
+        token=auth.token,
+        cache_path=scoped_cache_path,
+        transport=_get_transport_options(args),
+        workers=args.workers,
+        incremental=args.incremental,
+        resume=args.resume,
+        store=args.store,
+    )
     entities_fetcher.collect_and_cache()
 
+    if args.export_json:
+        exported = export_entities(open_entity_store(scoped_cache_path), JsonEntityStore(args.export_json), SpecStore(scoped_cache_path))
+        logger.info(f"Exported {exported} resources to {args.export_json}")
+
     logger.info(f"Recon is completed for tenant {auth.tenant} in {entities_path(scoped_cache_path)}")
 
     return auth.tenant
@@ -111,11 +153,17 @@ def run_dump_command(args) -> str:
 
     auth = __init_command_token(args, API_HUB_SCOPE)
 
+    scoped_cache_path = _get_scoped_cache_path(args, auth.tenant)
     if args.clear_cache:
         __clear_cache(os.path.join(args.cache_path, os.path.join(auth.tenant, "data")))
+        Checkpoint(dump_checkpoint_path(scoped_cache_path)).clear()
 
-    scoped_cache_path = _get_scoped_cache_path(args, auth.tenant)
-    is_data_collected = DataCollector(token=auth.token, cache_path=scoped_cache_path).collect()
+    concurrency = DumpConcurrency(
+        workers=args.dump_workers, workers_per_connector=args.dump_workers_per_connector, workers_per_host=args.dump_workers_per_host
+    )
+    is_data_collected = DataCollector(
+        token=auth.token, cache_path=scoped_cache_path, transport=_get_transport_options(args), resume=args.resume, concurrency=concurrency
+    ).collect()
     if not is_data_collected:
         logger.info("No resources found to get data dump. Please make sure recon runs first or run dump command again with -r/--recon flag.")
     else:
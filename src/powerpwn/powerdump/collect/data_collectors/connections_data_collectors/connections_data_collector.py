@@ -1,63 +1,166 @@
-import base64
-import io
+import logging
 import os
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
-import PIL.Image as Image
 import requests
 
+from powerpwn.cli.const import LOGGER_NAME, TOOL_NAME
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors import API_NAME_TO_CONNECTOR_CLS
+from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors.connector_base import ConnectorBase
+from powerpwn.powerdump.collect.data_collectors.dump_concurrency import DumpConcurrency
 from powerpwn.powerdump.collect.data_collectors.enums.data_dump_source import DataDumpSource
+from powerpwn.powerdump.collect.data_collectors.enums.dump_priority import DATA_DUMP_TYPE_TO_PRIORITY
 from powerpwn.powerdump.collect.data_collectors.idata_collector import IDataCollector
-from powerpwn.powerdump.collect.models.data_dump_entity import DataDumpWithContext
-from powerpwn.powerdump.collect.models.data_store_entity import DataStoreWithContext
+from powerpwn.powerdump.collect.models.connection_entity import Connection
+from powerpwn.powerdump.collect.models.data_dump_entity import DataDumpDownload
+from powerpwn.powerdump.collect.models.data_record_entity import DataRecordWithContext
+from powerpwn.powerdump.utils.checkpoint import Checkpoint
+from powerpwn.powerdump.utils.concurrency import KeyedLimiter, capped_map
+from powerpwn.powerdump.utils.file_utils import atomic_open
 from powerpwn.powerdump.utils.model_loaders import get_connector, load_connections
 
+logger = logging.getLogger(LOGGER_NAME)
+
 
 class ConnectionsDataCollector(IDataCollector):
-    def __init__(self, cache_path: str) -> None:
+    def __init__(self, cache_path: str, checkpoint: Checkpoint, concurrency: DumpConcurrency = DumpConcurrency()) -> None:
+        """
+        Args:
+            cache_path (str): path of collected resources
+            checkpoint (Checkpoint): completed connections, data stores and records are recorded in it and skipped
+            concurrency (DumpConcurrency): number of connections to dump concurrently, overall, per connector type and per data store host
+        """
         self.__cache_path = cache_path
+        self.__checkpoint = checkpoint
+        self.__concurrency = concurrency
+        self.__host_limiter = KeyedLimiter(concurrency.workers_per_host)
 
     def collect(self, session: requests.Session, env_id: str, output_dir_path: str) -> None:
-        data_dumps: List[DataDumpWithContext] = []
         connections_dumps_root_dir = os.path.join(output_dir_path, DataDumpSource.connections.value)
+        connections = [
+            connection
+            for connection in load_connections(cache_path=self.__cache_path, env_id=env_id)
+            if connection.shareable
+            and connection.api_name in API_NAME_TO_CONNECTOR_CLS
+            and not self.__checkpoint.is_done(env_id, DataDumpSource.connections.value, connection.connection_id)
+        ]
 
-        for connection in load_connections(cache_path=self.__cache_path, env_id=env_id):
-            current_data_stores: List[DataStoreWithContext] = []
-            connection_id = connection.connection_id
-            api_name = connection.api_name
+        # set when the run is interrupted, running dumps stop between records instead of being waited for
+        stop = threading.Event()
 
-            connections_apis_dir = os.path.join(connections_dumps_root_dir, connection.api_name)
-            if not connection.shareable:
-                continue
-            if api_name in API_NAME_TO_CONNECTOR_CLS:
-                connection_dump_root_dir = os.path.join(connections_apis_dir, connection.connection_id)
+        def _collect_connection(connection: Connection) -> None:
+            self.__collect_connection(session, env_id, connection, connections_dumps_root_dir, stop)
+
+        # every connection is dumped to its own directory, so output paths do not depend on the order connections complete in
+        executor = ThreadPoolExecutor(max_workers=self.__concurrency.workers, thread_name_prefix=f"{TOOL_NAME}-dump")
+        dumped_connections = capped_map(
+            _collect_connection,
+            connections,
+            executor,
+            max_in_flight=self.__concurrency.workers,
+            key=lambda connection: connection.api_name,
+            max_per_key=self.__concurrency.workers_per_connector,
+            # connectors of small, high-value records, e.g secrets, are not held back by connectors of bulk records
+            key_priority=lambda api_name: API_NAME_TO_CONNECTOR_CLS[api_name].dump_priority(),
+        )
+        try:
+            for connection, _ in dumped_connections:
+                logger.debug(f"Dumped connection {connection.connection_id} of environment {env_id}.")
+        except BaseException:
+            # e.g KeyboardInterrupt, cancel connections that did not start and do not wait for a running dump to finish its records
+            stop.set()
+            dumped_connections.close()
+            executor.shutdown(wait=False)
+            raise
+        executor.shutdown(wait=True)
 
-                connector_cls = API_NAME_TO_CONNECTOR_CLS[api_name]
-                spec = get_connector(self.__cache_path, connection.environment_id, connector_cls.api_name())
+    def __collect_connection(
+        self, session: requests.Session, env_id: str, connection: Connection, connections_dumps_root_dir: str, stop: threading.Event
+    ) -> None:
+        connection_id = connection.connection_id
+        connection_unit = (env_id, DataDumpSource.connections.value, connection_id)
+        connection_dump_root_dir = os.path.join(connections_dumps_root_dir, connection.api_name, connection_id)
 
-                connector_cls_instance = connector_cls(session=session, spec=spec, connection_id=connection_id)
-                current_data_stores = connector_cls_instance.ping(connection_parameters=connection.connection_parameters)
+        connector_cls = API_NAME_TO_CONNECTOR_CLS[connection.api_name]
+        spec = get_connector(self.__cache_path, connection.environment_id, connector_cls.api_name())
+
+        connector_cls_instance = connector_cls(session=session, spec=spec, connection_id=connection_id)
+        current_data_stores = connector_cls_instance.ping(connection_parameters=connection.connection_parameters)
+
+        for data_store in current_data_stores:
+            if stop.is_set():
+                return
+            data_store_unit = connection_unit + (str(data_store.data_store.host), data_store.data_store.name or "")
+            if self.__checkpoint.is_done(*data_store_unit):
+                continue
+            # data stores of different connections may live on the same server, which is not loaded with more than a few dumps at a time
+            with self.__host_limiter.hold(data_store.data_store.host.host):
+                data_records = connector_cls_instance.enum(data_store=data_store)
+                # records of a unit, e.g an email and its attachments, are dumped together so they can share what they fetch
+                dump_units: Dict[Tuple[str, str], List[DataRecordWithContext]] = dict()
+                for data_record in data_records:
+                    dump_units.setdefault(connector_cls.dump_unit(data_record), []).append(data_record)
 
-                for data_store in current_data_stores:
-                    data_records = connector_cls_instance.enum(data_store=data_store)
-                    for data_record in data_records:
+                prioritized_dump_units = sorted(
+                    dump_units.items(),
+                    key=lambda dump_unit: min(DATA_DUMP_TYPE_TO_PRIORITY[record.data_record.record_type] for record in dump_unit[1]),
+                )
+
+                def _dump_unit(dump_unit: Tuple[Tuple[str, str], List[DataRecordWithContext]]) -> None:
+                    unit_key, unit_records = dump_unit
+                    record_unit = data_store_unit + unit_key
+                    if self.__checkpoint.is_done(*record_unit):
+                        return
+                    for data_record in unit_records:
+                        if stop.is_set():
+                            return
                         data_dump_type_dir = os.path.join(connection_dump_root_dir, data_record.data_record.record_type)
-                        os.makedirs(data_dump_type_dir, exist_ok=True)
-                        data_dump = connector_cls_instance.dump(data_record=data_record)
-                        data_dump_path = os.path.join(data_dump_type_dir, f"{data_record.data_record.record_name}.{data_dump.data_dump.extension}")
-                        encoding = data_dump.data_dump.encoding
-                        extension = data_dump.data_dump.extension
-                        content = data_dump.data_dump.content
-                        if extension == "png":
-                            self.__dump_png(content, data_dump_path)
-                        else:
-                            with open(data_dump_path, "w") as f:
-                                content = content.decode(encoding) if encoding else content
-                                f.write(content)
-                        data_dumps.append(data_dump)
-
-    def __dump_png(self, bytes: bytes, path: str) -> None:
-        image_bytes = base64.b64decode(bytes)
-        img = Image.open(io.BytesIO(image_bytes))
-        img.save(path)
+                        if not self.__dump_record(connector_cls_instance, data_record, data_dump_type_dir, stop):
+                            return
+                    self.__checkpoint.mark_done(*record_unit)
+
+                if (record_workers := connector_cls.record_workers()) > 1:
+                    with ThreadPoolExecutor(max_workers=record_workers, thread_name_prefix=f"{TOOL_NAME}-records") as executor:
+                        # raise the first failure, units that were dumped are already marked done
+                        list(executor.map(_dump_unit, prioritized_dump_units))
+                else:
+                    for dump_unit in prioritized_dump_units:
+                        _dump_unit(dump_unit)
+            if stop.is_set():
+                # units that were not dumped are left for the next run
+                return
+            self.__checkpoint.mark_done(*data_store_unit)
+        self.__checkpoint.mark_done(*connection_unit)
+
+    def __dump_record(self, connector: ConnectorBase, data_record: DataRecordWithContext, data_dump_type_dir: str, stop: threading.Event) -> bool:
+        """
+        Returns:
+            bool: whether the record was dumped, False if its download stopped between ranges
+        """
+        # dumps are written atomically, an interrupted run never leaves a half-written record behind
+        data_dump_stream = connector.dump_stream(data_record=data_record)
+        if isinstance(data_dump_stream, DataDumpDownload):
+            # the download writes its own partial file, which is kept to resume from if the run is interrupted
+            return data_dump_stream.download(self.__data_dump_path(data_record, data_dump_type_dir, data_dump_stream.extension), stop)
+        if data_dump_stream is not None:
+            # chunks are written as they are fetched, so memory use does not grow with the size of the record
+            with atomic_open(self.__data_dump_path(data_record, data_dump_type_dir, data_dump_stream.extension), "wb") as f:
+                for chunk in data_dump_stream.chunks:
+                    f.write(chunk)
+            return True
+
+        data_dump = connector.dump(data_record=data_record)
+        # text dumps are already encoded and binary dumps are raw bytes, so both are written as is
+        with atomic_open(self.__data_dump_path(data_record, data_dump_type_dir, data_dump.data_dump.extension), "wb") as f:
+            f.write(data_dump.data_dump.content)
+        return True
+
+    @staticmethod
+    def __data_dump_path(data_record: DataRecordWithContext, data_dump_type_dir: str, extension: str) -> str:
+        # record names of file based connectors are absolute paths, keep them under the dump directory
+        record_name = data_record.data_record.record_name.lstrip("/")
+        data_dump_path = os.path.join(data_dump_type_dir, f"{record_name}.{extension}")
+        os.makedirs(os.path.dirname(data_dump_path), exist_ok=True)
+        return data_dump_path
@@ -1,12 +1,18 @@
 import abc
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, Union
 
 import requests
 
+from powerpwn.cli.const import TOOL_NAME
+from powerpwn.powerdump.collect.data_collectors.enums.dump_priority import DumpPriority
 from powerpwn.powerdump.collect.models.connector_entity import Connector
-from powerpwn.powerdump.collect.models.data_dump_entity import DataDump, DataDumpWithContext
+from powerpwn.powerdump.collect.models.data_dump_entity import DataDump, DataDumpDownload, DataDumpStream, DataDumpWithContext
 from powerpwn.powerdump.collect.models.data_record_entity import DataRecord, DataRecordWithContext
 from powerpwn.powerdump.collect.models.data_store_entity import DataStore, DataStoreWithContext
+from powerpwn.powerdump.utils.concurrency import walk_tree
+from powerpwn.powerdump.utils.const import FOLDER_WALK_WORKERS, MAX_FOLDER_DEPTH, MAX_FOLDER_ITEMS
+from powerpwn.powerdump.utils.requests_wrapper import PageIterator
 
 
 class ConnectorBase(abc.ABC):
@@ -58,6 +64,57 @@ class ConnectorBase(abc.ABC):
     def _dump(self, data_record: DataRecordWithContext) -> DataDump:
         pass
 
+    def dump_stream(self, data_record: DataRecordWithContext) -> Optional[Union[DataDumpStream, DataDumpDownload]]:
+        """
+        Dump data chunk by chunk, or download it straight to its path, so that large records are never held in memory in full
+
+        Args:
+            data_record (DataRecordWithContext): data record details to dump
+
+        Returns:
+            Optional[Union[DataDumpStream, DataDumpDownload]]: dump data, or None if the record is dumped with dump
+        """
+        return self._dump_stream(data_record=data_record)
+
+    def _dump_stream(self, data_record: DataRecordWithContext) -> Optional[Union[DataDumpStream, DataDumpDownload]]:
+        return None
+
+    def _stream_items(self, data_record: DataRecordWithContext, **kwargs: Any) -> Iterator[Any]:
+        """
+        Iterate over the items of a paginated listing one page at a time, raising if any of the pages could not be fetched
+
+        Args:
+            data_record (DataRecordWithContext): data record the listing belongs to
+            kwargs: arguments of PageIterator
+        """
+        pages = PageIterator(self._session, **kwargs)
+        yield from pages.items()
+        if not pages.success:
+            raise ValueError(
+                f"Unable to fetch value for data type: {data_record.data_record.record_type} with ID: {data_record.data_record.record_id}."
+            )
+
+    def _walk_folders(
+        self, root_folder: Dict[str, Any], list_children: Callable[[Dict[str, Any]], Iterable[Dict[str, Any]]]
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Walk a folder tree with concurrent folder listings, and yield its files as they are discovered
+
+        Args:
+            root_folder (Dict[str, Any]): folder to start from
+            list_children (Callable): lists the files and folders in a folder, which are told apart by their IsFolder property
+        """
+        with ThreadPoolExecutor(max_workers=FOLDER_WALK_WORKERS, thread_name_prefix=f"{TOOL_NAME}-folders") as executor:
+            yield from walk_tree(
+                list_children,
+                root_folder,
+                is_folder=lambda child: child["IsFolder"],
+                executor=executor,
+                max_in_flight=FOLDER_WALK_WORKERS,
+                max_depth=MAX_FOLDER_DEPTH,
+                max_items=MAX_FOLDER_ITEMS,
+            )
+
     @classmethod
     def api_name(cls) -> str:
         pass
@@ -69,3 +126,24 @@ class ConnectorBase(abc.ABC):
     @classmethod
     def uses_undocumented_api_properties(cls) -> bool:
         return False
+
+    @classmethod
+    def dump_unit(cls, data_record: DataRecordWithContext) -> Tuple[str, str]:
+        """
+        Key of the unit a record is dumped in. Records of a unit are dumped one after another, and are checkpointed together.
+        """
+        return str(data_record.data_record.record_type), data_record.data_record.record_id
+
+    @classmethod
+    def dump_priority(cls) -> DumpPriority:
+        """
+        Priority of the connections of this connector, by the types of records it dumps
+        """
+        return DumpPriority.normal
+
+    @classmethod
+    def record_workers(cls) -> int:
+        """
+        Number of records of a data store to dump concurrently
+        """
+        return 1
@@ -1,12 +1,13 @@
-import json
-from typing import Any, Dict, List
+from typing import Any, Dict, Generator, List
 
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors.connector_base import ConnectorBase
 from powerpwn.powerdump.collect.data_collectors.enums.data_dump_type import DataDumpType
-from powerpwn.powerdump.collect.models.data_dump_entity import DataDump
+from powerpwn.powerdump.collect.data_collectors.enums.dump_priority import DumpPriority
+from powerpwn.powerdump.collect.models.data_dump_entity import DataDumpStream
 from powerpwn.powerdump.collect.models.data_record_entity import DataRecord, DataRecordWithContext
 from powerpwn.powerdump.collect.models.data_store_entity import DataStore, DataStoreWithContext
 from powerpwn.powerdump.utils.const import ENCODING
+from powerpwn.powerdump.utils.json_utils import json_lines
 from powerpwn.powerdump.utils.requests_wrapper import consecutive_gets, request_and_verify
 
 
@@ -42,9 +43,7 @@ class ExcelOnlineBusinessConnector(ConnectorBase):
 
         return records
 
-    def __enum_dir(self, source_id: str, drive_id: str, folder_id: str) -> List[Dict[str, Any]]:
-        file_objs: List[Dict[str, Any]] = []
-
+    def __list_dir(self, source_id: str, drive_id: str, folder_id: str) -> List[Dict[str, Any]]:
         if folder_id == "root":
             folder_path = "root"
         else:
@@ -58,19 +57,21 @@ class ExcelOnlineBusinessConnector(ConnectorBase):
             url=f"{self._root}/codeless/v1.0/drives/{drive_id}/{folder_path}/children",
             params=params,
         )
-        if can_list_folder:
-            if not isinstance(list_folder_val, list):
-                raise ValueError(f"Unexpected response list_folder_val: {list_folder_val}.")
-
-            for file_or_dir_obj in list_folder_val:
-                if not isinstance(file_or_dir_obj, dict):
-                    raise ValueError(f"Unexpected response file_or_dir_obj: {file_or_dir_obj}.")
-                if file_or_dir_obj["IsFolder"]:
-                    file_objs += self.__enum_dir(source_id=source_id, drive_id=drive_id, folder_id=file_or_dir_obj["Id"])
-                else:
-                    file_objs += [file_or_dir_obj]
-
-        return file_objs
+        if not can_list_folder:
+            return []
+        if not isinstance(list_folder_val, list):
+            raise ValueError(f"Unexpected response list_folder_val: {list_folder_val}.")
+        for file_or_dir_obj in list_folder_val:
+            if not isinstance(file_or_dir_obj, dict):
+                raise ValueError(f"Unexpected response file_or_dir_obj: {file_or_dir_obj}.")
+
+        return list_folder_val
+
+    def __enum_dir(self, source_id: str, drive_id: str) -> Generator[Dict[str, Any], None, None]:
+        root_folder = {"Id": "root", "IsFolder": True}
+        yield from self._walk_folders(
+            root_folder, lambda folder_obj: self.__list_dir(source_id=source_id, drive_id=drive_id, folder_id=folder_obj["Id"])
+        )
 
     def _enum(self, data_store: DataStoreWithContext) -> List[DataRecord]:
         data_records: List[DataRecord] = []
@@ -78,7 +79,8 @@ class ExcelOnlineBusinessConnector(ConnectorBase):
         source_id = data_store.data_store.extra["source"]["id"]
         drive_id = data_store.data_store.extra["drive"]["id"]
 
-        drive_files = self.__enum_dir(source_id=source_id, drive_id=drive_id, folder_id="root")
+        # tables of a file are listed as soon as the file is discovered
+        drive_files = self.__enum_dir(source_id=source_id, drive_id=drive_id)
 
         for file_obj in drive_files:
             file_id = file_obj["Id"]
@@ -106,34 +108,26 @@ class ExcelOnlineBusinessConnector(ConnectorBase):
 
         return data_records
 
-    def _dump(self, data_record: DataRecordWithContext) -> DataDump:
-        if data_record.data_record.record_type == DataDumpType.table:
-            source_id = data_record.data_store.data_store.extra["source"]["id"]
-            drive_id = data_record.data_store.data_store.extra["drive"]["id"]
-            file_id = data_record.data_record.extra["file"]["Id"]
-            table_id = data_record.data_record.extra["table"]["id"]
-
-            success, rows_val = consecutive_gets(
-                session=self._session,
-                expected_status_prefix="200",
-                url=f"{self._root}/drives/{drive_id}/files/{file_id}/tables/{table_id}/items",
-                params={"source": source_id},
-            )
-            if success:
-                extension = "json"
-                encoding = ENCODING
-                content = json.dumps(rows_val).encode(ENCODING)
-
-        else:
+    def _dump_stream(self, data_record: DataRecordWithContext) -> DataDumpStream:
+        if data_record.data_record.record_type != DataDumpType.table:
             raise ValueError(f"Unsupported data type: {data_record.data_record.record_type}.")
 
-        if not success:
-            raise ValueError(
-                f"Unable to fetch value for data type: {data_record.data_record.record_type} with ID: {data_record.data_record.record_id}."
-            )
+        source_id = data_record.data_store.data_store.extra["source"]["id"]
+        drive_id = data_record.data_store.data_store.extra["drive"]["id"]
+        file_id = data_record.data_record.extra["file"]["Id"]
+        table_id = data_record.data_record.extra["table"]["id"]
 
-        data_dump = DataDump(extension=extension, encoding=encoding, content=content)
-        return data_dump
+        rows = self._stream_items(
+            data_record,
+            expected_status_prefix="200",
+            url=f"{self._root}/drives/{drive_id}/files/{file_id}/tables/{table_id}/items",
+            params={"source": source_id},
+        )
+        return DataDumpStream(extension="jsonl", chunks=json_lines(rows, ENCODING))
+
+    @classmethod
+    def dump_priority(cls) -> DumpPriority:
+        return DumpPriority.bulk
 
     @classmethod
     def api_name(cls) -> str:
@@ -1,15 +1,44 @@
-from typing import List, Set
+import base64
+import datetime
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
+import requests
+from pydantic import ValidationError, parse_obj_as
+
+from powerpwn.cli.const import LOGGER_NAME, TOOL_NAME
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors.connector_base import ConnectorBase
 from powerpwn.powerdump.collect.data_collectors.enums.data_dump_type import DataDumpType
+from powerpwn.powerdump.collect.models.connector_entity import Connector
 from powerpwn.powerdump.collect.models.data_dump_entity import DataDump
 from powerpwn.powerdump.collect.models.data_record_entity import DataRecord, DataRecordWithContext
 from powerpwn.powerdump.collect.models.data_store_entity import DataStore, DataStoreWithContext
+from powerpwn.powerdump.utils.concurrency import ordered_map
 from powerpwn.powerdump.utils.const import ENCODING
 from powerpwn.powerdump.utils.requests_wrapper import request_and_verify
 
+logger = logging.getLogger(LOGGER_NAME)
+
+GMAIL_SCAN_WORKERS = 4
+# scans stop, or skip the rest of a second of a date window, rather than exclude more subjects than this in a single query, unlimited if None
+MAX_EXCLUDED_SUBJECTS: Optional[int] = 100
+# narrow scans with a before:<epoch> date window, so the query does not grow with the number of emails.
+# It relies on the subject filter being used as a raw Gmail search query, as subject exclusions do, which is not documented for the connector.
+# Scans of connections that do not honor date windows fall back to excluding every subject found.
+USE_DATE_WINDOWS = True
+# number of recently fetched emails, with their attachments, that are kept for the records of the same email
+MESSAGE_CACHE_SIZE = 8
+
 
 class GmailConnector(ConnectorBase):
+    def __init__(self, session: requests.Session, spec: Connector, connection_id: str):
+        super().__init__(session=session, spec=spec, connection_id=connection_id)
+        self.__messages: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.__messages_lock = threading.Lock()
+
     def _ping(self, connection_parameters: dict) -> List[DataStore]:
         success, _, _ = request_and_verify(session=self._session, expected_status_prefix="200", method="get", url=f"{self._root}/TestConnection")
 
@@ -24,94 +53,153 @@ class GmailConnector(ConnectorBase):
     def _enum(self, data_store: DataStoreWithContext) -> List[DataRecord]:
         data_records: List[DataRecord] = []
         unique_email_ids_seen: Set[str] = set()
+        unique_email_ids_lock = threading.Lock()
+
+        def _claim_email(email_id: str) -> bool:
+            # avoid processing the same email twice
+            with unique_email_ids_lock:
+                if email_id in unique_email_ids_seen:
+                    return False
+                unique_email_ids_seen.add(email_id)
+                return True
 
         can_list_labels, _, labels_val = request_and_verify(
             session=self._session, expected_status_prefix="200", method="get", url=f"{self._root}/Mail/Labels"
         )
-        if can_list_labels:
-            # Iterate over parameters to enum as many emails as possible
-            for label_obj in labels_val:
-                for fetch_only_with_attachments in (True, False):
-                    for importance in ("Important", "Not important"):
-                        for starred in ("Starred", "Not starred"):
-                            params = {
-                                "label": label_obj["Id"],
-                                "importance": importance,
-                                "starred": starred,
-                                "fetchOnlyWithAttachments": fetch_only_with_attachments,
-                                "includeAttachments": True,
-                                "subject": "",
-                            }
-
-                            # Iterate over as many subjects as possible
-                            get_email_success = True
-                            while get_email_success:
-                                get_email_success, _, get_email_val = request_and_verify(
-                                    session=self._session,
-                                    expected_status_prefix="200",
-                                    method="get",
-                                    url=f"{self._root}/Mail/LastReceived",
-                                    params=params,
-                                )
-
-                                if get_email_success:
-                                    if get_email_val.get("Id") not in unique_email_ids_seen:
-                                        data_records.append(
-                                            DataRecord(
-                                                record_type=DataDumpType.email,
-                                                record_id=get_email_val["Id"],
-                                                record_name=get_email_val["Subject"],
-                                                extra={k: v for k, v in get_email_val.items() if k not in {"Body", "Attachments"}},
-                                            )
-                                        )
-
-                                        for attachment_obj in get_email_val["Attachments"]:
-                                            data_records.append(
-                                                DataRecord(
-                                                    record_type=DataDumpType.attachment,
-                                                    record_id=get_email_val["Id"],
-                                                    record_name=attachment_obj["Name"],
-                                                    extra={k: v for k, v in attachment_obj.items() if k not in {"ContentBytes"}},
-                                                )
-                                            )
-
-                                        # avoid processing the same email twice
-                                        unique_email_ids_seen.add(get_email_val["Id"])
-
-                                    # Ignore identical subjects to continue iteration
-                                    params["subject"] += f" -{get_email_val['Subject']}"
+        if not can_list_labels:
+            return data_records
+
+        # every email of a label is in exactly one importance and starred partition, partitions of all labels are scanned concurrently
+        scans = [
+            {"label": label_obj["Id"], "importance": importance, "starred": starred}
+            for label_obj in labels_val
+            for importance in ("Important", "Not important")
+            for starred in ("Starred", "Not starred")
+        ]
+        with ThreadPoolExecutor(max_workers=GMAIL_SCAN_WORKERS, thread_name_prefix=f"{TOOL_NAME}-gmail") as executor:
+            for _, emails in ordered_map(lambda scan: self.__scan_emails(scan, _claim_email), scans, executor, max_in_flight=GMAIL_SCAN_WORKERS):
+                for get_email_val in emails:
+                    data_records.append(
+                        DataRecord(
+                            record_type=DataDumpType.email,
+                            record_id=get_email_val["Id"],
+                            record_name=get_email_val["Subject"],
+                            extra={k: v for k, v in get_email_val.items() if k not in {"Body", "Attachments"}},
+                        )
+                    )
+
+                    for attachment_obj in get_email_val["Attachments"]:
+                        data_records.append(
+                            DataRecord(
+                                record_type=DataDumpType.attachment,
+                                record_id=get_email_val["Id"],
+                                record_name=attachment_obj["Name"],
+                                extra={k: v for k, v in attachment_obj.items() if k not in {"ContentBytes"}},
+                            )
+                        )
 
         return data_records
 
+    def __scan_emails(self, scan: Dict[str, str], claim_email: Callable[[str], bool]) -> List[Dict[str, Any]]:
+        """
+        Scan the emails of a partition from the last received backwards, one email per request.
+        With USE_DATE_WINDOWS, the search is narrowed with a date window that ends at the last email found,
+        and only the subjects of the emails received in the last second of the window are excluded.
+        Otherwise, or when the window is not honored, the search is narrowed by excluding the subjects of all the emails found.
+        Queries never exclude more than MAX_EXCLUDED_SUBJECTS subjects.
+
+        Args:
+            scan (Dict[str, str]): label, importance and starred filters of the partition
+            claim_email (Callable[[str], bool]): whether an email was not found by any scan yet
+
+        Returns:
+            List[Dict[str, Any]]: emails of the partition which were not found by other scans
+        """
+        emails: List[Dict[str, Any]] = []
+        scanned_email_ids: Set[str] = set()
+        # subjects found in this scan, in the order they were found
+        scanned_subjects: Dict[str, None] = dict()
+        use_date_window = USE_DATE_WINDOWS
+        # the window ends right after the last email found, emails received in its last second are told apart by their subject
+        window_end: Optional[int] = None
+        # an empty window is confirmed by excluding subjects, until a window of the connection matched an email
+        window_honored = False
+        excluded_subjects: List[str] = []
+
+        while True:
+            if MAX_EXCLUDED_SUBJECTS is not None and len(excluded_subjects) > MAX_EXCLUDED_SUBJECTS:
+                if not use_date_window or window_end is None:
+                    logger.warning(f"Stopped scanning emails of {scan} after {MAX_EXCLUDED_SUBJECTS} subjects.")
+                    break
+                logger.warning(
+                    f"Skipped emails of {scan} received in the second before {window_end}, more than {MAX_EXCLUDED_SUBJECTS} were received in it."
+                )
+                window_end -= 1
+                excluded_subjects = []
+
+            query = (f" before:{window_end}" if use_date_window and window_end is not None else "") + "".join(
+                f" -{subject}" for subject in excluded_subjects
+            )
+            params = {**scan, "fetchOnlyWithAttachments": False, "includeAttachments": True, "subject": query}
+            get_email_success, _, get_email_val = request_and_verify(
+                session=self._session, expected_status_prefix="200", method="get", url=f"{self._root}/Mail/LastReceived", params=params
+            )
+            if not get_email_success:
+                if use_date_window and window_end is not None and not window_honored:
+                    # a window which is not honored may match no email at all, it is confirmed by excluding the subjects found instead
+                    logger.debug(f"No email found before {window_end} by connection {self._connection_id}, checking by excluding subjects.")
+                    use_date_window = False
+                    excluded_subjects = list(scanned_subjects)
+                    continue
+                break
+
+            received = _received_time(get_email_val)
+            if use_date_window and (
+                get_email_val["Id"] in scanned_email_ids or received is None or (window_end is not None and received >= window_end)
+            ):
+                logger.debug(f"Date windows are not supported by connection {self._connection_id}, falling back to excluding subjects.")
+                use_date_window = False
+            elif get_email_val["Id"] in scanned_email_ids:
+                # subjects are not excluded either, the scan would not progress
+                break
+            elif use_date_window and window_end is not None:
+                window_honored = True
+
+            # labels overlap, emails found by other scans are not returned again
+            if get_email_val["Id"] not in scanned_email_ids:
+                scanned_email_ids.add(get_email_val["Id"])
+                if claim_email(get_email_val["Id"]):
+                    emails.append(get_email_val)
+
+            scanned_subjects[get_email_val["Subject"]] = None
+            if not use_date_window or received is None:
+                excluded_subjects = list(scanned_subjects)
+            elif window_end == received + 1:
+                excluded_subjects.append(get_email_val["Subject"])
+            else:
+                window_end = received + 1
+                excluded_subjects = [get_email_val["Subject"]]
+
+        return emails
+
     def _dump(self, data_record: DataRecordWithContext) -> DataDump:
+        # the email and all of its attachments are dumped from a single fetch of the email
+        success, get_email_val = self.__get_email(data_record.data_record.record_id)
+
         if data_record.data_record.record_type == DataDumpType.email:
-            success, _, get_email_val = request_and_verify(
-                session=self._session,
-                expected_status_prefix="200",
-                method="get",
-                url=f"{self._root}/Mail/{data_record.data_record.record_id}",
-                params={"includeAttachments": False},
-            )
             if success:
                 extension = "html" if data_record.data_record.extra.get("IsHtml", False) else "txt"
                 encoding = ENCODING
                 content = get_email_val["Body"].encode(ENCODING)
 
         elif data_record.data_record.record_type == DataDumpType.attachment:
-            success, _, get_email_val = request_and_verify(
-                session=self._session,
-                expected_status_prefix="200",
-                method="get",
-                url=f"{self._root}/Mail/{data_record.data_record.record_id}",
-                params={"includeAttachments": True},
-            )
-
             if success:
                 for attachment_obj in get_email_val["Attachments"]:
                     if attachment_obj["Name"] == data_record.data_record.record_name:
                         extension = attachment_obj["ContentType"].partition('name="')[2].partition(".")[-1].replace('"', "")
                         encoding = None
-                        content = attachment_obj["ContentBytes"]
+                        # attachments are sent base64 encoded, they are dumped as their original bytes
+                        content = base64.b64decode(attachment_obj["ContentBytes"])
 
                         # We are looking for a specific attachment
                         break
@@ -129,6 +217,31 @@ class GmailConnector(ConnectorBase):
         data_dump = DataDump(extension=extension, encoding=encoding, content=content)
         return data_dump
 
+    def __get_email(self, email_id: str) -> Tuple[bool, Dict[str, Any]]:
+        with self.__messages_lock:
+            if email_id in self.__messages:
+                self.__messages.move_to_end(email_id)
+                return True, self.__messages[email_id]
+
+        success, _, get_email_val = request_and_verify(
+            session=self._session,
+            expected_status_prefix="200",
+            method="get",
+            url=f"{self._root}/Mail/{email_id}",
+            params={"includeAttachments": True},
+        )
+        if success:
+            with self.__messages_lock:
+                self.__messages[email_id] = get_email_val
+                if len(self.__messages) > MESSAGE_CACHE_SIZE:
+                    self.__messages.popitem(last=False)
+        return success, get_email_val
+
+    @classmethod
+    def dump_unit(cls, data_record: DataRecordWithContext) -> Tuple[str, str]:
+        # attachments share the ID of their email, and are dumped with it
+        return str(DataDumpType.email), data_record.data_record.record_id
+
     @classmethod
     def api_name(cls) -> str:
         return "shared_gmail"
@@ -136,3 +249,14 @@ class GmailConnector(ConnectorBase):
     @classmethod
     def _apim_path(cls) -> str:
         return "gmail"
+
+
+def _received_time(email: Dict[str, Any]) -> Optional[int]:
+    # in seconds since epoch, as in the before: search operator
+    try:
+        received = parse_obj_as(datetime.datetime, email["DateTimeReceived"])
+    except (KeyError, ValidationError):
+        return None
+    if received.tzinfo is None:
+        received = received.replace(tzinfo=datetime.timezone.utc)
+    return int(received.timestamp())
@@ -2,12 +2,16 @@ from typing import List
 
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors.connector_base import ConnectorBase
 from powerpwn.powerdump.collect.data_collectors.enums.data_dump_type import DataDumpType
+from powerpwn.powerdump.collect.data_collectors.enums.dump_priority import DumpPriority
 from powerpwn.powerdump.collect.models.data_dump_entity import DataDump
 from powerpwn.powerdump.collect.models.data_record_entity import DataRecord, DataRecordWithContext
 from powerpwn.powerdump.collect.models.data_store_entity import DataStore, DataStoreWithContext
 from powerpwn.powerdump.utils.const import ENCODING
 from powerpwn.powerdump.utils.requests_wrapper import consecutive_gets, request_and_verify
 
+# secrets of a vault fetched concurrently
+KEYVAULT_SECRET_WORKERS = 8
+
 
 class KeyVaultConnector(ConnectorBase):
     def _ping(self, connection_parameters: dict) -> List[DataStore]:
@@ -77,6 +81,14 @@ class KeyVaultConnector(ConnectorBase):
         data_dump = DataDump(extension="txt", encoding=ENCODING, content=secret_value.encode(ENCODING))
         return data_dump
 
+    @classmethod
+    def dump_priority(cls) -> DumpPriority:
+        return DumpPriority.high
+
+    @classmethod
+    def record_workers(cls) -> int:
+        return KEYVAULT_SECRET_WORKERS
+
     @classmethod
     def api_name(cls) -> str:
         return "shared_keyvault"
@@ -1,12 +1,13 @@
 import urllib.parse
-from typing import Any, Dict, Generator, List
+from typing import Any, Dict, Generator, List, Union
 
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors.connector_base import ConnectorBase
 from powerpwn.powerdump.collect.data_collectors.enums.data_dump_type import DataDumpType
-from powerpwn.powerdump.collect.models.data_dump_entity import DataDump
+from powerpwn.powerdump.collect.data_collectors.enums.dump_priority import DumpPriority
+from powerpwn.powerdump.collect.models.data_dump_entity import DataDumpDownload, DataDumpStream
 from powerpwn.powerdump.collect.models.data_record_entity import DataRecord, DataRecordWithContext
 from powerpwn.powerdump.collect.models.data_store_entity import DataStore, DataStoreWithContext
-from powerpwn.powerdump.utils.const import ENCODING
+from powerpwn.powerdump.utils import ranged_download
 from powerpwn.powerdump.utils.requests_wrapper import consecutive_gets, request_and_verify
 
 
@@ -59,57 +60,55 @@ class SharedAzureBlobConnector(ConnectorBase):
                     record_type=DataDumpType.file,
                     record_id=file_obj["Id"],
                     record_name=file_obj["Name"],
-                    extra={"file_path": file_obj["Path"], "media_type": file_obj["MediaType"]},
+                    extra={"file_path": file_obj["Path"], "media_type": file_obj["MediaType"], "size": file_obj.get("Size")},
                 )
             )
 
         return data_records
 
-    def _dump(self, data_record: DataRecordWithContext) -> DataDump:
+    def _dump_stream(self, data_record: DataRecordWithContext) -> Union[DataDumpStream, DataDumpDownload]:
         file_id = urllib.parse.quote(data_record.data_record.record_id)
+        url = f"{self._root}/v2/datasets/{data_record.data_store.data_store.extra['storage_account_name']}/files/{file_id}/content"
 
-        success, _, val = request_and_verify(
-            session=self._session,
-            expected_status_prefix="200",
-            is_json_resp=False,
-            method="get",
-            url=f"{self._root}/v2/datasets/{data_record.data_store.data_store.extra['storage_account_name']}/files/{file_id}/content",
-        )
+        # add check for mypy
+        if file_name := data_record.data_record.record_name:
+            extension = file_name.split(".")[-1]
+
+            last_index_for_extension = file_name.rindex(".")
+            data_record.data_record.record_name = file_name[:last_index_for_extension]
+
+        # large files are downloaded in concurrent ranges, which are resumed if the download is interrupted
+        if (data_record.data_record.extra.get("size") or 0) >= ranged_download.RANGED_DOWNLOAD_THRESHOLD:
+            return DataDumpDownload(
+                extension=extension, download=lambda path, stop: ranged_download.download_in_ranges(self._session, url, path, stop=stop)
+            )
+
+        # files are binary, their content is written as received
+        success, _, chunks = request_and_verify(session=self._session, expected_status_prefix="200", is_raw_resp=True, method="get", url=url)
 
         if not success:
             raise ValueError(
                 f"Unable to fetch value for data type: {data_record.data_record.record_type} with ID: {data_record.data_record.record_id}."
             )
 
-        document_value = val.encode(ENCODING)
+        return DataDumpStream(extension=extension, chunks=chunks)
 
-        # add check for mypy
-        if file_name := data_record.data_record.record_name:
-            extension = file_name.split(".")[-1]
+    def __enumerate_folders_content_recursively(self, storage_account: str, root_folder: Dict[str, Any]) -> Generator[Dict[str, Any], None, None]:
+        def _list_folder(folder_obj: Dict[str, Any]) -> List[Dict[str, Any]]:
+            # TODO: use right pagination method with nextLink
+            is_success, sub_folders = consecutive_gets(
+                session=self._session,
+                expected_status_prefix="200",
+                property_for_pagination="nextLink",
+                url=f"{self._root}/v2/datasets/{storage_account}/foldersV2/{folder_obj['Id']}",
+            )
+            return sub_folders if is_success else []
 
-            last_index_for_extension = file_name.rindex(".")
-            data_record.data_record.record_name = file_name[:last_index_for_extension]
+        yield from self._walk_folders(root_folder, _list_folder)
 
-        data_dump = DataDump(extension=extension, encoding=ENCODING, content=document_value)
-        return data_dump
-
-    def __enumerate_folders_content_recursively(self, storage_account: str, root_folder: Dict[str, str]) -> Generator[Dict[str, Any], None, None]:
-        stack = [root_folder]
-        while len(stack) > 0:
-            current_folder_obj = stack.pop()
-            if not current_folder_obj["IsFolder"]:
-                yield current_folder_obj
-            else:
-                current_folder_obj_id = current_folder_obj["Id"]
-                # TODO: use right pagination method with nextLink
-                is_success, sub_folders = consecutive_gets(
-                    session=self._session,
-                    expected_status_prefix="200",
-                    property_for_pagination="nextLink",
-                    url=f"{self._root}/v2/datasets/{storage_account}/foldersV2/{current_folder_obj_id}",
-                )
-                if is_success and len(sub_folders) > 0:
-                    stack.extend(sub_folders)
+    @classmethod
+    def dump_priority(cls) -> DumpPriority:
+        return DumpPriority.bulk
 
     @classmethod
     def api_name(cls) -> str:
@@ -3,6 +3,7 @@ from typing import List
 
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors.connector_base import ConnectorBase
 from powerpwn.powerdump.collect.data_collectors.enums.data_dump_type import DataDumpType
+from powerpwn.powerdump.collect.data_collectors.enums.dump_priority import DumpPriority
 from powerpwn.powerdump.collect.models.data_dump_entity import DataDump
 from powerpwn.powerdump.collect.models.data_record_entity import DataRecord, DataRecordWithContext
 from powerpwn.powerdump.collect.models.data_store_entity import DataStore, DataStoreWithContext
@@ -74,6 +75,10 @@ class SharedAzureQueuesConnector(ConnectorBase):
         data_dump = DataDump(extension="json", encoding=ENCODING, content=document_value)
         return data_dump
 
+    @classmethod
+    def dump_priority(cls) -> DumpPriority:
+        return DumpPriority.high
+
     @classmethod
     def api_name(cls) -> str:
         return "shared_azurequeues"
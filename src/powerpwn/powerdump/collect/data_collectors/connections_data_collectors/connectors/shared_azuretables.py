@@ -1,12 +1,13 @@
-import json
 from typing import List
 
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors.connector_base import ConnectorBase
 from powerpwn.powerdump.collect.data_collectors.enums.data_dump_type import DataDumpType
-from powerpwn.powerdump.collect.models.data_dump_entity import DataDump
+from powerpwn.powerdump.collect.data_collectors.enums.dump_priority import DumpPriority
+from powerpwn.powerdump.collect.models.data_dump_entity import DataDumpStream
 from powerpwn.powerdump.collect.models.data_record_entity import DataRecord, DataRecordWithContext
 from powerpwn.powerdump.collect.models.data_store_entity import DataStore, DataStoreWithContext
 from powerpwn.powerdump.utils.const import ENCODING
+from powerpwn.powerdump.utils.json_utils import json_lines
 from powerpwn.powerdump.utils.requests_wrapper import consecutive_gets, request_and_verify
 
 
@@ -55,23 +56,18 @@ class SharedAzureTablesConnector(ConnectorBase):
 
         return data_records
 
-    def _dump(self, data_record: DataRecordWithContext) -> DataDump:
+    def _dump_stream(self, data_record: DataRecordWithContext) -> DataDumpStream:
         table_name = data_record.data_record.record_id
-        success, val = consecutive_gets(
-            session=self._session,
+        entities = self._stream_items(
+            data_record,
             expected_status_prefix="200",
             url=f"{self._root}/v2/storageAccounts/{data_record.data_store.data_store.name}/tables/{table_name}/entities",
         )
+        return DataDumpStream(extension="jsonl", chunks=json_lines(entities, ENCODING))
 
-        if not success:
-            raise ValueError(
-                f"Unable to fetch value for data type: {data_record.data_record.record_type} with ID: {data_record.data_record.record_id}."
-            )
-
-        document_value = json.dumps(val).encode(ENCODING)
-
-        data_dump = DataDump(extension="json", encoding=ENCODING, content=document_value)
-        return data_dump
+    @classmethod
+    def dump_priority(cls) -> DumpPriority:
+        return DumpPriority.bulk
 
     @classmethod
     def api_name(cls) -> str:
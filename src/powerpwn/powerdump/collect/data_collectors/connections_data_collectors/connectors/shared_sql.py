@@ -1,13 +1,30 @@
-import json
-from typing import List
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Generator, List, Optional, Set, Tuple
 
+from powerpwn.cli.const import TOOL_NAME
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors.connector_base import ConnectorBase
 from powerpwn.powerdump.collect.data_collectors.enums.data_dump_type import DataDumpType
-from powerpwn.powerdump.collect.models.data_dump_entity import DataDump
+from powerpwn.powerdump.collect.data_collectors.enums.dump_priority import DumpPriority
+from powerpwn.powerdump.collect.models.data_dump_entity import DataDumpStream
 from powerpwn.powerdump.collect.models.data_record_entity import DataRecord, DataRecordWithContext
 from powerpwn.powerdump.collect.models.data_store_entity import DataStore, DataStoreWithContext
+from powerpwn.powerdump.utils.concurrency import KeyedLimiter, ordered_map
 from powerpwn.powerdump.utils.const import ENCODING
-from powerpwn.powerdump.utils.requests_wrapper import consecutive_gets, request_and_verify
+from powerpwn.powerdump.utils.json_utils import json_lines
+from powerpwn.powerdump.utils.requests_wrapper import consecutive_gets, next_page_kwargs, request_and_verify
+
+# tables dumped concurrently for every data store
+SQL_TABLE_WORKERS = 4
+# rows of a table are fetched in pages of SQL_PAGE_SIZE rows, SQL_PAGE_WORKERS pages at a time
+SQL_PAGE_SIZE = 1000
+SQL_PAGE_WORKERS = 4
+# properties of the continuation of a page, which servers that cap the size of a response return
+SQL_CONTINUATION_PROPERTIES = ("@odata.nextLink", "continuationToken")
+# on-prem servers are reached through a data gateway, which is not sent more than a few requests at a time
+SQL_MAX_REQUESTS_PER_SERVER = 8
+
+_server_limiter = KeyedLimiter(SQL_MAX_REQUESTS_PER_SERVER)
 
 
 class SharedSqlConnector(ConnectorBase):
@@ -47,16 +64,23 @@ class SharedSqlConnector(ConnectorBase):
     def _enum(self, data_store: DataStoreWithContext) -> List[DataRecord]:
         data_records: List[DataRecord] = []
 
+        server_name = data_store.data_store.name
         can_list_databases, databases_val = consecutive_gets(
-            session=self._session, expected_status_prefix="200", url=f"{self._root}/v2/databases?server={data_store.data_store.name}"
+            session=self._session, expected_status_prefix="200", url=f"{self._root}/v2/databases?server={server_name}"
         )
-        if can_list_databases:
-            for db_obj in databases_val:
-                db_name = db_obj["Name"]
+        if not can_list_databases:
+            return data_records
 
-                can_list_tables, tables_val = consecutive_gets(
-                    session=self._session, expected_status_prefix="200", url=f"{self._root}/v2/datasets/{data_store.data_store.name},{db_name}/tables"
+        def _list_tables(db_obj: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+            with _server_limiter.hold(server_name):
+                return consecutive_gets(
+                    session=self._session, expected_status_prefix="200", url=f"{self._root}/v2/datasets/{server_name},{db_obj['Name']}/tables"
                 )
+
+        # tables of all databases are listed concurrently
+        with ThreadPoolExecutor(max_workers=SQL_TABLE_WORKERS, thread_name_prefix=f"{TOOL_NAME}-sql") as executor:
+            for db_obj, (can_list_tables, tables_val) in ordered_map(_list_tables, databases_val, executor, max_in_flight=SQL_TABLE_WORKERS):
+                db_name = db_obj["Name"]
                 if can_list_tables:
                     for table in tables_val:
                         table_display_name = table["DisplayName"]
@@ -71,24 +95,90 @@ class SharedSqlConnector(ConnectorBase):
 
         return data_records
 
-    def _dump(self, data_record: DataRecordWithContext) -> DataDump:
+    def _dump_stream(self, data_record: DataRecordWithContext) -> DataDumpStream:
+        # rows are written one per line as their pages arrive
+        return DataDumpStream(extension="jsonl", chunks=json_lines(self.__table_rows(data_record), ENCODING))
+
+    def __table_rows(self, data_record: DataRecordWithContext) -> Generator[Dict[str, Any], None, None]:
         server_name = data_record.data_store.data_store.name
         db_name = data_record.data_record.extra["db_name"]
-        success, val = consecutive_gets(
+        url = f"{self._root}/v2/datasets/{server_name},{db_name}/tables/{data_record.data_record.record_id}/items"
+
+        # $skip pages are only stable when rows are ordered by a unique key, tables without a primary key are read in continuation pages
+        primary_key = self.__primary_key(server_name, db_name, data_record.data_record.record_id)
+        if primary_key is None:
+            yield from self._stream_items(data_record, expected_status_prefix="200", url=url)
+            return
+        order_by = ",".join(primary_key)
+
+        # the first two pages tell whether the server honors $top and $skip, before any row is yielded
+        first_page = self.__table_page(server_name, url, order_by, skip=0)
+        second_page = self.__table_page(server_name, url, order_by, skip=SQL_PAGE_SIZE) if len(first_page) == SQL_PAGE_SIZE else []
+        if len(first_page) > SQL_PAGE_SIZE or (second_page and second_page == first_page):
+            yield from self._stream_items(data_record, expected_status_prefix="200", url=url)
+            return
+
+        yield from first_page
+        yield from second_page
+        if len(second_page) < SQL_PAGE_SIZE:
+            return
+
+        # pages of large tables are fetched concurrently and yielded in order, until a page is not full
+        with ThreadPoolExecutor(max_workers=SQL_PAGE_WORKERS, thread_name_prefix=f"{TOOL_NAME}-sql-pages") as executor:
+            skips = itertools.count(2 * SQL_PAGE_SIZE, SQL_PAGE_SIZE)
+            pages = ordered_map(lambda skip: self.__table_page(server_name, url, order_by, skip), skips, executor, max_in_flight=SQL_PAGE_WORKERS)
+            for _, page in pages:
+                yield from page
+                if len(page) < SQL_PAGE_SIZE:
+                    return
+
+    def __primary_key(self, server_name: str, db_name: str, table_id: str) -> Optional[List[str]]:
+        success, _, val = request_and_verify(
             session=self._session,
             expected_status_prefix="200",
-            url=f"{self._root}/v2/datasets/{server_name},{db_name}/tables/{data_record.data_record.record_id}/items",
+            method="get",
+            url=f"{self._root}/v2/$metadata.json/datasets/{server_name},{db_name}/tables/{table_id}",
         )
-
         if not success:
-            raise ValueError(
-                f"Unable to fetch value for data type: {data_record.data_record.record_type} with ID: {data_record.data_record.record_id}."
-            )
+            return None
+        properties = val.get("schema", {}).get("items", {}).get("properties", {})
+        key_columns = sorted((prop.get("x-ms-keyOrder", 0), name) for name, prop in properties.items() if prop.get("x-ms-keyType") == "primary")
+        return [name for _, name in key_columns] or None
+
+    def __table_page(self, server_name: str, url: str, order_by: str, skip: int) -> List[Dict[str, Any]]:
+        """
+        Read SQL_PAGE_SIZE rows of a table, starting at row skip.
+        Servers which cap the number of rows of a response return the rest of the page with a continuation, which is followed.
+        """
+        rows: List[Dict[str, Any]] = []
+        request_kwargs: Dict[str, Any] = {"url": url, "params": {"$top": SQL_PAGE_SIZE, "$skip": skip, "$orderby": order_by}}
+        continuations: Set[str] = set()
+        while True:
+            with _server_limiter.hold(server_name):
+                success, _, val = request_and_verify(session=self._session, expected_status_prefix="200", method="get", **request_kwargs)
+            if not success:
+                raise ValueError(f"Failed to read rows {skip}-{skip + SQL_PAGE_SIZE} of {url}.")
+            rows.extend(val.get("value", []))
+            if len(rows) >= SQL_PAGE_SIZE:
+                break
+
+            property_for_pagination = next((prop for prop in SQL_CONTINUATION_PROPERTIES if val.get(prop)), None)
+            if property_for_pagination is None or val[property_for_pagination] in continuations:
+                break
+            continuations.add(val[property_for_pagination])
+            request_kwargs = next_page_kwargs(request_kwargs, property_for_pagination, val[property_for_pagination])
+
+        if len(rows) > SQL_PAGE_SIZE and skip > 0:
+            raise ValueError(f"Server returned {len(rows)} rows for a page of {SQL_PAGE_SIZE} rows of {url}.")
+        return rows
 
-        table_value = json.dumps(val).encode(ENCODING)
+    @classmethod
+    def dump_priority(cls) -> DumpPriority:
+        return DumpPriority.bulk
 
-        data_dump = DataDump(extension="json", encoding=ENCODING, content=table_value)
-        return data_dump
+    @classmethod
+    def record_workers(cls) -> int:
+        return SQL_TABLE_WORKERS
 
     @classmethod
     def api_name(cls) -> str:
@@ -1,10 +1,17 @@
+import logging
 import os
 import shutil
 
+from powerpwn.cli.const import LOGGER_NAME
 from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connections_data_collector import ConnectionsDataCollector
+from powerpwn.powerdump.collect.data_collectors.dump_concurrency import DumpConcurrency
+from powerpwn.powerdump.utils.checkpoint import Checkpoint
+from powerpwn.powerdump.utils.file_utils import remove_partial_writes
 from powerpwn.powerdump.utils.model_loaders import get_environment_ids
-from powerpwn.powerdump.utils.path_utils import env_collected_data_path
-from powerpwn.powerdump.utils.requests_wrapper import init_session
+from powerpwn.powerdump.utils.path_utils import dump_checkpoint_path, env_collected_data_path
+from powerpwn.powerdump.utils.requests_wrapper import DEFAULT_POOL_MAXSIZE, TransportOptions, init_session
+
+logger = logging.getLogger(LOGGER_NAME)
 
 
 class DataCollector:
@@ -12,22 +19,59 @@ class DataCollector:
     A Class to collect data from resources and cache them in provided cache path
     """
 
-    def __init__(self, cache_path: str, token: str) -> None:
+    def __init__(
+        self,
+        cache_path: str,
+        token: str,
+        transport: TransportOptions = TransportOptions(),
+        resume: bool = False,
+        concurrency: DumpConcurrency = DumpConcurrency(),
+    ) -> None:
+        """
+        Args:
+            cache_path (str): path of collected resources, data is stored under it as well
+            token (str): access token for API Hub
+            transport (TransportOptions): record, replay or redirect HTTP traffic
+            resume (bool): skip environments, connections, data stores and records completed by an interrupted run
+            concurrency (DumpConcurrency): number of connections to dump concurrently, overall, per connector type and per data store host
+        """
         self.__cache_path = cache_path
-        self.__session = init_session(token=token)
+        self.__resume = resume
+        self.__concurrency = concurrency
+        # connections are dumped concurrently over a single session, which keeps a connection pool per host
+        self.__session = init_session(token=token, transport=transport, pool_maxsize=max(DEFAULT_POOL_MAXSIZE, concurrency.workers))
         self.__data_collectors = [ConnectionsDataCollector]
+        self.__checkpoint = Checkpoint(dump_checkpoint_path(cache_path))
 
     def collect(self) -> bool:
         environment_ids = get_environment_ids(self.__cache_path)
         if len(environment_ids) == 0:
             return False
 
+        if not self.__resume:
+            self.__checkpoint.clear()
+        elif len(self.__checkpoint) > 0:
+            logger.info(f"Resuming dump, {len(self.__checkpoint)} completed units are skipped.")
+
         for env_id in get_environment_ids(self.__cache_path):
+            if self.__checkpoint.is_done(env_id):
+                continue
+
             env_dumps_root_dir = env_collected_data_path(env_id, self.__cache_path)
-            if os.path.isdir(env_dumps_root_dir):
+            if not self.__resume and os.path.isdir(env_dumps_root_dir):
                 shutil.rmtree(env_dumps_root_dir)
+            elif self.__resume and os.path.isdir(env_dumps_root_dir):
+                remove_partial_writes(env_dumps_root_dir)
 
             for data_collector in self.__data_collectors:
-                data_collector_instance = data_collector(self.__cache_path)
+                if self.__checkpoint.is_done(env_id, data_collector.__name__):
+                    continue
+                data_collector_instance = data_collector(self.__cache_path, self.__checkpoint, self.__concurrency)
                 data_collector_instance.collect(self.__session, env_id, env_dumps_root_dir)
+                self.__checkpoint.mark_done(env_id, data_collector.__name__)
+
+            self.__checkpoint.mark_done(env_id)
+
+        # a completed dump leaves nothing to resume, a later --resume run starts over instead of skipping every environment
+        self.__checkpoint.clear()
         return True
@@ -0,0 +1,15 @@
+from typing import NamedTuple
+
+from powerpwn.powerdump.utils.const import DEFAULT_DUMP_WORKERS, DEFAULT_DUMP_WORKERS_PER_CONNECTOR, DEFAULT_DUMP_WORKERS_PER_HOST
+
+
+class DumpConcurrency(NamedTuple):
+    """
+    workers: number of connections to dump concurrently
+    workers_per_connector: number of connections of the same connector type, e.g shared_sql, to dump concurrently
+    workers_per_host: number of data stores of the same host, e.g a SQL server or a storage account, to dump concurrently
+    """
+
+    workers: int = DEFAULT_DUMP_WORKERS
+    workers_per_connector: int = DEFAULT_DUMP_WORKERS_PER_CONNECTOR
+    workers_per_host: int = DEFAULT_DUMP_WORKERS_PER_HOST
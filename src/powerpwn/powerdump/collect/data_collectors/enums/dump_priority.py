@@ -0,0 +1,26 @@
+from enum import IntEnum
+from typing import Dict
+
+from powerpwn.powerdump.collect.data_collectors.enums.data_dump_type import DataDumpType
+
+
+class DumpPriority(IntEnum):
+    """
+    Order of dumps, lower first. Small and high-value records are not held back by bulk records.
+    """
+
+    high = 0
+    normal = 1
+    bulk = 2
+
+
+DATA_DUMP_TYPE_TO_PRIORITY: Dict[DataDumpType, DumpPriority] = {
+    DataDumpType.secret: DumpPriority.high,
+    DataDumpType.key: DumpPriority.high,
+    DataDumpType.queue_message: DumpPriority.high,
+    DataDumpType.email: DumpPriority.normal,
+    DataDumpType.attachment: DumpPriority.normal,
+    DataDumpType.table: DumpPriority.bulk,
+    DataDumpType.collection: DumpPriority.bulk,
+    DataDumpType.file: DumpPriority.bulk,
+}
@@ -1,10 +1,14 @@
-from typing import Any
+from datetime import datetime
+from typing import Any, Dict, Type, TypeVar
 
 from pydantic import BaseModel, Field, validator
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
 
 from powerpwn.powerdump.collect.models.base_validator import BaseEntityValidator
 from powerpwn.powerdump.utils.const import DATA_MODEL_VERSION
 
+_TEntity = TypeVar("_TEntity", bound="BaseEntity")
+
 
 # noinspection PyRedeclaration
 class BaseEntity(BaseModel):
@@ -20,3 +24,36 @@ class BaseEntity(BaseModel):
 
         validate_assignment = True
         use_enum_values = True
+
+    @classmethod
+    def parse_trusted(cls: Type[_TEntity], obj: Dict[str, Any]) -> _TEntity:
+        """
+        Parse an entity serialized by this tool, e.g a cached recon record, skipping validation.
+        Entities of another data model version, or that can not be constructed as is, are validated as usual.
+        """
+        if obj.get("data_model_version") != DATA_MODEL_VERSION:
+            return cls.parse_obj(obj)
+
+        try:
+            return cls._construct_trusted(obj)
+        except (AttributeError, TypeError, ValueError):
+            return cls.parse_obj(obj)
+
+    @classmethod
+    def _construct_trusted(cls: Type[_TEntity], obj: Dict[str, Any]) -> _TEntity:
+        values = {name: _trusted_value(field, obj[field.alias]) for name, field in cls.__fields__.items() if field.alias in obj}
+        return cls.construct(**values)
+
+
+def _trusted_value(field: ModelField, value: Any) -> Any:
+    # construct() keeps values as is, so nested entities and datetimes, which are serialized as dicts and strings, are restored here
+    if value is None:
+        return None
+    if isinstance(field.type_, type) and issubclass(field.type_, BaseEntity):
+        if field.shape == SHAPE_LIST:
+            return [field.type_._construct_trusted(item) for item in value]
+        if field.shape == SHAPE_SINGLETON:
+            return field.type_._construct_trusted(value)
+    elif field.type_ is datetime and field.shape == SHAPE_SINGLETON and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
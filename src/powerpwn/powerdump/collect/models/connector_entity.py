@@ -1,7 +1,7 @@
 import json
 from copy import deepcopy
 from datetime import datetime
-from typing import Dict
+from typing import ClassVar, Dict, Tuple
 
 import prance
 from pydantic import Field
@@ -11,6 +11,9 @@ from powerpwn.powerdump.utils.json_utils import change_obj_recu
 
 
 class Connector(ResourceEntityBase):
+    # the swagger of a connector is kept in the spec store, see SpecStore
+    BODY_FIELDS: ClassVar[Tuple[str, ...]] = ("raw_json", "swagger")
+
     api_name: str = Field(..., title="API Name")
 
     environment_id: str = Field(..., title="Environment ID")
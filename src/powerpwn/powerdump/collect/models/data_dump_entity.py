@@ -1,4 +1,5 @@
-from typing import Optional
+import threading
+from typing import Callable, Iterator, NamedTuple, Optional
 
 from pydantic import Field
 
@@ -13,6 +14,25 @@ class DataDump(BaseEntity):
     content: bytes = Field(..., title="Content in bytes")
 
 
+class DataDumpStream(NamedTuple):
+    """
+    A dump which is written to disk chunk by chunk, as its content is fetched
+    """
+
+    extension: str
+    chunks: Iterator[bytes]
+
+
+class DataDumpDownload(NamedTuple):
+    """
+    A dump which downloads itself to a given path, e.g a large file downloaded in resumable ranges.
+    The download stops early once the given event is set, and returns whether the file was downloaded.
+    """
+
+    extension: str
+    download: Callable[[str, threading.Event], bool]
+
+
 class DataDumpWithContext(BaseEntity):
     data_record: DataRecordWithContext = Field(..., title="Data record")
     data_dump: DataDump = Field(..., title="Data Dump")
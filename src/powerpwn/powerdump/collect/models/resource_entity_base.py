@@ -1,11 +1,80 @@
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Callable, ClassVar, Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import PrivateAttr
 
 from powerpwn.powerdump.collect.models.base_entity import BaseEntity
 from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
+from powerpwn.powerdump.utils.const import DATA_MODEL_VERSION
+
+_TResourceEntity = TypeVar("_TResourceEntity", bound="ResourceEntityBase")
+
+BodyLoader = Callable[[], Dict[str, Any]]
 
 
 class ResourceEntityBase(BaseEntity):
+    # heavy fields, which are stored apart from the rest of the entity and loaded on first access
+    BODY_FIELDS: ClassVar[Tuple[str, ...]] = ("raw_json",)
+
     entity_type: ResourceType
     display_name: Optional[str] = None
     entity_id: str
     raw_json: Dict[str, Any]
+
+    _body_loader: Optional[BodyLoader] = PrivateAttr(default=None)
+    # entities of the catalog are shared between threads, e.g dump workers and the GUI, the body is loaded by one of them
+    _body_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def parse_header(cls: Type[_TResourceEntity], header: Dict[str, Any], body_loader: BodyLoader) -> _TResourceEntity:
+        """
+        Parse an entity serialized by this tool without its body fields, which are loaded by body_loader on first access.
+        Entities of another data model version, or that can not be constructed as is, are loaded in full and validated as usual.
+
+        Args:
+            header (Dict[str, Any]): serialized entity, without its body fields
+            body_loader (BodyLoader): returns the body fields of the entity
+        """
+        if header.get("data_model_version") == DATA_MODEL_VERSION:
+            try:
+                entity = cls._construct_trusted(header)
+                entity._body_loader = body_loader
+                return entity
+            except (AttributeError, TypeError, ValueError):
+                pass
+        return cls.parse_obj({**header, **body_loader()})
+
+    def __getattr__(self, name: str) -> Any:
+        if name in type(self).BODY_FIELDS:
+            # the body may be loaded by another thread right after this attribute was found missing
+            self._load_body()
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _load_body(self) -> bool:
+        """
+        Load the body fields of an entity parsed by parse_header, if not loaded yet
+
+        Returns:
+            bool: whether body fields were loaded by this call
+        """
+        if self._body_loader is None:
+            return False
+        with self._body_lock:
+            body_loader = self._body_loader
+            if body_loader is None:
+                return False
+            body = body_loader()
+            for name in type(self).BODY_FIELDS:
+                if name in body:
+                    self.__dict__[name] = body[name]
+                    self.__fields_set__.add(name)
+            # cleared last, threads that see no loader see the loaded body fields
+            self._body_loader = None
+        return True
+
+    def _iter(self, *args: Any, **kwargs: Any) -> Any:
+        # dict(), json() and comparisons see the full entity
+        self._load_body()
+        return super()._iter(*args, **kwargs)
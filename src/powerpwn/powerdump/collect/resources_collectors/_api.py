@@ -1,7 +1,9 @@
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Dict, Generator, List
 
 import requests
 
+from powerpwn.powerdump.utils.requests_wrapper import next_page_kwargs, send_request
+
 
 def list_connectors(session: requests.Session, environment_id: str) -> Generator[Dict[str, Any], None, None]:
     yield from __paginate(
@@ -13,7 +15,9 @@ def list_connectors(session: requests.Session, environment_id: str) -> Generator
 
 
 def get_connector(session: requests.Session, environment_id: str, connector_id: str):
-    resp = session.get(
+    resp = send_request(
+        session,
+        method="get",
         url=f"https://api.powerapps.com/providers/Microsoft.PowerApps/apis/{connector_id}",
         params={"api-version": "2016-11-01", "$filter": f"environment eq '{environment_id}'"},
     )
@@ -52,7 +56,9 @@ def list_canvas_app_rbac(session: requests.Session, app_id: str, environment_id:
 
 
 def list_environments(session: requests.Session) -> List[str]:
-    resp = session.get(url="https://api.powerapps.com/providers/Microsoft.PowerApps/environments", params={"api-version": "2016-11-01"})
+    resp = send_request(
+        session, method="get", url="https://api.powerapps.com/providers/Microsoft.PowerApps/environments", params={"api-version": "2016-11-01"}
+    )
     if resp.status_code != 200:
         raise RuntimeError(f"Got status code {resp.status_code} for list_environments: {str(resp.content)}.")
 
@@ -60,23 +66,19 @@ def list_environments(session: requests.Session) -> List[str]:
     return environment_ids
 
 
-def __paginate(
-    session: requests.Session, url: str, params: Dict[str, str], endpoint: str, next_link: Optional[str] = None
-) -> Generator[Dict[str, Any], None, None]:
-    params_to_query = params
-    url_to_query = url
-
-    if next_link:
-        params_to_query = {}
-        url_to_query = next_link
-
-    resp = session.get(url=url_to_query, params=params_to_query)
-    if resp.status_code != 200:
-        raise RuntimeError(f"Got status code {resp.status_code} for {endpoint}: {str(resp.content)}.")
+def __paginate(session: requests.Session, url: str, params: Dict[str, str], endpoint: str) -> Generator[Dict[str, Any], None, None]:
+    request_kwargs: Dict[str, Any] = {"url": url, "params": params}
+    next_link = None
 
-    res = resp.json()
+    while True:
+        resp = send_request(session, method="get", **request_kwargs)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Got status code {resp.status_code} for {endpoint}: {str(resp.content)}.")
 
-    yield from res["value"]
+        res = resp.json()
+        yield from res["value"]
 
-    if "nextLink" in res:
-        yield from __paginate(session, url, params, endpoint, res["nextLink"])
+        if res.get("nextLink") in (None, next_link):
+            return
+        next_link = res["nextLink"]
+        request_kwargs = next_page_kwargs(request_kwargs, "nextLink", next_link)
@@ -1,87 +1,131 @@
 import logging
-from typing import Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Generator, List, Optional
 
 import requests
 
-from powerpwn.cli.const import LOGGER_NAME
+from powerpwn.cli.const import LOGGER_NAME, TOOL_NAME
 from powerpwn.powerdump.collect.models.canvas_app_entity import CanvasApp
 from powerpwn.powerdump.collect.models.principal_entity import Principal
 from powerpwn.powerdump.collect.resources_collectors._api import list_canvas_app_rbac, list_canvas_apps
 from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
 from powerpwn.powerdump.collect.resources_collectors.iresource_collector import IResourceCollector
+from powerpwn.powerdump.collect.resources_collectors.recon_manifest import ReconManifest
+from powerpwn.powerdump.utils.concurrency import ordered_map
 
 logger = logging.getLogger(LOGGER_NAME)
 
+DEFAULT_RBAC_WORKERS = 8
+
 
 class CanvasAppsCollector(IResourceCollector):
+    def __init__(self, max_workers: int = DEFAULT_RBAC_WORKERS, manifest: Optional[ReconManifest] = None) -> None:
+        self.__max_workers = max_workers
+        self.__manifest = manifest
+
     def collect(self, session: requests.Session, environment_id: str) -> Generator[CanvasApp, None, None]:
         total_canvas_apps = 0
+        total_unchanged_canvas_apps = 0
         total_widely_shared_canvas_apps = 0
-        for canvas_app in list_canvas_apps(session, environment_id):
-            total_canvas_apps += 1
-            rbacs = list(list_canvas_app_rbac(session, canvas_app["name"], environment_id))
-            if any(rbac.get("properties", {}).get("principal", {}).get("type", "NOT_TENANT") == "Tenant" for rbac in rbacs):
-                total_widely_shared_canvas_apps += 1
-                principals = []
-                for rbac in rbacs:
-                    if rbac["properties"]["principal"]["type"] == "Tenant":
-                        principals.append(
-                            Principal(
-                                entity_type=ResourceType.principal,
-                                entity_id=rbac["properties"]["principal"].get("tenantId"),
-                                principal_id=rbac["properties"]["principal"].get("tenantId"),
-                                type=rbac["properties"]["principal"].get("type"),
-                                tenant_id=rbac["properties"]["principal"].get("tenantId"),
-                                raw_json=rbac,
-                                display_name=rbac["properties"]["principal"].get("tenantId"),
-                            )
-                        )
-                    else:
-                        principals.append(
-                            Principal(
-                                entity_type=ResourceType.principal,
-                                entity_id=rbac["properties"]["principal"].get("id"),
-                                principal_id=rbac["properties"]["principal"].get("id"),
-                                type=rbac["properties"]["principal"].get("type"),
-                                tenant_id=rbac["properties"]["principal"].get("tenantId", "N/A"),
-                                display_name=rbac["properties"]["principal"].get("displayName"),
-                                email=rbac["properties"]["principal"].get("email"),
-                                upn=rbac["properties"]["principal"].get("email"),
-                                raw_json=rbac,
-                            )
-                        )
-
-                created_by = Principal(
-                    entity_type=ResourceType.principal,
-                    entity_id=canvas_app["properties"]["createdBy"].get("id"),
-                    principal_id=canvas_app["properties"]["createdBy"].get("id"),
-                    type=canvas_app["properties"]["createdBy"].get("type"),
-                    tenant_id=canvas_app["properties"]["createdBy"].get("tenantId", "N/A"),
-                    display_name=canvas_app["properties"]["createdBy"].get("displayName"),
-                    email=canvas_app["properties"]["createdBy"].get("email"),
-                    upn=canvas_app["properties"]["createdBy"].get("userPrincipalName"),
-                    raw_json=canvas_app["properties"]["createdBy"],
-                )
 
-                run_url = canvas_app["properties"]["appPlayUri"]
-                version = canvas_app["properties"]["appVersion"]
-                environment_id = canvas_app["properties"]["environment"]["name"].replace("default", "Default")
-
-                yield CanvasApp(
-                    raw_json=canvas_app,
-                    display_name=canvas_app["properties"]["displayName"],
-                    created_by=created_by,
-                    created_at=canvas_app["properties"]["createdTime"],
-                    last_modified_at=canvas_app["properties"]["lastModifiedTime"],
-                    run_url=run_url,
-                    version=version,
-                    permissions=principals,
-                    entity_id=canvas_app["name"],
-                    environment_id=environment_id,
-                    entity_type=ResourceType.canvas_app,
-                )
+        def _changed_canvas_apps() -> Generator[Dict[str, Any], None, None]:
+            nonlocal total_canvas_apps, total_unchanged_canvas_apps
+            for canvas_app in list_canvas_apps(session, environment_id):
+                total_canvas_apps += 1
+                if self.__manifest and self.__manifest.is_unchanged(ResourceType.canvas_app, canvas_app["name"], self.__last_modified(canvas_app)):
+                    self.__manifest.keep(ResourceType.canvas_app, canvas_app["name"])
+                    total_unchanged_canvas_apps += 1
+                    continue
+                yield canvas_app
+
+        def _list_rbac(canvas_app: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return list(list_canvas_app_rbac(session, canvas_app["name"], environment_id))
+
+        # permissions are fetched concurrently while apps are still being listed, apps are yielded in listing order
+        with ThreadPoolExecutor(max_workers=self.__max_workers, thread_name_prefix=f"{TOOL_NAME}-rbac") as executor:
+            canvas_apps_with_rbacs = ordered_map(_list_rbac, _changed_canvas_apps(), executor, max_in_flight=2 * self.__max_workers)
+            for canvas_app, rbacs in canvas_apps_with_rbacs:
+                parsed_canvas_app = self.__parse_widely_shared_canvas_app(canvas_app, rbacs)
+                if self.__manifest:
+                    self.__manifest.update(
+                        ResourceType.canvas_app, canvas_app["name"], self.__last_modified(canvas_app), stored=parsed_canvas_app is not None
+                    )
+                if parsed_canvas_app is not None:
+                    total_widely_shared_canvas_apps += 1
+                    yield parsed_canvas_app
+
+        unchanged_message = f" ({total_unchanged_canvas_apps} unchanged since last recon)" if total_unchanged_canvas_apps else ""
         logger.info(
             f"Found {total_widely_shared_canvas_apps} widely shared applications out of {total_canvas_apps} canvas apps in environment {environment_id}"
+            + unchanged_message
+        )
+
+    @staticmethod
+    def __last_modified(canvas_app: Dict[str, Any]) -> Optional[str]:
+        return canvas_app["properties"].get("lastModifiedTime")
+
+    @staticmethod
+    def __parse_widely_shared_canvas_app(canvas_app: Dict[str, Any], rbacs: List[Dict[str, Any]]) -> Optional[CanvasApp]:
+        if not any(rbac.get("properties", {}).get("principal", {}).get("type", "NOT_TENANT") == "Tenant" for rbac in rbacs):
+            return None
+
+        principals = []
+        for rbac in rbacs:
+            if rbac["properties"]["principal"]["type"] == "Tenant":
+                principals.append(
+                    Principal(
+                        entity_type=ResourceType.principal,
+                        entity_id=rbac["properties"]["principal"].get("tenantId"),
+                        principal_id=rbac["properties"]["principal"].get("tenantId"),
+                        type=rbac["properties"]["principal"].get("type"),
+                        tenant_id=rbac["properties"]["principal"].get("tenantId"),
+                        raw_json=rbac,
+                        display_name=rbac["properties"]["principal"].get("tenantId"),
+                    )
+                )
+            else:
+                principals.append(
+                    Principal(
+                        entity_type=ResourceType.principal,
+                        entity_id=rbac["properties"]["principal"].get("id"),
+                        principal_id=rbac["properties"]["principal"].get("id"),
+                        type=rbac["properties"]["principal"].get("type"),
+                        tenant_id=rbac["properties"]["principal"].get("tenantId", "N/A"),
+                        display_name=rbac["properties"]["principal"].get("displayName"),
+                        email=rbac["properties"]["principal"].get("email"),
+                        upn=rbac["properties"]["principal"].get("email"),
+                        raw_json=rbac,
+                    )
+                )
+
+        created_by = Principal(
+            entity_type=ResourceType.principal,
+            entity_id=canvas_app["properties"]["createdBy"].get("id"),
+            principal_id=canvas_app["properties"]["createdBy"].get("id"),
+            type=canvas_app["properties"]["createdBy"].get("type"),
+            tenant_id=canvas_app["properties"]["createdBy"].get("tenantId", "N/A"),
+            display_name=canvas_app["properties"]["createdBy"].get("displayName"),
+            email=canvas_app["properties"]["createdBy"].get("email"),
+            upn=canvas_app["properties"]["createdBy"].get("userPrincipalName"),
+            raw_json=canvas_app["properties"]["createdBy"],
+        )
+
+        run_url = canvas_app["properties"]["appPlayUri"]
+        version = canvas_app["properties"]["appVersion"]
+        environment_id = canvas_app["properties"]["environment"]["name"].replace("default", "Default")
+
+        return CanvasApp(
+            raw_json=canvas_app,
+            display_name=canvas_app["properties"]["displayName"],
+            created_by=created_by,
+            created_at=canvas_app["properties"]["createdTime"],
+            last_modified_at=canvas_app["properties"]["lastModifiedTime"],
+            run_url=run_url,
+            version=version,
+            permissions=principals,
+            entity_id=canvas_app["name"],
+            environment_id=environment_id,
+            entity_type=ResourceType.canvas_app,
         )
 
     def resource_type(self) -> ResourceType:
@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Generator, List
+from typing import Callable, Dict, Generator, List, Optional
 
 import requests
 
@@ -9,13 +9,27 @@ from powerpwn.powerdump.collect.models.principal_entity import Principal
 from powerpwn.powerdump.collect.resources_collectors._api import list_connections
 from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
 from powerpwn.powerdump.collect.resources_collectors.iresource_collector import IResourceCollector
+from powerpwn.powerdump.collect.resources_collectors.recon_manifest import ReconManifest
 
 logger = logging.getLogger(LOGGER_NAME)
 
 
 class ConnectionsCollector(IResourceCollector):
-    def __init__(self, connector_id_to_connection_ids: Dict[str, List[str]]) -> None:
+    def __init__(
+        self,
+        connector_id_to_connection_ids: Dict[str, List[str]],
+        on_new_connector_id: Optional[Callable[[str], None]] = None,
+        manifest: Optional[ReconManifest] = None,
+    ) -> None:
+        """
+        Args:
+            connector_id_to_connection_ids (Dict[str, List[str]]): filled in with the connections found for every connector
+            on_new_connector_id (Optional[Callable[[str], None]]): called as soon as a connection of a new connector is found
+            manifest (Optional[ReconManifest]): connections seen by the last run, unchanged connections are not parsed again
+        """
         self.__connector_id_to_connection_ids = connector_id_to_connection_ids
+        self.__on_new_connector_id = on_new_connector_id
+        self.__manifest = manifest
 
     def collect(self, session: requests.Session, environment_id: str) -> Generator[Connection, None, None]:
         total_connections_count = 0
@@ -24,13 +38,22 @@ class ConnectionsCollector(IResourceCollector):
 
         for raw_connection in raw_connections:
             total_connections_count += 1
+            last_modified = raw_connection["properties"].get("lastModifiedTime")
             if raw_connection["properties"]["apiId"] != "/providers/Microsoft.PowerApps/apis/shared_logicflows" and (
                 raw_connection["properties"]["statuses"][0]["status"] != "Connected"
             ):
                 # ignore non-active or non shareable connections, other than Logic Flows
+                if self.__manifest:
+                    self.__manifest.update(ResourceType.connection, raw_connection["name"], last_modified, stored=False)
                 continue
 
             active_shareable_connections_count += 1
+            connector_id = raw_connection["properties"]["apiId"].replace("/providers/Microsoft.PowerApps/apis/", "")
+            if self.__manifest and self.__manifest.is_unchanged(ResourceType.connection, raw_connection["name"], last_modified):
+                self.__manifest.keep(ResourceType.connection, raw_connection["name"])
+                self.__add_connection(connector_id, raw_connection["name"])
+                continue
+
             principal = Principal(
                 entity_type=ResourceType.principal,
                 entity_id=raw_connection["properties"]["createdBy"].get("id"),
@@ -55,7 +78,7 @@ class ConnectionsCollector(IResourceCollector):
                 connection_id=raw_connection["name"],
                 display_name=raw_connection["properties"]["displayName"],
                 is_valid=all([status_obj["status"] == "Connected" for status_obj in raw_connection["properties"]["statuses"]]),
-                connector_id=raw_connection["properties"]["apiId"].replace("/providers/Microsoft.PowerApps/apis/", ""),
+                connector_id=connector_id,
                 api_id=raw_connection["properties"]["apiId"],
                 icon_uri=raw_connection["properties"]["iconUri"],
                 environment_id=raw_connection["properties"]["environment"]["id"]
@@ -72,14 +95,19 @@ class ConnectionsCollector(IResourceCollector):
                 raw_json=raw_connection,
             )
 
-            self.__connector_id_to_connection_ids[connection.connector_id] = self.__connector_id_to_connection_ids.get(
-                connection.connector_id, []
-            ) + [connection.connection_id]
+            self.__add_connection(connection.connector_id, connection.connection_id)
+            if self.__manifest:
+                self.__manifest.update(ResourceType.connection, connection.connection_id, last_modified, stored=True)
 
             yield connection
         logger.info(
             f"Found {active_shareable_connections_count} active shareable connections out of {total_connections_count} connections in environment {environment_id}"
         )
 
+    def __add_connection(self, connector_id: str, connection_id: str) -> None:
+        if connector_id not in self.__connector_id_to_connection_ids and self.__on_new_connector_id is not None:
+            self.__on_new_connector_id(connector_id)
+        self.__connector_id_to_connection_ids[connector_id] = self.__connector_id_to_connection_ids.get(connector_id, []) + [connection_id]
+
     def resource_type(self) -> ResourceType:
         return ResourceType.connection
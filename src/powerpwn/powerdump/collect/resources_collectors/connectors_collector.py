@@ -1,5 +1,6 @@
 import logging
-from typing import Dict, Generator, List
+from concurrent.futures import Executor, Future
+from typing import Any, Dict, Generator, List, Optional
 
 import requests
 
@@ -8,27 +9,61 @@ from powerpwn.powerdump.collect.models.connector_entity import Connector
 from powerpwn.powerdump.collect.resources_collectors._api import get_connector
 from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
 from powerpwn.powerdump.collect.resources_collectors.iresource_collector import IResourceCollector
+from powerpwn.powerdump.collect.resources_collectors.recon_manifest import ReconManifest
 from powerpwn.powerdump.utils.const import SPEC_JWT_NAME
 
 logger = logging.getLogger(LOGGER_NAME)
 
+DEFAULT_SPEC_WORKERS = 4
+
 
 class ConnectorsCollector(IResourceCollector):
-    def __init__(self, connector_id_to_connection_ids: Dict[str, List[str]]) -> None:
+    def __init__(
+        self,
+        connector_id_to_connection_ids: Dict[str, List[str]],
+        executor: Optional[Executor] = None,
+        manifest: Optional[ReconManifest] = None,
+        connector_id_to_changed_time: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None:
+        """
+        Args:
+            connector_id_to_connection_ids (Dict[str, List[str]]): connectors to collect, filled in by ConnectionsCollector
+            executor (Optional[Executor]): executor to prefetch connector specs on, specs are fetched on collect if not provided
+            manifest (Optional[ReconManifest]): connectors seen by the last run, specs of unchanged connectors are not fetched again
+            connector_id_to_changed_time (Optional[Dict[str, Optional[str]]]): changedTime of connectors in the environment listing
+        """
         self.__connector_id_to_connection_ids = connector_id_to_connection_ids
+        self.__executor = executor
+        self.__manifest = manifest
+        self.__connector_id_to_changed_time = connector_id_to_changed_time or dict()
+        self.__prefetched: Dict[str, "Future[Dict[str, Any]]"] = dict()
+
+    def prefetch(self, session: requests.Session, environment_id: str, connector_id: str) -> None:
+        """
+        Start fetching a connector spec in the background, so that it is ready by the time collect reaches it
+        """
+        if self.__executor is not None and connector_id not in self.__prefetched and not self.__is_unchanged(connector_id):
+            self.__prefetched[connector_id] = self.__executor.submit(self.__fetch_connector, session, environment_id, connector_id)
 
     def collect(self, session: requests.Session, environment_id: str) -> Generator[Connector, None, None]:
         for connector_id in self.__connector_id_to_connection_ids:
-            logger.info(f"Fetching OpenAPI spec for connector {connector_id}.")
+            if self.__is_unchanged(connector_id):
+                self.__keep(connector_id)
+                continue
 
             try:
-                connector = get_connector(session, environment_id=environment_id, connector_id=connector_id)
+                if (prefetched := self.__prefetched.pop(connector_id, None)) is not None:
+                    connector = prefetched.result()
+                else:
+                    connector = self.__fetch_connector(session, environment_id, connector_id)
             except RuntimeError as e:
                 if "403" in str(e):
                     logger.warning(f"User doesn't have access to custom connector spec for connector_id={connector_id}. Skipping spec.")
+                    self.__keep(connector_id)
                     continue
                 elif "400" in str(e):
                     logger.error(f"Failed to get connector {connector_id} for connection {self.__connector_id_to_connection_ids[connector_id]}")
+                    self.__keep(connector_id)
                     continue
                 raise e
 
@@ -59,7 +94,25 @@ class ConnectorsCollector(IResourceCollector):
                 raw_json=connector,
             )
 
+            if self.__manifest:
+                self.__manifest.update(ResourceType.connector, connector_id, connector["properties"]["changedTime"], stored=True)
+
             yield spec
 
+    def __is_unchanged(self, connector_id: str) -> bool:
+        return self.__manifest is not None and self.__manifest.is_unchanged(
+            ResourceType.connector, connector_id, self.__connector_id_to_changed_time.get(connector_id)
+        )
+
+    def __keep(self, connector_id: str) -> None:
+        # a record cached by an earlier run is kept as is
+        if self.__manifest:
+            self.__manifest.keep(ResourceType.connector, connector_id)
+
+    @staticmethod
+    def __fetch_connector(session: requests.Session, environment_id: str, connector_id: str) -> Dict[str, Any]:
+        logger.info(f"Fetching OpenAPI spec for connector {connector_id} in environment {environment_id}.")
+        return get_connector(session, environment_id=environment_id, connector_id=connector_id)
+
     def resource_type(self) -> ResourceType:
         return ResourceType.connector
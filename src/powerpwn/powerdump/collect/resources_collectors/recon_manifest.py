@@ -0,0 +1,101 @@
+import datetime
+import json
+import logging
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from powerpwn.cli.const import LOGGER_NAME
+from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
+from powerpwn.powerdump.utils.file_utils import write_atomic
+from powerpwn.powerdump.utils.path_utils import env_manifest_path
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class ManifestEntry(NamedTuple):
+    last_modified: Optional[str]
+    # whether a record was cached for the entity, e.g canvas apps which are not widely shared are listed but never stored
+    stored: bool
+    deleted_at: Optional[str] = None
+
+
+class ReconManifest:
+    """
+    The entities of an environment seen by the last recon run, with their lastModifiedTime / changedTime.
+    In incremental mode, entities that did not change since the last run are neither re-fetched nor re-written.
+    Entities that are no longer listed are tombstoned.
+    """
+
+    def __init__(self, cache_path: str, environment_id: str, incremental: bool = False) -> None:
+        self.__path = env_manifest_path(environment_id, cache_path)
+        self.__environment_id = environment_id
+        self.__incremental = incremental
+        self.__previous = self.__load()
+        self.__current: Dict[str, Dict[str, ManifestEntry]] = {entity_type.value: dict() for entity_type in ResourceType}
+
+    @property
+    def incremental(self) -> bool:
+        return self.__incremental
+
+    def is_unchanged(self, entity_type: ResourceType, entity_id: str, last_modified: Optional[str]) -> bool:
+        """
+        Whether an entity can be skipped, i.e incremental mode is on and the entity was not modified since the last run
+        """
+        if not self.__incremental or last_modified is None:
+            return False
+        previous = self.__previous[entity_type.value].get(entity_id)
+        return previous is not None and previous.deleted_at is None and previous.last_modified == last_modified
+
+    def keep(self, entity_type: ResourceType, entity_id: str) -> None:
+        """
+        Mark an entity as seen in this run, keeping the state of the last run
+        """
+        if (previous := self.__previous[entity_type.value].get(entity_id)) is not None and previous.deleted_at is None:
+            self.__current[entity_type.value][entity_id] = previous
+
+    def update(self, entity_type: ResourceType, entity_id: str, last_modified: Optional[str], stored: bool) -> None:
+        self.__current[entity_type.value][entity_id] = ManifestEntry(last_modified=last_modified, stored=stored)
+
+    def stale_records(self, entity_type: ResourceType) -> List[str]:
+        """
+        Ids of entities that had a record cached by the last run, but should not have one anymore
+        """
+        current = self.__current[entity_type.value]
+        return [
+            entity_id
+            for entity_id, previous in self.__previous[entity_type.value].items()
+            if previous.stored and previous.deleted_at is None and (entity_id not in current or not current[entity_id].stored)
+        ]
+
+    def save(self) -> None:
+        """
+        Persist the entities seen in this run, entities which were not seen are tombstoned
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        entities: Dict[str, Dict[str, Any]] = dict()
+        for entity_type, current in self.__current.items():
+            tombstones = {
+                entity_id: previous if previous.deleted_at else previous._replace(stored=False, deleted_at=now)
+                for entity_id, previous in self.__previous[entity_type].items()
+                if entity_id not in current
+            }
+            entities[entity_type] = {entity_id: entry._asdict() for entity_id, entry in {**tombstones, **current}.items()}
+
+        os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        write_atomic(self.__path, json.dumps({"environment_id": self.__environment_id, "updated_at": now, "entities": entities}).encode())
+
+    def __load(self) -> Dict[str, Dict[str, ManifestEntry]]:
+        previous: Dict[str, Dict[str, ManifestEntry]] = {entity_type.value: dict() for entity_type in ResourceType}
+        if not os.path.exists(self.__path):
+            return previous
+
+        try:
+            with open(self.__path, "r") as fp:
+                manifest = json.load(fp)
+        except (OSError, json.decoder.JSONDecodeError):
+            logger.warning(f"Ignoring unreadable recon manifest {self.__path}, environment {self.__environment_id} is collected in full.")
+            return previous
+
+        for entity_type, entries in manifest.get("entities", {}).items():
+            previous.setdefault(entity_type, dict()).update({entity_id: ManifestEntry(**entry) for entity_id, entry in entries.items()})
+        return previous
@@ -1,54 +1,137 @@
+import itertools
 import logging
-import os.path
-from typing import Dict, Generator, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Generator, List, Optional
 
-from powerpwn.cli.const import LOGGER_NAME
+from powerpwn.cli.const import LOGGER_NAME, TOOL_NAME
 from powerpwn.powerdump.collect.models.resource_entity_base import ResourceEntityBase
-from powerpwn.powerdump.collect.resources_collectors._api import list_environments
-from powerpwn.powerdump.collect.resources_collectors.canvas_apps_collector import CanvasAppsCollector
+from powerpwn.powerdump.collect.resources_collectors._api import list_connectors, list_environments
+from powerpwn.powerdump.collect.resources_collectors.canvas_apps_collector import DEFAULT_RBAC_WORKERS, CanvasAppsCollector
 from powerpwn.powerdump.collect.resources_collectors.connections_collector import ConnectionsCollector
-from powerpwn.powerdump.collect.resources_collectors.connectors_collector import ConnectorsCollector
+from powerpwn.powerdump.collect.resources_collectors.connectors_collector import DEFAULT_SPEC_WORKERS, ConnectorsCollector
 from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
-from powerpwn.powerdump.utils.const import DATA_MODEL_FILE_EXTENSION
-from powerpwn.powerdump.utils.path_utils import env_entity_type_path
-from powerpwn.powerdump.utils.requests_wrapper import init_session
+from powerpwn.powerdump.collect.resources_collectors.recon_manifest import ReconManifest
+from powerpwn.powerdump.utils.checkpoint import Checkpoint
+from powerpwn.powerdump.utils.const import DEFAULT_RECON_WORKERS
+from powerpwn.powerdump.utils.entity_store import EntityRecord, EntityStoreType, open_entity_store
+from powerpwn.powerdump.utils.path_utils import http_cache_path, recon_checkpoint_path
+from powerpwn.powerdump.utils.requests_wrapper import DEFAULT_POOL_MAXSIZE, TransportOptions, init_session
+from powerpwn.powerdump.utils.spec_store import SpecStore
 
 logger = logging.getLogger(LOGGER_NAME)
 
+# entities are written to the store in batches, every batch in a single transaction
+WRITE_BATCH_SIZE = 500
+
 
 class ResourcesCollector:
     """
     A Class to collect resources and cache them in provided cache path
     """
 
-    def __init__(self, cache_path: str, token: str) -> None:
+    def __init__(
+        self,
+        cache_path: str,
+        token: str,
+        transport: TransportOptions = TransportOptions(),
+        workers: int = DEFAULT_RECON_WORKERS,
+        incremental: bool = False,
+        resume: bool = False,
+        store: EntityStoreType = EntityStoreType.json,
+    ) -> None:
+        """
+        Args:
+            cache_path (str): path to cache collected resources in
+            token (str): access token for Power Platform APIs
+            transport (TransportOptions): record, replay or redirect HTTP traffic
+            workers (int): number of environments to collect concurrently
+            incremental (bool): only fetch and re-write entities that changed since the last recon of the same cache path
+            resume (bool): skip environments completed by an interrupted run
+            store (EntityStoreType): store to cache entities in, a JSON file per entity or a single SQLite database
+        """
+        if workers < 1:
+            raise ValueError(f"workers should be a positive integer, got {workers}.")
+
         self.__cache_path = cache_path
-        self.__session = init_session(token=token)
-        self.__collectors = [CanvasAppsCollector, ConnectionsCollector, ConnectorsCollector]
+        self.__workers = workers
+        self.__incremental = incremental
+        self.__resume = resume
+        self.__checkpoint = Checkpoint(recon_checkpoint_path(cache_path))
+        self.__spec_store = SpecStore(cache_path)
+        self.__entity_store = open_entity_store(cache_path, store)
+        # every environment worker fetches canvas app permissions on its own pool
+        pool_maxsize = max(DEFAULT_POOL_MAXSIZE, workers * DEFAULT_RBAC_WORKERS)
+        self.__session = init_session(token=token, http_cache_path=http_cache_path(cache_path), transport=transport, pool_maxsize=pool_maxsize)
 
     def collect_and_cache(self) -> None:
         """
-        Collect resources and store them in cache
-
-        Args:
-            cache_path (str): cache path to store resources
+        Collect resources and store them in cache.
+        Environments share no state, so up to `workers` environments are collected concurrently.
         """
         environment_ids = list_environments(self.__session)
         logger.info(f"Found {len(environment_ids)} environments.")
 
-        for env_id in environment_ids:
-            connector_id_to_connection_ids: Dict[str, List[str]] = dict()
-            for collector in self.__collectors:
-                if collector in (ConnectionsCollector, ConnectorsCollector):
-                    collector_instance = collector(connector_id_to_connection_ids)
-                else:
-                    collector_instance = collector()
-                self._cache_entities(collector_instance.collect(self.__session, env_id), collector_instance.resource_type(), env_id)
+        if not self.__resume:
+            self.__checkpoint.clear()
+        elif completed_environment_ids := [env_id for env_id in environment_ids if self.__checkpoint.is_done(env_id)]:
+            logger.info(f"Resuming recon, {len(completed_environment_ids)} completed environments are skipped.")
+            environment_ids = [env_id for env_id in environment_ids if env_id not in completed_environment_ids]
+
+        with ThreadPoolExecutor(max_workers=self.__workers, thread_name_prefix=f"{TOOL_NAME}-recon") as executor:
+            env_id_futures = {executor.submit(self._collect_environment, env_id): env_id for env_id in environment_ids}
+            for completed, future in enumerate(as_completed(env_id_futures), start=1):
+                future.result()
+                self.__checkpoint.mark_done(env_id_futures[future])
+                logger.info(f"Recon of environment {env_id_futures[future]} is completed ({completed}/{len(environment_ids)}).")
+
+        # a completed recon leaves nothing to resume, a later --resume run starts over instead of skipping every environment
+        self.__checkpoint.clear()
+
+    def _collect_environment(self, env_id: str) -> None:
+        manifest = ReconManifest(self.__cache_path, env_id, incremental=self.__incremental)
+
+        canvas_apps_collector = CanvasAppsCollector(manifest=manifest)
+        self._cache_entities(canvas_apps_collector.collect(self.__session, env_id), canvas_apps_collector.resource_type(), env_id)
+
+        # connector specs are fetched as soon as their first connection is listed, while the connection listing goes on
+        connector_id_to_connection_ids: Dict[str, List[str]] = dict()
+        with ThreadPoolExecutor(max_workers=DEFAULT_SPEC_WORKERS, thread_name_prefix=f"{TOOL_NAME}-specs") as executor:
+            connectors_collector = ConnectorsCollector(
+                connector_id_to_connection_ids,
+                executor=executor,
+                manifest=manifest,
+                connector_id_to_changed_time=self.__list_connector_changed_times(env_id) if manifest.incremental else None,
+            )
+            connections_collector = ConnectionsCollector(
+                connector_id_to_connection_ids,
+                on_new_connector_id=lambda connector_id: connectors_collector.prefetch(self.__session, env_id, connector_id),
+                manifest=manifest,
+            )
+            self._cache_entities(connections_collector.collect(self.__session, env_id), connections_collector.resource_type(), env_id)
+            self._cache_entities(connectors_collector.collect(self.__session, env_id), connectors_collector.resource_type(), env_id)
+
+        for entity_type in (ResourceType.canvas_app, ResourceType.connection, ResourceType.connector):
+            self.__remove_stale_records(manifest.stale_records(entity_type), entity_type, env_id)
+        manifest.save()
+
+    def __list_connector_changed_times(self, env_id: str) -> Dict[str, Optional[str]]:
+        # a single listing call tells which connector specs changed, instead of fetching every spec
+        try:
+            return {connector["name"]: connector.get("properties", {}).get("changedTime") for connector in list_connectors(self.__session, env_id)}
+        except RuntimeError as e:
+            logger.warning(f"Failed to list connectors in environment {env_id}, all connector specs are fetched. {e}")
+            return dict()
+
+    def __remove_stale_records(self, entity_ids: List[str], entity_type: ResourceType, env_id: str) -> None:
+        if entity_ids:
+            self.__entity_store.remove(env_id, entity_type, entity_ids)
+            logger.info(f"Removed {len(entity_ids)} stale {entity_type.value} records of environment {env_id}.")
 
     def _cache_entities(self, entities: Generator[ResourceEntityBase, None, None], entity_type: ResourceType, env_id: str) -> None:
-        dir_name = env_entity_type_path(env_id, entity_type, self.__cache_path)
-        os.makedirs(dir_name, exist_ok=True)
-        for entity in entities:
-            file_path = os.path.join(dir_name, entity.entity_id + DATA_MODEL_FILE_EXTENSION)
-            with open(file_path, "w") as fp:
-                fp.write(entity.json())
+        while True:
+            # connector specs are stored once per tenant, see SpecStore
+            batch = [EntityRecord.of(entity, self.__spec_store) for entity in itertools.islice(entities, WRITE_BATCH_SIZE)]
+            # an environment with no entities of a type is still written, so that it is listed
+            self.__entity_store.write(env_id, entity_type, batch)
+            if len(batch) < WRITE_BATCH_SIZE:
+                break
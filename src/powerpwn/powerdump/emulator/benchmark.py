@@ -0,0 +1,243 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from flask import Flask
+
+from powerpwn.powerdump.collect.data_collectors.data_collector import DataCollector
+from powerpwn.powerdump.collect.resources_collectors.resources_collector import ResourcesCollector
+from powerpwn.powerdump.emulator.server import EmulatorServer
+from powerpwn.powerdump.emulator.synthetic_tenant import CONNECTOR_IDS, SyntheticTenant
+from powerpwn.powerdump.gui.gui import Gui
+from powerpwn.powerdump.gui.prep import register_specs
+from powerpwn.powerdump.utils import model_loaders, requests_wrapper
+from powerpwn.powerdump.utils.entity_store import EntityStoreType
+from powerpwn.powerdump.utils.rate_limiter import RateLimiter
+from powerpwn.powerdump.utils.requests_wrapper import TransportOptions
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+DEFAULT_OUTPUT_PATH = "benchmark_results.json"
+ENTITIES_PER_ENVIRONMENT = 1_000
+EMULATED_TOKEN = "emulated"  # nosec
+
+# the emulator never throttles, an unbounded burst keeps the rate limiter from dominating the measurements
+UNTHROTTLED_BURST = 10**9
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    scale: int
+    seconds: float
+    peak_memory_bytes: Optional[int]
+    items: int
+
+
+def tenant_for_scale(entities: int, records_per_connection: int = 1) -> SyntheticTenant:
+    """
+    A synthetic tenant with roughly the given number of entities, spread across environments of up to ENTITIES_PER_ENVIRONMENT entities
+
+    Args:
+        entities (int): total number of connections, canvas apps and connectors
+        records_per_connection (int): number of data records to dump per connection
+    """
+    environments = max(1, math.ceil(entities / ENTITIES_PER_ENVIRONMENT))
+    entities_per_environment = entities // environments
+    canvas_apps = entities_per_environment // 10
+    connections = max(1, entities_per_environment - canvas_apps - len(CONNECTOR_IDS))
+    return SyntheticTenant(
+        environments=environments,
+        connections_per_environment=connections,
+        canvas_apps_per_environment=canvas_apps,
+        records_per_connection=records_per_connection,
+    )
+
+
+def measure(name: str, scale: int, func: Callable[[], Any], profile_memory: bool = True) -> BenchmarkResult:
+    """
+    Time a single run of func, and trace its peak memory allocation if requested.
+    Items is the number of entities func returned or iterated, if any.
+    """
+    if profile_memory:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        value = func()
+        if isinstance(value, Iterable) and not isinstance(value, (str, bytes, dict)):
+            items = sum(1 for _ in value)
+        else:
+            items = value if isinstance(value, int) and not isinstance(value, bool) else 0
+        seconds = time.perf_counter() - start
+        peak_memory_bytes = tracemalloc.get_traced_memory()[1] if profile_memory else None
+    finally:
+        if profile_memory:
+            tracemalloc.stop()
+
+    return BenchmarkResult(name=name, scale=scale, seconds=seconds, peak_memory_bytes=peak_memory_bytes, items=items)
+
+
+def _processed_swaggers(cache_path: str) -> int:
+    processed = 0
+    for connector in model_loaders.load_connectors(cache_path=cache_path):
+        connector.processed_swagger(connection_id="benchmark", make_concrete=False)
+        processed += 1
+    return processed
+
+
+def _register_specs(cache_path: str) -> int:
+    app = Flask(__name__)
+    register_specs(app=app, cache_path=cache_path)
+    return len(app.blueprints)
+
+
+def _gui_views(tenant: SyntheticTenant) -> List[Tuple[str, str]]:
+    env_id = tenant.environment_ids()[0]
+    views = [
+        ("full_resources_table", "/"),
+        ("env_resources_table", f"/env/{env_id}"),
+        ("full_connection_table", "/credentials"),
+        ("full_logic_flows_table", "/automation"),
+        ("full_canvasapp_table", "/app/"),
+        ("full_connector_table", "/connector/"),
+        ("flt_connection_table", f"/credentials/{CONNECTOR_IDS[0]}/"),
+        ("get_resource_page.connection", f"/env/{env_id}/connection/{tenant.connection_id(env_id, 0)}"),
+        ("get_resource_page.connector", f"/env/{env_id}/connector/{CONNECTOR_IDS[0]}"),
+    ]
+    views += [
+        (f"env_per_resource_type_table.{resource_type}", f"/env/{env_id}/{resource_type}")
+        for resource_type in ("app", "credentials", "automation", "connector")
+    ]
+    if tenant.canvas_apps_per_environment:
+        views.append(("get_resource_page.canvas_app", f"/env/{env_id}/canvas_app/{env_id}-app-{0:08d}"))
+    return views
+
+
+def _render(app: Flask, url: str) -> int:
+    with app.test_request_context(url):
+        response = app.full_dispatch_request()
+    if response.status_code != 200:
+        raise RuntimeError(f"Got status code {response.status_code} for {url}.")
+    return 1
+
+
+def run_benchmarks(
+    scale: int, work_dir: str, profile_memory: bool = True, include_dump: bool = True, store: EntityStoreType = EntityStoreType.json
+) -> List[BenchmarkResult]:
+    """
+    Run recon and dump against an emulated tenant of the given scale, then benchmark loading and rendering its cache
+
+    Args:
+        scale (int): number of entities in the emulated tenant
+        work_dir (str): directory to store the collected cache in
+        profile_memory (bool): trace peak memory allocations, at the cost of slower runs
+        include_dump (bool): benchmark DataCollector.collect as well
+        store (EntityStoreType): store to cache collected resources in
+    """
+    tenant = tenant_for_scale(scale)
+    cache_path = os.path.join(work_dir, str(scale))
+    shutil.rmtree(cache_path, ignore_errors=True)
+    results: List[BenchmarkResult] = []
+
+    default_rate_limiter = requests_wrapper.rate_limiter
+    requests_wrapper.rate_limiter = RateLimiter(burst=UNTHROTTLED_BURST)
+    try:
+        with EmulatorServer(tenant) as server:
+            transport = TransportOptions(redirect_url=server.url)
+            resources_collector = ResourcesCollector(cache_path=cache_path, token=EMULATED_TOKEN, transport=transport, store=store)
+            results.append(measure("ResourcesCollector.collect_and_cache", scale, resources_collector.collect_and_cache, profile_memory))
+            if include_dump:
+                data_collector = DataCollector(cache_path=cache_path, token=EMULATED_TOKEN, transport=transport)
+                results.append(measure("DataCollector.collect", scale, data_collector.collect, profile_memory))
+    finally:
+        requests_wrapper.rate_limiter = default_rate_limiter
+
+    for loader in (
+        model_loaders.load_resources,
+        model_loaders.load_connections,
+        model_loaders.load_logic_flows,
+        model_loaders.load_canvasapps,
+        model_loaders.load_connectors,
+    ):
+        results.append(measure(f"model_loaders.{loader.__name__}", scale, lambda: loader(cache_path=cache_path), profile_memory))
+
+    results.append(measure("Connector.processed_swagger", scale, lambda: _processed_swaggers(cache_path), profile_memory))
+    results.append(measure("register_specs", scale, lambda: _register_specs(cache_path), profile_memory))
+
+    app = Gui().create_app(cache_path=cache_path)
+    for view_name, url in _gui_views(tenant):
+        results.append(measure(f"gui.{view_name}", scale, lambda: _render(app, url), profile_memory))
+
+    return results
+
+
+def write_results(results: List[BenchmarkResult], output_path: str) -> None:
+    report = {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result._asdict() for result in results],
+    }
+    with open(output_path, "w") as fp:
+        json.dump(report, fp, indent=2)
+
+
+def compare_results(results: List[BenchmarkResult], baseline_path: str) -> List[str]:
+    """
+    Describe the change in time and peak memory of every benchmark that also appears in a baseline report
+    """
+    with open(baseline_path, "r") as fp:
+        baseline: Dict[Tuple[str, int], Dict[str, Any]] = {(result["name"], result["scale"]): result for result in json.load(fp)["results"]}
+
+    lines: List[str] = []
+    for result in results:
+        if (previous := baseline.get((result.name, result.scale))) is None:
+            continue
+        line = f"{result.name} @ {result.scale}: {previous['seconds']:.3f}s -> {result.seconds:.3f}s ({result.seconds / max(previous['seconds'], 1e-9):.2f}x)"
+        if result.peak_memory_bytes is not None and previous.get("peak_memory_bytes"):
+            line += f", peak memory {result.peak_memory_bytes / previous['peak_memory_bytes']:.2f}x"
+        lines.append(line)
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark recon, dump, cache loading and GUI rendering against emulated tenants.")
+    parser.add_argument("--scales", nargs="+", type=int, default=DEFAULT_SCALES, help="Number of entities in each emulated tenant.")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT_PATH, type=str, help="Path to write JSON results to.")
+    parser.add_argument("--baseline", required=False, type=str, help="Path to results of a previous run to compare with.")
+    parser.add_argument("--work-dir", required=False, type=str, help="Directory to store collected caches in. Defaults to a temporary directory.")
+    parser.add_argument("--skip-dump", action="store_true", help="Do not benchmark DataCollector.collect.")
+    parser.add_argument(
+        "--store", default=EntityStoreType.json, type=EntityStoreType, choices=list(EntityStoreType), help="Store to cache collected resources in."
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Do not trace memory allocations, tracing slows down every benchmark.")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="powerpwn-benchmark-")
+    results: List[BenchmarkResult] = []
+    for scale in args.scales:
+        scale_results = run_benchmarks(
+            scale=scale, work_dir=work_dir, profile_memory=not args.no_memory, include_dump=not args.skip_dump, store=args.store
+        )
+        for result in scale_results:
+            memory = f", peak memory {result.peak_memory_bytes / 2**20:.1f} MiB" if result.peak_memory_bytes is not None else ""
+            print(f"{result.name} @ {result.scale}: {result.seconds:.3f}s for {result.items} items{memory}")
+        results += scale_results
+        # results are written after every scale, so that larger scales can be interrupted
+        write_results(results, args.output)
+
+    if args.baseline:
+        print("\n".join(compare_results(results, args.baseline)))
+
+    if not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import argparse
+import base64
+import datetime
+import hashlib
+import json
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode
+
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+
+from powerpwn.powerdump.emulator.synthetic_tenant import CONNECTOR_IDS, EMULATED_APIM_HOST, SyntheticTenant
+
+POWER_APPS_HOST = "api.powerapps.com"
+POWER_APPS_PREFIX = f"/{POWER_APPS_HOST}/providers/Microsoft.PowerApps"
+
+_ENVIRONMENT_FILTER = re.compile(r"environment eq '(?P<env_id>[^']+)'")
+
+
+def _json(obj: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(json.dumps(obj), status=status, mimetype="application/json", headers=headers)
+
+
+def _epoch(timestamp: str) -> int:
+    return int(datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp())
+
+
+def _not_found() -> Response:
+    return _json({"message": "Not found."}, status=404)
+
+
+def create_app(tenant: SyntheticTenant) -> Flask:
+    """
+    A stand-in for the api.powerapps.com endpoints used by recon and the APIM connector endpoints used by dump.
+    Requests are expected to be sent with the original host as the first path segment, see HostRedirectAdapter.
+    """
+    app = Flask(__name__)
+
+    def _environment_id() -> str:
+        match = _ENVIRONMENT_FILTER.search(request.args.get("$filter", ""))
+        return match.group("env_id") if match else ""
+
+    def _paginate(total: int, item_at: Callable[[int], Dict[str, Any]]) -> Response:
+        skip = int(request.args.get("$skiptoken", 0))
+        page = [item_at(index) for index in range(skip, min(total, skip + tenant.page_size))]
+        body: Dict[str, Any] = {"value": page}
+        if skip + tenant.page_size < total:
+            query = {**request.args.to_dict(), "$skiptoken": str(skip + tenant.page_size)}
+            body["nextLink"] = f"https://{request.path.lstrip('/')}?{urlencode(query)}"
+        return _json(body)
+
+    @app.route(f"{POWER_APPS_PREFIX}/environments")
+    def list_environments():
+        return _json({"value": [{"name": env_id} for env_id in tenant.environment_ids()]})
+
+    @app.route(f"{POWER_APPS_PREFIX}/connections")
+    def list_connections():
+        env_id = _environment_id()
+        return _paginate(tenant.connections_per_environment, lambda index: tenant.connection(env_id, index))
+
+    @app.route(f"{POWER_APPS_PREFIX}/apps")
+    def list_canvas_apps():
+        env_id = _environment_id()
+        return _paginate(tenant.canvas_apps_per_environment, lambda index: tenant.canvas_app(env_id, index))
+
+    @app.route(f"{POWER_APPS_PREFIX}/apps/<app_id>/permissions")
+    def list_canvas_app_rbac(app_id: str):
+        return _json({"value": tenant.canvas_app_permissions(app_id)})
+
+    @app.route(f"{POWER_APPS_PREFIX}/apis")
+    def list_connectors():
+        connectors = [tenant.connector(connector_id) for connector_id in CONNECTOR_IDS]
+        return _json({"value": connectors})
+
+    @app.route(f"{POWER_APPS_PREFIX}/apis/<connector_id>")
+    def get_connector(connector_id: str):
+        body = json.dumps(tenant.connector(connector_id))
+        etag = f'"{hashlib.sha256(body.encode()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers={"ETag": etag})
+        return Response(body, mimetype="application/json", headers={"ETag": etag})
+
+    @app.route(f"/{EMULATED_APIM_HOST}/apim/<apim_path>/<connection_id>/<path:operation>")
+    def apim(apim_path: str, connection_id: str, operation: str):
+        handler = _APIM_HANDLERS.get(apim_path)
+        if handler is None:
+            return _not_found()
+        return handler(tenant, connection_id, operation)
+
+    return app
+
+
+def _sql(tenant: SyntheticTenant, connection_id: str, operation: str) -> Response:
+    databases = ["db0", "db1"]
+    if operation == "testconnection":
+        return _json({})
+    if operation == "v2/databases":
+        return _json({"value": [{"Name": db, "DisplayName": db} for db in databases]})
+    if match := re.fullmatch(r"v2/datasets/(?P<server>[^,]+),(?P<db>[^/]+)/tables", operation):
+        db_index = databases.index(match.group("db"))
+        tables = [f"table{index}" for index in range(db_index, tenant.records_per_connection, len(databases))]
+        return _json({"value": [{"Name": f"[dbo].[{table}]", "DisplayName": table} for table in tables]})
+    if re.fullmatch(r"v2/\$metadata\.json/datasets/(?P<server>[^,]+),(?P<db>[^/]+)/tables/(?P<table>[^/]+)", operation):
+        columns = {"Id": {"type": "string", "x-ms-keyType": "primary", "x-ms-keyOrder": 1}, "Name": {"type": "string"}, "Value": {"type": "integer"}}
+        return _json({"name": "table", "schema": {"type": "array", "items": {"type": "object", "properties": columns}}})
+    if match := re.fullmatch(r"v2/datasets/(?P<server>[^,]+),(?P<db>[^/]+)/tables/(?P<table>[^/]+)/items", operation):
+        rows = tenant.rows(f"{connection_id}-{match.group('db')}-{match.group('table')}")
+        if order_by := request.args.get("$orderby"):
+            rows = sorted(rows, key=lambda row: [row[column] for column in order_by.split(",")])
+        skip = int(request.args.get("$skip", request.args.get("continuationToken", 0)))
+        if "$top" not in request.args:
+            body: Dict[str, Any] = {"value": rows[skip : skip + tenant.page_size]}
+            if skip + tenant.page_size < len(rows):
+                body["continuationToken"] = str(skip + tenant.page_size)
+            return _json(body)
+        top = int(request.args["$top"])
+        served = min(top, tenant.max_rows_per_response or top)
+        body = {"value": rows[skip : skip + served]}
+        if served < top and skip + served < len(rows):
+            # the rest of the page
+            query = {**request.args.to_dict(), "$skip": str(skip + served), "$top": str(top - served)}
+            body["@odata.nextLink"] = f"https://{request.path.lstrip('/')}?{urlencode(query)}"
+        return _json(body)
+    return _not_found()
+
+
+def _azureblob(tenant: SyntheticTenant, connection_id: str, operation: str) -> Response:
+    if operation == "testconnection":
+        return _json({})
+    if re.fullmatch(r"v2/datasets/[^/]+/foldersV2", operation):
+        return _json({"value": [{"Id": "root", "Name": "container", "DisplayName": "container", "Path": "/", "IsFolder": True}]})
+    if match := re.fullmatch(r"v2/datasets/[^/]+/foldersV2/(?P<folder>[^/]+)", operation):
+        return _json({"value": tenant.folder_children(match.group("folder"))})
+    if match := re.fullmatch(r"v2/datasets/[^/]+/files/(?P<file>[^/]+)/content", operation):
+        return _binary(tenant.file_content(match.group("file")))
+    return _not_found()
+
+
+def _binary(content: bytes) -> Response:
+    # the MD5 digest of the whole blob is sent with every range, as Azure Blob Storage does
+    md5 = base64.b64encode(hashlib.md5(content).digest()).decode()  # nosec
+    if range_header := request.headers.get("Range"):
+        start, _, end = range_header.replace("bytes=", "").partition("-")
+        last = min(len(content) - 1, int(end)) if end else len(content) - 1
+        return Response(
+            content[int(start) : last + 1],
+            status=206,
+            mimetype="application/octet-stream",
+            headers={"Content-Range": f"bytes {start}-{last}/{len(content)}", "Accept-Ranges": "bytes", "x-ms-blob-content-md5": md5},
+        )
+    return Response(content, mimetype="application/octet-stream", headers={"Accept-Ranges": "bytes", "x-ms-blob-content-md5": md5})
+
+
+def _gmail(tenant: SyntheticTenant, connection_id: str, operation: str) -> Response:
+    # emails are built as they are searched, a search of a large mailbox does not build the emails past the one it finds
+    emails = (tenant.email(connection_id, index) for index in range(tenant.records_per_connection))
+    if operation == "TestConnection":
+        return _json({})
+    if operation == "Mail/Labels":
+        return _json([{"Id": "INBOX", "Name": "INBOX"}])
+    if operation == "Mail/LastReceived":
+        # the subject filter is a search query of an optional before: date window and excluded subjects
+        window, *excluded = request.args.get("subject", "").split(" -")
+        excluded_subjects = {subject.strip() for subject in excluded if subject.strip()}
+        before = int(window.strip()[len("before:") :]) if window.strip().startswith("before:") else None
+        for email in emails:
+            if email["Subject"] in excluded_subjects:
+                continue
+            if before is not None and not tenant.gmail_date_windows:
+                # the window is taken as a subject, which no email has
+                continue
+            if before is not None and _epoch(email["DateTimeReceived"]) >= before:
+                continue
+            if request.args.get("importance") and request.args["importance"] != email["Importance"]:
+                continue
+            if request.args.get("starred") and (request.args["starred"] == "Starred") != email["IsStarred"]:
+                continue
+            if request.args.get("fetchOnlyWithAttachments") == "True" and not email["Attachments"]:
+                continue
+            return _json(email)
+        return _not_found()
+    if match := re.fullmatch(r"Mail/(?P<email_id>[^/]+)", operation):
+        for email in emails:
+            if email["Id"] == match.group("email_id"):
+                if request.args.get("includeAttachments") != "True":
+                    email["Attachments"] = [{k: v for k, v in attachment.items() if k != "ContentBytes"} for attachment in email["Attachments"]]
+                return _json(email)
+    return _not_found()
+
+
+def _keyvault(tenant: SyntheticTenant, connection_id: str, operation: str) -> Response:
+    names = [f"item{index}" for index in range(tenant.records_per_connection)]
+    if operation == "keys":
+        # dumping keys is not supported, emulated vaults only hold secrets
+        return _json({"value": []})
+    if operation == "secrets":
+        return _json({"value": [{"name": f"secret-{name}"} for name in names]})
+    if match := re.fullmatch(r"secrets/(?P<name>[^/]+)/value", operation):
+        return _json({"value": f"value-of-{match.group('name')}"})
+    return _not_found()
+
+
+def _azuretables(tenant: SyntheticTenant, connection_id: str, operation: str) -> Response:
+    if operation == "testconnection":
+        return _json({})
+    if re.fullmatch(r"v2/storageAccounts/[^/]+/tables", operation):
+        return _json({"value": [{"TableName": f"table{index}"} for index in range(tenant.records_per_connection)]})
+    if match := re.fullmatch(r"v2/storageAccounts/[^/]+/tables/(?P<table>[^/]+)/entities", operation):
+        return _json({"value": tenant.rows(f"{connection_id}-{match.group('table')}")})
+    return _not_found()
+
+
+def _azurequeues(tenant: SyntheticTenant, connection_id: str, operation: str) -> Response:
+    if operation == "testconnection":
+        return _json({})
+    if re.fullmatch(r"v2/storageAccounts/[^/]+/queues/list", operation):
+        return _json([{"Name": f"queue{index}"} for index in range(tenant.records_per_connection)])
+    if match := re.fullmatch(r"v2/storageAccounts/[^/]+/queues/(?P<queue>[^/]+)/messages", operation):
+        return _json({"QueueMessagesList": {"QueueMessage": tenant.rows(f"{connection_id}-{match.group('queue')}")}})
+    return _not_found()
+
+
+def _documentdb(tenant: SyntheticTenant, connection_id: str, operation: str) -> Response:
+    if operation == "testconnection":
+        return _json({})
+    if re.fullmatch(r"v2/cosmosdb/[^/]+/dbs", operation):
+        return _json({"Databases": [{"id": "db0"}]})
+    if re.fullmatch(r"v2/cosmosdb/[^/]+/dbs/[^/]+/colls", operation):
+        return _json({"DocumentCollections": [{"id": f"collection{index}"} for index in range(tenant.records_per_connection)]})
+    if match := re.fullmatch(r"v2/cosmosdb/[^/]+/dbs/[^/]+/colls/(?P<collection>[^/]+)/docs", operation):
+        return _json({"Documents": tenant.rows(f"{connection_id}-{match.group('collection')}")})
+    return _not_found()
+
+
+def _excelonlinebusiness(tenant: SyntheticTenant, connection_id: str, operation: str) -> Response:
+    if operation == "codeless/v1.0/sources":
+        return _json({"value": [{"id": "me", "displayName": "OneDrive"}]})
+    if operation == "codeless/v1.0/drives":
+        return _json({"value": [{"id": "drive0", "name": "OneDrive", "webUrl": "https://emulated-my.sharepoint.com/drive0"}]})
+    if match := re.fullmatch(r"codeless/v1\.0/drives/[^/]+/(root|items/(?P<folder>[^/]+))/children", operation):
+        return _json(tenant.folder_children(match.group("folder") or "root"))
+    if re.fullmatch(r"codeless/v1\.0/drives/[^/]+/items/[^/]+/workbook/tables", operation):
+        return _json({"value": [{"id": "table0", "name": "Table0"}]})
+    if match := re.fullmatch(r"drives/[^/]+/files/(?P<file>[^/]+)/tables/(?P<table>[^/]+)/items", operation):
+        return _json({"value": tenant.rows(f"{connection_id}-{match.group('file')}-{match.group('table')}")})
+    return _not_found()
+
+
+_APIM_HANDLERS: Dict[str, Callable[[SyntheticTenant, str, str], Response]] = {
+    "sql": _sql,
+    "azureblob": _azureblob,
+    "gmail": _gmail,
+    "keyvault": _keyvault,
+    "azuretables": _azuretables,
+    "azurequeues": _azurequeues,
+    "documentdb": _documentdb,
+    "excelonlinebusiness": _excelonlinebusiness,
+}
+
+
+class EmulatorServer:
+    """
+    Run the stand-in server on a local port in a background thread
+
+    Example:
+        with EmulatorServer(SyntheticTenant(environments=4)) as server:
+            session = init_session(token="emulated", transport=TransportOptions(redirect_url=server.url))
+    """
+
+    def __init__(self, tenant: SyntheticTenant, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.__server = make_server(host, port, create_app(tenant), threaded=True)
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.__server.host}:{self.__server.port}"
+
+    def start(self) -> "EmulatorServer":
+        # turn off server logs
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.__server.shutdown()
+        self.__thread.join()
+
+    def __enter__(self) -> "EmulatorServer":
+        return self.start()
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic Power Platform tenant for offline benchmarking.")
+    parser.add_argument("--port", type=int, default=5005, help="Port to listen on.")
+    parser.add_argument("--environments", type=int, default=2, help="Number of environments.")
+    parser.add_argument("--connections", type=int, default=10, help="Number of connections per environment.")
+    parser.add_argument("--records", type=int, default=5, help="Number of data records per connection.")
+    parser.add_argument("--apps", type=int, default=5, help="Number of canvas apps per environment.")
+    args = parser.parse_args()
+
+    tenant = SyntheticTenant(
+        environments=args.environments,
+        connections_per_environment=args.connections,
+        records_per_connection=args.records,
+        canvas_apps_per_environment=args.apps,
+    )
+    print(f"Serving {tenant.total_entities} entities on http://127.0.0.1:{args.port}, use it with --redirect-url.")
+    create_app(tenant).run(port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import base64
+import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+EMULATED_APIM_HOST = "emulator.azure-apim.net"
+TENANT_ID = "00000000-0000-0000-0000-000000000000"
+TIMESTAMP = "2023-01-01T00:00:00Z"
+
+# connector id to APIM path, connectors without a path have no emulated data plane
+CONNECTOR_ID_TO_APIM_PATH: Dict[str, Optional[str]] = {
+    "shared_sql": "sql",
+    "shared_azureblob": "azureblob",
+    "shared_gmail": "gmail",
+    "shared_keyvault": "keyvault",
+    "shared_azuretables": "azuretables",
+    "shared_azurequeues": "azurequeues",
+    "shared_documentdb": "documentdb",
+    "shared_excelonlinebusiness": "excelonlinebusiness",
+    "shared_github": None,
+    "shared_logicflows": None,
+    "shared_office365": None,
+}
+CONNECTOR_IDS = list(CONNECTOR_ID_TO_APIM_PATH.keys())
+FOLDER_IDS = ["root", "root-0", "root-1", "root-0-0", "root-0-1", "root-1-0", "root-1-1"]
+
+
+class SyntheticTenant(NamedTuple):
+    """
+    A deterministic synthetic Power Platform tenant of configurable scale.
+    Entities are generated on demand from their index, so even large tenants cost no memory up front.
+    """
+
+    environments: int = 2
+    connections_per_environment: int = 10
+    records_per_connection: int = 5
+    rows_per_record: int = 10
+    canvas_apps_per_environment: int = 5
+    page_size: int = 100
+    # SQL servers return at most this many rows per response, and the rest of a $top page with a nextLink
+    max_rows_per_response: Optional[int] = None
+    # whether Gmail searches honor before:<epoch> date windows, otherwise the window is matched as a subject
+    gmail_date_windows: bool = True
+
+    @property
+    def total_entities(self) -> int:
+        return self.environments * (self.connections_per_environment + self.canvas_apps_per_environment + len(CONNECTOR_IDS))
+
+    def environment_ids(self) -> List[str]:
+        return [f"env-{env_index:04d}" for env_index in range(self.environments)]
+
+    def connection_ids(self, environment_id: str) -> List[str]:
+        return [self.connection_id(environment_id, index) for index in range(self.connections_per_environment)]
+
+    @staticmethod
+    def connection_id(environment_id: str, index: int) -> str:
+        return f"{environment_id}-conn-{index:08d}"
+
+    @staticmethod
+    def connector_id_of(connection_id: str) -> str:
+        return CONNECTOR_IDS[int(connection_id.rpartition("-")[2]) % len(CONNECTOR_IDS)]
+
+    @staticmethod
+    def principal(index: int) -> Dict[str, Any]:
+        return {
+            "id": f"user-{index:08d}",
+            "type": "User",
+            "tenantId": TENANT_ID,
+            "displayName": f"User {index}",
+            "email": f"user{index}@emulated.example.com",
+            "userPrincipalName": f"user{index}@emulated.example.com",
+        }
+
+    def connection(self, environment_id: str, index: int) -> Dict[str, Any]:
+        connection_id = self.connection_id(environment_id, index)
+        connector_id = self.connector_id_of(connection_id)
+        account = f"user{index}@emulated.example.com"
+        parameters_set: Dict[str, Any] = {}
+        parameters: Dict[str, Any] = {}
+        if connector_id == "shared_sql":
+            parameters_set = {"name": "sqlAuthentication", "values": {"server": {"value": f"server{index}.database.windows.net"}}}
+        elif connector_id == "shared_azureblob":
+            parameters_set = {"name": "keyBasedAuth", "values": {"accountName": {"value": f"account{index}"}}}
+        elif connector_id in ("shared_azuretables", "shared_azurequeues"):
+            parameters_set = {"name": "keyBasedAuth", "values": {"storageaccount": {"value": f"account{index}"}}}
+        elif connector_id == "shared_documentdb":
+            parameters_set = {"name": "keyBasedAuth", "values": {"databaseAccount": {"value": f"cosmos{index}"}}}
+        elif connector_id == "shared_keyvault":
+            parameters = {"vaultName": f"vault{index}", "token:TenantId": TENANT_ID}
+
+        return {
+            "name": connection_id,
+            "id": f"/providers/Microsoft.PowerApps/apis/{connector_id}/connections/{connection_id}",
+            "properties": {
+                "apiId": f"/providers/Microsoft.PowerApps/apis/{connector_id}",
+                "displayName": account,
+                "iconUri": f"https://{EMULATED_APIM_HOST}/icons/{connector_id}.png",
+                "statuses": [{"status": "Connected"}],
+                "connectionParameters": parameters,
+                "connectionParametersSet": parameters_set,
+                "accountName": account,
+                "createdBy": self.principal(index),
+                "createdTime": TIMESTAMP,
+                "lastModifiedTime": TIMESTAMP,
+                "environment": {"id": f"/providers/Microsoft.PowerApps/environments/{environment_id}", "name": environment_id},
+                "allowSharing": True,
+                "testLinks": [{"requestUri": f"https://{EMULATED_APIM_HOST}/apim/test/{connection_id}", "method": "get"}],
+            },
+        }
+
+    def canvas_app(self, environment_id: str, index: int) -> Dict[str, Any]:
+        app_id = f"{environment_id}-app-{index:08d}"
+        return {
+            "name": app_id,
+            "properties": {
+                "appVersion": TIMESTAMP,
+                "displayName": f"App {index}",
+                "appPlayUri": f"https://apps.powerapps.com/play/{app_id}",
+                "createdBy": self.principal(index),
+                "createdTime": TIMESTAMP,
+                "lastModifiedTime": TIMESTAMP,
+                "environment": {"name": environment_id},
+            },
+        }
+
+    def canvas_app_permissions(self, app_id: str) -> List[Dict[str, Any]]:
+        index = int(app_id.rpartition("-")[2])
+        permissions = [{"name": f"{app_id}-owner", "properties": {"roleName": "Owner", "principal": self.principal(index)}}]
+        if index % 2 == 0:
+            # every other app is widely shared
+            permissions.append(
+                {"name": f"{app_id}-tenant", "properties": {"roleName": "CanView", "principal": {"type": "Tenant", "tenantId": TENANT_ID}}}
+            )
+        return permissions
+
+    @staticmethod
+    def connector(connector_id: str) -> Dict[str, Any]:
+        apim_path = CONNECTOR_ID_TO_APIM_PATH.get(connector_id) or connector_id
+        operations = {
+            f"/{{connectionId}}/operation{index}": {
+                "get": {
+                    "operationId": f"Operation{index}",
+                    "parameters": [{"name": "connectionId", "in": "path", "required": True, "type": "string"}],
+                    "responses": {"200": {"description": "OK", "schema": {"$ref": "#/definitions/Item"}}},
+                }
+            }
+            for index in range(20)
+        }
+        swagger = {
+            "swagger": "2.0",
+            "info": {"title": connector_id, "version": "1.0", "description": "Emulated connector"},
+            "host": EMULATED_APIM_HOST,
+            "basePath": f"/apim/{apim_path}",
+            "schemes": ["https"],
+            "paths": operations,
+            "definitions": {"Item": {"type": "object", "properties": {"Id": {"type": "string"}, "Name": {"type": "string"}}}},
+        }
+        return {
+            "name": connector_id,
+            "id": f"/providers/Microsoft.PowerApps/apis/{connector_id}",
+            "properties": {
+                "displayName": connector_id,
+                "createdTime": TIMESTAMP,
+                "changedTime": TIMESTAMP,
+                "publisher": "Microsoft",
+                "swagger": swagger,
+            },
+        }
+
+    def rows(self, record_id: str) -> List[Dict[str, Any]]:
+        return [{"Id": f"{record_id}-{index:06d}", "Name": f"Row {index}", "Value": index} for index in range(self.rows_per_record)]
+
+    def file_content(self, file_id: str) -> bytes:
+        # binary content, to catch lossy text decoding on download
+        return bytes(range(256)) * max(1, self.rows_per_record) + file_id.encode()
+
+    def email(self, connection_id: str, index: int) -> Dict[str, Any]:
+        email_id = f"{connection_id}-mail-{index:06d}"
+        attachments = [
+            {
+                "Name": f"attachment{attachment_index}.bin",
+                "ContentType": f'application/octet-stream; name="attachment{attachment_index}.bin"',
+                "ContentBytes": base64.b64encode(self.file_content(f"{email_id}-{attachment_index}")).decode(),
+            }
+            for attachment_index in range(index % 3)
+        ]
+        return {
+            "Id": email_id,
+            "Subject": f"Subject {index}",
+            "Body": f"<p>Body of email {index}</p>",
+            "IsHtml": True,
+            "Importance": "Important" if index % 2 == 0 else "Not important",
+            "IsStarred": index % 4 == 0,
+            # emails are listed from the last received, and pairs of emails are received in the same second
+            "DateTimeReceived": (datetime.datetime.fromisoformat(TIMESTAMP[:-1]) - datetime.timedelta(seconds=index // 2)).isoformat() + "Z",
+            "Attachments": attachments,
+        }
+
+    def folder_children(self, folder_id: str) -> List[Dict[str, Any]]:
+        """
+        Children of a folder in a fixed depth binary folder tree, files are spread round robin across folders
+        """
+        if folder_id not in FOLDER_IDS:
+            return []
+
+        children = [
+            {
+                "Id": sub_folder_id,
+                "Name": sub_folder_id,
+                "DisplayName": sub_folder_id,
+                "Path": f"/{sub_folder_id.replace('-', '/')}",
+                "IsFolder": True,
+            }
+            for sub_folder_id in FOLDER_IDS
+            if sub_folder_id.rpartition("-")[0] == folder_id
+        ]
+        folder_index = FOLDER_IDS.index(folder_id)
+        for file_index in range(folder_index, self.records_per_connection, len(FOLDER_IDS)):
+            file_name = f"file{file_index}.bin"
+            file_id = f"{folder_id}-file{file_index}"
+            children.append(
+                {
+                    "Id": file_id,
+                    "Name": file_name,
+                    "DisplayName": file_name,
+                    "Path": f"/{folder_id.replace('-', '/')}/{file_name}",
+                    "IsFolder": False,
+                    "MediaType": "application/octet-stream",
+                    "Size": len(self.file_content(file_id)),
+                }
+            )
+        return children
@@ -26,6 +26,18 @@ class Gui:
         subprocess.Popen(["browsepy", "0.0.0.0", "8080", "--directory", cache_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # nosec
 
         # run resources flask app
+        app = self.create_app(cache_path=cache_path)
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.info("Application is running on http://127.0.0.1:5000")
+
+        # turn off server logs
+        log = logging.getLogger("werkzeug")
+        log.setLevel(logging.ERROR)
+
+        app.run()
+
+    def create_app(self, cache_path: str) -> Flask:
         app = Flask(__name__, template_folder=self.__get_template_full_path())
         register_specs(app=app, cache_path=cache_path)
         app.route("/")(full_resources_table_wrapper(cache_path=cache_path))
@@ -38,14 +50,7 @@ class Gui:
         app.route("/credentials/<connector_id>/")(flt_connection_table_wrapper(cache_path=cache_path))
         app.route("/env/<env_id>/<resource_type>/<resource_id>")(flt_resource_wrapper(cache_path=cache_path))
 
-        logger = logging.getLogger(LOGGER_NAME)
-        logger.info("Application is running on http://127.0.0.1:5000")
-
-        # turn off server logs
-        log = logging.getLogger("werkzeug")
-        log.setLevel(logging.ERROR)
-
-        app.run()
+        return app
 
     def __get_template_full_path(self) -> str:
         return os.path.join(pathlib.Path(__file__).parent.resolve(), "templates")
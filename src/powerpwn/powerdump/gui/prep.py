@@ -24,22 +24,20 @@ def register_specs(app: Flask, cache_path: str):
     connector_id_and_env_id_to_connection_ids = map_connector_id_and_env_id_to_connection_ids(connections=connections)
 
     for spec in load_connectors(cache_path=cache_path):
-        # clean connectionId from parameters
-        for _, path_obj in spec.swagger.get("paths", {}).items():
-            for _, path_method_obj in path_obj.items():
-                path_method_obj["parameters"] = [params for params in path_method_obj.get("parameters", []) if params.get("name") != "connectionId"]
-
         # generate Swagger UI for each connection
         for connection_id in connector_id_and_env_id_to_connection_ids[(spec.api_name, spec.environment_id)]:
             title = f"{spec.swagger['info']['title']} / {connection_id}"
             base_path = spec.swagger["basePath"].replace("/apim/", "")
 
-            flask_api_doc(
-                app,
-                config=spec.processed_swagger(connection_id=connection_id, make_concrete=False),
-                url_prefix=f"/api/shared_{base_path}/{connection_id}",
-                title=title,
-            )
+            # clean connectionId from parameters, on a copy since specs are shared by the resource catalog
+            config = spec.processed_swagger(connection_id=connection_id, make_concrete=False)
+            for _, path_obj in config.get("paths", {}).items():
+                for _, path_method_obj in path_obj.items():
+                    path_method_obj["parameters"] = [
+                        params for params in path_method_obj.get("parameters", []) if params.get("name") != "connectionId"
+                    ]
+
+            flask_api_doc(app, config=config, url_prefix=f"/api/shared_{base_path}/{connection_id}", title=title)
 
 
 def full_resources_table_wrapper(cache_path: str):
@@ -97,7 +95,7 @@ def full_logic_flows_table_wrapper(cache_path: str):
 
 def flt_connection_table_wrapper(cache_path: str):
     def flt_connection_table(connector_id: str):
-        connections = [conn for conn in load_connections(cache_path=cache_path) if conn.connector_id == connector_id]
+        connections = list(load_connections(cache_path=cache_path, connector_id=connector_id))
 
         return render_template("connections_table.html", title=f"{TOOL_NAME} - {connector_id}", resources=connections)
 
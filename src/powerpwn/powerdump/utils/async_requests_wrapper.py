@@ -0,0 +1,134 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Coroutine, Iterable, List, Optional, TypeVar
+
+import requests
+
+from powerpwn.cli.const import TOOL_NAME
+from powerpwn.powerdump.utils import requests_wrapper
+from powerpwn.powerdump.utils.requests_wrapper import TransportOptions, init_session
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+_T = TypeVar("_T")
+
+
+class AsyncSession:
+    """
+    An asyncio transport over a keep-alive pooled requests.Session, see init_session's pool_maxsize.
+    Blocking socket I/O runs on a bounded thread pool, so at most max_concurrency requests are in flight and the event loop is never stalled.
+    """
+
+    def __init__(self, session: requests.Session, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> None:
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency should be a positive integer, got {max_concurrency}.")
+
+        self.__session = session
+        self.__max_concurrency = max_concurrency
+        self.__executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"{TOOL_NAME}-http")
+
+    @property
+    def session(self) -> requests.Session:
+        return self.__session
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.__max_concurrency
+
+    async def run(self, func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        """
+        Run a blocking function on the session's thread pool
+
+        Args:
+            func (Callable): blocking function to run
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(func, *args, **kwargs))
+
+    async def request(self, **kwargs: Any) -> requests.Response:
+        return await self.run(self.__session.request, **kwargs)
+
+    def close(self) -> None:
+        self.__executor.shutdown(wait=True)
+        self.__session.close()
+
+    async def __aenter__(self) -> "AsyncSession":
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        self.close()
+
+
+def init_async_session(
+    token: str,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    http_cache_path: Optional[str] = None,
+    transport: TransportOptions = TransportOptions(),
+) -> AsyncSession:
+    # keep as many idle keep-alive connections per host as there may be concurrent requests
+    session = init_session(token=token, http_cache_path=http_cache_path, transport=transport, pool_maxsize=max_concurrency)
+    return AsyncSession(session, max_concurrency=max_concurrency)
+
+
+async def consecutive_gets(
+    session: AsyncSession,
+    expected_status_prefix: str = "200",
+    property_to_extract_data: str = "value",
+    property_for_pagination: str = "continuationToken",
+    **kwargs,
+):
+    """
+    Async version of requests_wrapper.consecutive_gets, returns the same (success, value) tuple
+    """
+    return await session.run(
+        requests_wrapper.consecutive_gets,
+        session=session.session,
+        expected_status_prefix=expected_status_prefix,
+        property_to_extract_data=property_to_extract_data,
+        property_for_pagination=property_for_pagination,
+        **kwargs,
+    )
+
+
+async def request_and_verify(session: AsyncSession, expected_status_prefix: str = "200", is_json_resp: bool = True, **kwargs):
+    """
+    Async version of requests_wrapper.request_and_verify, returns the same (success, headers, body) tuple
+    """
+    return await session.run(
+        requests_wrapper.request_and_verify,
+        session=session.session,
+        expected_status_prefix=expected_status_prefix,
+        is_json_resp=is_json_resp,
+        **kwargs,
+    )
+
+
+async def gather_bounded(awaitables: Iterable[Awaitable[_T]], limit: Optional[int] = None) -> List[_T]:
+    """
+    Await all awaitables while keeping at most limit of them pending, results are returned in input order
+
+    Args:
+        awaitables (Iterable[Awaitable]): awaitables to run
+        limit (Optional[int]): max number of awaitables to run at once, unbounded if not provided
+    """
+    if limit is None:
+        return list(await asyncio.gather(*awaitables))
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _bounded(awaitable: Awaitable[_T]) -> _T:
+        async with semaphore:
+            return await awaitable
+
+    return list(await asyncio.gather(*(_bounded(awaitable) for awaitable in awaitables)))
+
+
+def run_sync(coroutine: Coroutine[Any, Any, _T]) -> _T:
+    """
+    Run a coroutine to completion from synchronous code
+
+    Args:
+        coroutine (Coroutine): coroutine to run
+    """
+    return asyncio.run(coroutine)
@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+import threading
+from typing import Set, Tuple
+
+from powerpwn.cli.const import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class Checkpoint:
+    """
+    A durable, append-only log of completed units of work, e.g environment -> collector -> connection -> data store -> record.
+    Units are marked done only after their output was completely written, so an interrupted run is resumed by skipping done units.
+    Every unit is flushed as soon as it is marked, so a checkpoint survives the process being killed at any point.
+    A run clears its checkpoint once it completes, so only interrupted runs are resumed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__done: Set[Tuple[str, ...]] = set()
+        # a run killed in the middle of an append leaves a partial last line behind
+        self.__needs_newline = False
+        self.__load()
+
+    def is_done(self, *unit: str) -> bool:
+        return unit in self.__done
+
+    def mark_done(self, *unit: str) -> None:
+        with self.__lock:
+            if unit in self.__done:
+                return
+            line = json.dumps(unit) + "\n"
+            if self.__needs_newline:
+                line = "\n" + line
+                self.__needs_newline = False
+            os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+            with open(self.__path, "a") as fp:
+                fp.write(line)
+                fp.flush()
+            self.__done.add(unit)
+
+    def clear(self) -> None:
+        with self.__lock:
+            if os.path.exists(self.__path):
+                os.remove(self.__path)
+            self.__done.clear()
+            self.__needs_newline = False
+
+    def __len__(self) -> int:
+        return len(self.__done)
+
+    def __load(self) -> None:
+        if not os.path.exists(self.__path):
+            return
+
+        with open(self.__path, "r") as fp:
+            content = fp.read()
+
+        for line in content.splitlines():
+            try:
+                self.__done.add(tuple(json.loads(line)))
+            except (json.decoder.JSONDecodeError, TypeError):
+                logger.debug(f"Ignoring partial checkpoint line in {self.__path}.")
+        self.__needs_newline = bool(content) and not content.endswith("\n")
@@ -0,0 +1,194 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Generator, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from powerpwn.cli.const import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def ordered_map(func: Callable[[_T], _R], items: Iterable[_T], executor: Executor, max_in_flight: int) -> Generator[Tuple[_T, _R], None, None]:
+    """
+    Apply func to items on an executor and yield (item, result) pairs in input order.
+    Items are consumed lazily, so a paginated listing keeps paginating while earlier items are processed,
+    and at most max_in_flight calls are pending at any time.
+
+    Args:
+        func (Callable): function to apply on every item
+        items (Iterable): items to process, may be a lazy generator
+        executor (Executor): executor to run func on
+        max_in_flight (int): maximal number of submitted calls whose results were not yielded yet
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight should be a positive integer, got {max_in_flight}.")
+
+    in_flight: Deque[Tuple[_T, "Future[_R]"]] = deque()
+    try:
+        for item in items:
+            in_flight.append((item, executor.submit(func, item)))
+            if len(in_flight) >= max_in_flight:
+                head, future = in_flight.popleft()
+                yield head, future.result()
+
+        while in_flight:
+            head, future = in_flight.popleft()
+            yield head, future.result()
+    finally:
+        # do not leave work behind when the consumer stops early or a call fails
+        for _, future in in_flight:
+            future.cancel()
+
+
+def capped_map(
+    func: Callable[[_T], _R],
+    items: Iterable[_T],
+    executor: Executor,
+    max_in_flight: int,
+    key: Callable[[_T], Hashable],
+    max_per_key: int,
+    key_priority: Optional[Callable[[Hashable], int]] = None,
+) -> Generator[Tuple[_T, _R], None, None]:
+    """
+    Apply func to items on an executor and yield (item, result) pairs as they complete.
+    At most max_in_flight calls are pending at any time, and at most max_per_key of them share a key, e.g a connector type.
+    Keys take turns, so items of a key with many items do not hold back items of other keys.
+    Keys of a lower priority only take the turns that keys of a higher priority can not take, because they have no items left or are at max_per_key.
+
+    Args:
+        func (Callable): function to apply on every item
+        items (Iterable): items to process
+        executor (Executor): executor to run func on
+        max_in_flight (int): maximal number of pending calls
+        key (Callable): key of an item
+        max_per_key (int): maximal number of pending calls of items that share a key
+        key_priority (Optional[Callable]): priority of a key, lower first. Keys have the same priority by default.
+    """
+    if max_in_flight < 1 or max_per_key < 1:
+        raise ValueError(f"max_in_flight and max_per_key should be positive integers, got {max_in_flight} and {max_per_key}.")
+
+    pending: Dict[Hashable, Deque[_T]] = dict()
+    for item in items:
+        pending.setdefault(key(item), deque()).append(item)
+    running: Dict[Hashable, int] = {item_key: 0 for item_key in pending}
+    in_flight: Dict["Future[_R]", Tuple[_T, Hashable]] = dict()
+
+    try:
+        while True:
+            submitted = True
+            while submitted and len(in_flight) < max_in_flight:
+                submitted = False
+                available_keys = [item_key for item_key in pending if running[item_key] < max_per_key]
+                top_priority = min((key_priority(item_key) for item_key in available_keys), default=0) if key_priority else 0
+                for item_key, queue in list(pending.items()):
+                    if len(in_flight) >= max_in_flight:
+                        break
+                    if running[item_key] >= max_per_key:
+                        continue
+                    if key_priority and key_priority(item_key) > top_priority:
+                        continue
+                    item = queue.popleft()
+                    # the key takes its next turn after every other key, so the next pass does not start from the same key
+                    del pending[item_key]
+                    if queue:
+                        pending[item_key] = queue
+                    in_flight[executor.submit(func, item)] = (item, item_key)
+                    running[item_key] += 1
+                    submitted = True
+
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item, item_key = in_flight.pop(future)
+                running[item_key] -= 1
+                yield item, future.result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def walk_tree(
+    list_children: Callable[[_T], Iterable[_T]],
+    root: _T,
+    is_folder: Callable[[_T], bool],
+    executor: Executor,
+    max_in_flight: int,
+    max_depth: Optional[int] = None,
+    max_items: Optional[int] = None,
+) -> Generator[_T, None, None]:
+    """
+    Walk a folder tree breadth first, listing up to max_in_flight folders concurrently, and yield its items as they are discovered.
+    The order of items is not deterministic.
+
+    Args:
+        list_children (Callable): lists the children of a folder, both folders and items
+        root (T): folder to start from, at depth 0
+        is_folder (Callable): whether a child is a folder to walk into, otherwise it is yielded
+        executor (Executor): executor to list folders on
+        max_in_flight (int): maximal number of concurrent folder listings
+        max_depth (Optional[int]): folders deeper than max_depth are not listed
+        max_items (Optional[int]): the walk stops once max_items items were yielded
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight should be a positive integer, got {max_in_flight}.")
+
+    def _list_children(folder: _T) -> List[_T]:
+        return list(list_children(folder))
+
+    frontier: Deque[Tuple[_T, int]] = deque([(root, 0)])
+    in_flight: Dict["Future[List[_T]]", int] = dict()
+    total_items = 0
+    total_skipped_folders = 0
+    try:
+        while frontier or in_flight:
+            while frontier and len(in_flight) < max_in_flight:
+                folder, depth = frontier.popleft()
+                in_flight[executor.submit(_list_children, folder)] = depth
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                depth = in_flight.pop(future)
+                for child in future.result():
+                    if is_folder(child):
+                        if max_depth is not None and depth + 1 > max_depth:
+                            total_skipped_folders += 1
+                        else:
+                            frontier.append((child, depth + 1))
+                        continue
+                    if max_items is not None and total_items >= max_items:
+                        logger.warning(f"Stopped walking folders after {max_items} items.")
+                        return
+                    total_items += 1
+                    yield child
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if total_skipped_folders:
+            logger.warning(f"Skipped {total_skipped_folders} folders deeper than {max_depth}.")
+
+
+class KeyedLimiter:
+    """
+    Bound the number of threads that concurrently hold the same key, e.g the same host
+    """
+
+    def __init__(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError(f"limit should be a positive integer, got {limit}.")
+        self.__limit = limit
+        self.__lock = threading.Lock()
+        self.__semaphores: Dict[Hashable, threading.BoundedSemaphore] = dict()
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        with self.__lock:
+            semaphore = self.__semaphores.setdefault(key, threading.BoundedSemaphore(self.__limit))
+        with semaphore:
+            yield
@@ -1,9 +1,20 @@
+from typing import Optional
+
 CACHE_PATH = ".dump"
 DATA_MODEL_FILE_EXTENSION = ".json"
 SPEC_JWT_NAME = "ApiHubBearerAuth"
 DATA_MODEL_VERSION = "0.0.1"
+POWER_APPS_API_URL = "https://api.powerapps.com/"
 POWER_APPS_SCOPE = "https://service.powerapps.com/.default"
 API_HUB_SCOPE = "https://apihub.azure.com/.default"
 AZURE_CLI_APP_ID = "04b07795-8ddb-461a-bbee-02f9e1bf7b46"
 GRAPH_API_SCOPE = "https://graph.microsoft.com/.default"
 ENCODING = "UTF8"
+DEFAULT_RECON_WORKERS = 4
+DEFAULT_DUMP_WORKERS = 8
+DEFAULT_DUMP_WORKERS_PER_CONNECTOR = 4
+DEFAULT_DUMP_WORKERS_PER_HOST = 2
+FOLDER_WALK_WORKERS = 8
+MAX_FOLDER_DEPTH = 64
+# folder walks are not cut short by default, set a number of items to stop a walk at
+MAX_FOLDER_ITEMS: Optional[int] = None
@@ -0,0 +1,408 @@
+import json
+import os
+import pathlib
+import shutil
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from enum import auto
+from typing import Any, Dict, Generator, Hashable, List, NamedTuple, Optional, Tuple
+
+from powerpwn.enums.str_enum import StrEnum
+from powerpwn.powerdump.collect.models.connector_entity import Connector
+from powerpwn.powerdump.collect.models.resource_entity_base import ResourceEntityBase
+from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
+from powerpwn.powerdump.utils.const import DATA_MODEL_FILE_EXTENSION
+from powerpwn.powerdump.utils.file_utils import write_atomic
+from powerpwn.powerdump.utils.path_utils import entities_db_path, entities_path
+from powerpwn.powerdump.utils.spec_store import SPEC_REF_KEY, SpecStore, dereference_connector
+
+# bodies of entities in a JSON store are kept next to their entity type directory, e.g {env_id}/connection.bodies
+BODIES_DIR_SUFFIX = ".bodies"
+
+
+class EntityStoreType(StrEnum):
+    json = auto()
+    sqlite = auto()
+
+
+class EntityRecord(NamedTuple):
+    entity_id: str
+    # serialized entity, as written by recon
+    content: str
+    # indexed attributes, used to filter entities without parsing them
+    connector_id: Optional[str] = None
+    created_by: Optional[str] = None
+    # environment of a record, set on read
+    env_id: Optional[str] = None
+    # heavy fields of the entity, e.g raw_json, stored apart from its content so that listing entities does not read them
+    body: Optional[str] = None
+
+    @staticmethod
+    def of(entity: ResourceEntityBase, spec_store: SpecStore) -> "EntityRecord":
+        """
+        Split an entity into a light header, its content, and a body with its raw_json.
+        Connector specs are kept in the spec store, and referenced from the header.
+        """
+        header = json.loads(entity.json(exclude=set(entity.BODY_FIELDS)))
+        raw_json = entity.raw_json
+        if isinstance(entity, Connector):
+            header[SPEC_REF_KEY] = spec_store.put(entity.swagger)
+            raw_json = {**raw_json, "properties": {key: value for key, value in raw_json.get("properties", {}).items() if key != "swagger"}}
+        return EntityRecord(entity_id=entity.entity_id, content=json.dumps(header), body=json.dumps(raw_json), **entity_index(entity))
+
+
+# a version stamp of every entity of a type by (env_id, entity_id), changes whenever an entity is written
+EntityStamps = Dict[Tuple[str, str], int]
+
+
+def entity_index(entity: ResourceEntityBase) -> Dict[str, Optional[str]]:
+    """
+    The indexed attributes of an entity: its connector id and the principal id of its creator
+    """
+    connector_id = getattr(entity, "connector_id", None) or getattr(entity, "api_name", None)
+    created_by = getattr(entity, "created_by", None)
+    return {"connector_id": connector_id, "created_by": getattr(created_by, "principal_id", created_by)}
+
+
+def _raw_entity_index(raw_entity: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    created_by = raw_entity.get("created_by")
+    return {
+        "connector_id": raw_entity.get("connector_id") or raw_entity.get("api_name"),
+        "created_by": created_by.get("principal_id") if isinstance(created_by, dict) else created_by,
+    }
+
+
+class IEntityStore(ABC):
+    """
+    Storage of recon results, entities are kept per environment and entity type
+    """
+
+    @abstractmethod
+    def write(self, env_id: str, entity_type: ResourceType, records: List[EntityRecord]) -> None:
+        """
+        Write a batch of entities, replacing earlier records of the same entities
+        """
+        ...  # noqa
+
+    @abstractmethod
+    def remove(self, env_id: str, entity_type: ResourceType, entity_ids: List[str]) -> None: ...  # noqa
+
+    @abstractmethod
+    def read(self, env_id: str, entity_type: ResourceType, entity_id: str) -> Optional[str]: ...  # noqa
+
+    @abstractmethod
+    def read_body(self, env_id: str, entity_type: ResourceType, entity_id: str) -> Optional[str]: ...  # noqa
+
+    @abstractmethod
+    def read_all(
+        self,
+        entity_type: ResourceType,
+        env_id: Optional[str] = None,
+        connector_id: Optional[str] = None,
+        created_by: Optional[str] = None,
+        include_body: bool = False,
+    ) -> Generator[EntityRecord, None, None]:
+        """
+        Read entities of a type, optionally filtered by environment, connector id and creator principal id
+        """
+        ...  # noqa
+
+    @abstractmethod
+    def stamps(self, entity_type: ResourceType) -> EntityStamps: ...  # noqa
+
+    @abstractmethod
+    def generation(self) -> Hashable:
+        """
+        A cheap value that changes whenever any entity is written or removed, to tell whether stamps should be compared at all
+        """
+        ...  # noqa
+
+    @abstractmethod
+    def environment_ids(self) -> List[str]: ...  # noqa
+
+    @abstractmethod
+    def exists(self) -> bool: ...  # noqa
+
+    @abstractmethod
+    def clear(self) -> None: ...  # noqa
+
+
+class JsonEntityStore(IEntityStore):
+    """
+    One JSON file per entity, under {root}/{env_id}/{entity_type}/{entity_id}.json, and its body under {root}/{env_id}/{entity_type}.bodies
+    """
+
+    def __init__(self, root: str) -> None:
+        self.__root = root
+
+    def write(self, env_id: str, entity_type: ResourceType, records: List[EntityRecord]) -> None:
+        dir_name = self.__dir(env_id, entity_type)
+        os.makedirs(dir_name, exist_ok=True)
+        if any(record.body is not None for record in records):
+            os.makedirs(dir_name + BODIES_DIR_SUFFIX, exist_ok=True)
+        for record in records:
+            if record.body is not None:
+                write_atomic(self.__body_path(dir_name, record.entity_id), record.body.encode())
+            write_atomic(os.path.join(dir_name, record.entity_id + DATA_MODEL_FILE_EXTENSION), record.content.encode())
+
+    def remove(self, env_id: str, entity_type: ResourceType, entity_ids: List[str]) -> None:
+        dir_name = self.__dir(env_id, entity_type)
+        for entity_id in entity_ids:
+            for file_path in (os.path.join(dir_name, entity_id + DATA_MODEL_FILE_EXTENSION), self.__body_path(dir_name, entity_id)):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+    def read(self, env_id: str, entity_type: ResourceType, entity_id: str) -> Optional[str]:
+        return self.__read_file(os.path.join(self.__dir(env_id, entity_type), entity_id + DATA_MODEL_FILE_EXTENSION))
+
+    def read_body(self, env_id: str, entity_type: ResourceType, entity_id: str) -> Optional[str]:
+        return self.__read_file(self.__body_path(self.__dir(env_id, entity_type), entity_id))
+
+    def read_all(
+        self,
+        entity_type: ResourceType,
+        env_id: Optional[str] = None,
+        connector_id: Optional[str] = None,
+        created_by: Optional[str] = None,
+        include_body: bool = False,
+    ) -> Generator[EntityRecord, None, None]:
+        for entity_path in pathlib.Path(self.__root).glob(f"{env_id or '*'}/{entity_type}/*{DATA_MODEL_FILE_EXTENSION}"):
+            with open(entity_path, "r") as fp:
+                content = fp.read()
+            record = EntityRecord(entity_id=entity_path.stem, content=content, env_id=entity_path.parts[-3])
+            if include_body:
+                record = record._replace(body=self.__read_file(self.__body_path(str(entity_path.parent), entity_path.stem)))
+            if connector_id is not None or created_by is not None:
+                # files are not indexed, filtering requires parsing every entity
+                record = record._replace(**_raw_entity_index(json.loads(content)))
+                if (connector_id is not None and record.connector_id != connector_id) or (created_by is not None and record.created_by != created_by):
+                    continue
+            yield record
+
+    def stamps(self, entity_type: ResourceType) -> EntityStamps:
+        stamps: EntityStamps = dict()
+        for env_id in self.environment_ids():
+            dir_name = self.__dir(env_id, entity_type)
+            if not os.path.isdir(dir_name):
+                continue
+            with os.scandir(dir_name) as entries:
+                for entry in entries:
+                    if entry.name.endswith(DATA_MODEL_FILE_EXTENSION):
+                        stamps[(env_id, entry.name[: -len(DATA_MODEL_FILE_EXTENSION)])] = entry.stat().st_mtime_ns
+        return stamps
+
+    def generation(self) -> Hashable:
+        # entities are written by renaming a temporary file, so every write changes the mtime of its directory
+        if not os.path.isdir(self.__root):
+            return ()
+        mtimes = []
+        for dir_name in [self.__root] + [os.path.join(self.__root, env_id) for env_id in self.environment_ids()]:
+            with os.scandir(dir_name) as entries:
+                mtimes += [(entry.path, entry.stat().st_mtime_ns) for entry in entries if entry.is_dir()]
+        return tuple(mtimes)
+
+    def environment_ids(self) -> List[str]:
+        if not os.path.isdir(self.__root):
+            return []
+        return os.listdir(self.__root)
+
+    def exists(self) -> bool:
+        return os.path.isdir(self.__root) and len(os.listdir(self.__root)) > 0
+
+    def clear(self) -> None:
+        shutil.rmtree(self.__root, ignore_errors=True)
+
+    def __dir(self, env_id: str, entity_type: ResourceType) -> str:
+        return os.path.join(self.__root, env_id, entity_type.value)
+
+    @staticmethod
+    def __body_path(dir_name: str, entity_id: str) -> str:
+        return os.path.join(dir_name + BODIES_DIR_SUFFIX, entity_id + DATA_MODEL_FILE_EXTENSION)
+
+    @staticmethod
+    def __read_file(file_path: str) -> Optional[str]:
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, "r") as fp:
+            return fp.read()
+
+
+class SqliteEntityStore(IEntityStore):
+    """
+    A single SQLite database per tenant, indexed by environment, entity type, connector id and creator.
+    Every batch is written in a single transaction.
+    """
+
+    __SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS entities ("
+        "env_id TEXT NOT NULL, entity_type TEXT NOT NULL, entity_id TEXT NOT NULL, connector_id TEXT, created_by TEXT, content TEXT NOT NULL, "
+        "body TEXT, updated_at INTEGER NOT NULL, "
+        "PRIMARY KEY (env_id, entity_type, entity_id))",
+        "CREATE INDEX IF NOT EXISTS entities_by_type ON entities (entity_type, env_id)",
+        "CREATE INDEX IF NOT EXISTS entities_by_connector ON entities (entity_type, connector_id)",
+        "CREATE INDEX IF NOT EXISTS entities_by_creator ON entities (entity_type, created_by)",
+    ]
+
+    def __init__(self, db_path: str) -> None:
+        self.__db_path = db_path
+        # recon environments are collected concurrently, sqlite allows a single writer at a time
+        self.__write_lock = threading.Lock()
+        self.__initialized = False
+
+    def write(self, env_id: str, entity_type: ResourceType, records: List[EntityRecord]) -> None:
+        with self.__write_lock, self.__transaction(create=True) as connection:
+            updated_at = time.time_ns()
+            connection.executemany(
+                "INSERT OR REPLACE INTO entities (env_id, entity_type, entity_id, connector_id, created_by, content, body, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (env_id, entity_type.value, record.entity_id, record.connector_id, record.created_by, record.content, record.body, updated_at)
+                    for record in records
+                ],
+            )
+
+    def remove(self, env_id: str, entity_type: ResourceType, entity_ids: List[str]) -> None:
+        if not entity_ids or not self.exists():
+            return
+        with self.__write_lock, self.__transaction() as connection:
+            connection.executemany(
+                "DELETE FROM entities WHERE env_id = ? AND entity_type = ? AND entity_id = ?",
+                [(env_id, entity_type.value, entity_id) for entity_id in entity_ids],
+            )
+
+    def read(self, env_id: str, entity_type: ResourceType, entity_id: str) -> Optional[str]:
+        return self.__read_column("content", env_id, entity_type, entity_id)
+
+    def read_body(self, env_id: str, entity_type: ResourceType, entity_id: str) -> Optional[str]:
+        return self.__read_column("body", env_id, entity_type, entity_id)
+
+    def read_all(
+        self,
+        entity_type: ResourceType,
+        env_id: Optional[str] = None,
+        connector_id: Optional[str] = None,
+        created_by: Optional[str] = None,
+        include_body: bool = False,
+    ) -> Generator[EntityRecord, None, None]:
+        if not self.exists():
+            return
+
+        body_column = "body" if include_body else "NULL"
+        query = f"SELECT entity_id, content, connector_id, created_by, env_id, {body_column} FROM entities WHERE entity_type = ?"
+        params: List[str] = [entity_type.value]
+        for column, value in (("env_id", env_id), ("connector_id", connector_id), ("created_by", created_by)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+
+        # every reader has its own connection, so that readers are not blocked by each other or by the recon writer
+        with self.__transaction() as connection:
+            for row in connection.execute(query, params):
+                yield EntityRecord(*row)
+
+    def stamps(self, entity_type: ResourceType) -> EntityStamps:
+        if not self.exists():
+            return dict()
+        with self.__transaction() as connection:
+            rows = connection.execute("SELECT env_id, entity_id, updated_at FROM entities WHERE entity_type = ?", (entity_type.value,))
+            return {(env_id, entity_id): updated_at for env_id, entity_id, updated_at in rows}
+
+    def generation(self) -> Hashable:
+        # committed transactions change the write-ahead log, or the database itself once the log is checkpointed
+        stats = [os.stat(path) for path in (self.__db_path, self.__db_path + "-wal") if os.path.exists(path)]
+        return tuple((stat.st_mtime_ns, stat.st_size) for stat in stats)
+
+    def environment_ids(self) -> List[str]:
+        if not self.exists():
+            return []
+        with self.__transaction() as connection:
+            return [row[0] for row in connection.execute("SELECT DISTINCT env_id FROM entities ORDER BY env_id")]
+
+    def exists(self) -> bool:
+        return os.path.exists(self.__db_path)
+
+    def clear(self) -> None:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.__db_path + suffix):
+                os.remove(self.__db_path + suffix)
+        self.__initialized = False
+
+    def __read_column(self, column: str, env_id: str, entity_type: ResourceType, entity_id: str) -> Optional[str]:
+        if not self.exists():
+            return None
+        with self.__transaction() as connection:
+            row = connection.execute(
+                f"SELECT {column} FROM entities WHERE env_id = ? AND entity_type = ? AND entity_id = ?", (env_id, entity_type.value, entity_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    @contextmanager
+    def __transaction(self, create: bool = False) -> Generator[sqlite3.Connection, None, None]:
+        connection = self.__connect(create)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def __connect(self, create: bool = False) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.__db_path, timeout=30, check_same_thread=False)
+        if create and not self.__initialized:
+            os.makedirs(os.path.dirname(self.__db_path) or ".", exist_ok=True)
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in self.__SCHEMA:
+                connection.execute(statement)
+            self.__initialized = True
+        return connection
+
+
+def open_entity_store(cache_path: str, store_type: Optional[EntityStoreType] = None) -> IEntityStore:
+    """
+    Open the entity store of a cache path
+
+    Args:
+        cache_path (str): tenant cache path
+        store_type (Optional[EntityStoreType]): store to write to, by default the existing store is detected, falling back to JSON
+    """
+    stores: Dict[EntityStoreType, IEntityStore] = {
+        EntityStoreType.sqlite: SqliteEntityStore(entities_db_path(cache_path)),
+        EntityStoreType.json: JsonEntityStore(entities_path(cache_path)),
+    }
+    existing_store_type = next((existing for existing, store in stores.items() if store.exists()), None)
+    if store_type is None:
+        return stores[existing_store_type or EntityStoreType.json]
+
+    if existing_store_type is not None and existing_store_type != store_type:
+        raise ValueError(f"Cache path {cache_path} holds a {existing_store_type} resource store, clear the cache to switch to a {store_type} store.")
+    return stores[store_type]
+
+
+def export_entities(source: IEntityStore, target: IEntityStore, spec_store: SpecStore) -> int:
+    """
+    Copy all entities of a store into another, e.g to export a SQLite store as a browsable JSON tree.
+    Exported entities are self-contained: their body and the spec of connectors are written inline, so an export is loaded without its cache.
+
+    Args:
+        source (IEntityStore): store to export
+        target (IEntityStore): store to export to
+        spec_store (SpecStore): spec store of the source, which connector records reference
+
+    Returns:
+        int: number of exported entities
+    """
+    exported = 0
+    for env_id in source.environment_ids():
+        for entity_type in (ResourceType.connection, ResourceType.canvas_app, ResourceType.connector):
+            records = []
+            for record in source.read_all(entity_type, env_id=env_id, include_body=True):
+                raw_entity = json.loads(record.content)
+                if record.body is not None:
+                    raw_entity["raw_json"] = json.loads(record.body)
+                raw_entity = dereference_connector(raw_entity, spec_store)
+                records.append(record._replace(content=json.dumps(raw_entity), body=None, **_raw_entity_index(raw_entity)))
+            target.write(env_id, entity_type, records)
+            exported += len(records)
+    return exported
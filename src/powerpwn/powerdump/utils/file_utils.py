@@ -0,0 +1,48 @@
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import IO, Any, Generator
+
+# temporary files of atomic_open are named {path}.{pid}.{thread id}.tmp
+_TMP_FILE_PATTERN = re.compile(r"\.\d+\.\d+\.tmp$")
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "w", **kwargs: Any) -> Generator[IO[Any], None, None]:
+    """
+    Open a file for writing so that readers see either its previous content or the complete new content, never a partial write
+
+    Args:
+        path (str): path of the file to write
+        mode (str): write mode, "w" or "wb"
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as fp:
+            yield fp
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_atomic(path: str, content: bytes) -> None:
+    with atomic_open(path, "wb") as fp:
+        fp.write(content)
+
+
+def remove_partial_writes(root_dir: str) -> int:
+    """
+    Remove temporary files left behind by atomic_open writes of a run that was killed
+
+    Returns:
+        int: number of removed files
+    """
+    removed = 0
+    for dir_path, _, file_names in os.walk(root_dir):
+        for file_name in file_names:
+            if _TMP_FILE_PATTERN.search(file_name):
+                os.remove(os.path.join(dir_path, file_name))
+                removed += 1
+    return removed
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from powerpwn.cli.const import LOGGER_NAME
+from powerpwn.powerdump.utils.file_utils import write_atomic
+
+logger = logging.getLogger(LOGGER_NAME)
+
+_VALIDATOR_HEADERS = ("ETag", "Last-Modified")
+
+
+class CachedResponse(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    headers: Dict[str, str]
+    body: bytes
+
+
+class HttpValidatorCache:
+    """
+    A persistent store of response bodies and their validators (ETag / Last-Modified), keyed by request url
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        self.__cache_path = cache_path
+        os.makedirs(cache_path, exist_ok=True)
+
+    @property
+    def cache_path(self) -> str:
+        return self.__cache_path
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        meta_path, body_path = self.__paths(url)
+        if not os.path.exists(meta_path) or not os.path.exists(body_path):
+            return None
+
+        try:
+            with open(meta_path, "r") as fp:
+                meta = json.load(fp)
+            with open(body_path, "rb") as fp:
+                body = fp.read()
+        except (OSError, json.decoder.JSONDecodeError):
+            logger.debug(f"Ignoring unreadable HTTP cache entry for {url}.")
+            return None
+
+        return CachedResponse(etag=meta.get("etag"), last_modified=meta.get("last_modified"), headers=meta.get("headers", {}), body=body)
+
+    def put(self, url: str, response: requests.Response) -> None:
+        meta_path, body_path = self.__paths(url)
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "etag", "last-modified")},
+        }
+
+        # body is written before its metadata so that a partially written entry is never served
+        write_atomic(body_path, response.content)
+        write_atomic(meta_path, json.dumps(meta).encode())
+
+    def __paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.__cache_path, f"{key}.json"), os.path.join(self.__cache_path, f"{key}.body")
+
+
+class ConditionalRequestAdapter(BaseAdapter):
+    """
+    Transport adapter that revalidates GET responses against an HttpValidatorCache before handing requests to the wrapped adapter.
+    Cached validators are sent as If-None-Match / If-Modified-Since and a 304 response is served from the local copy.
+    """
+
+    def __init__(self, cache: HttpValidatorCache, adapter: BaseAdapter) -> None:
+        super().__init__()
+        self.__cache = cache
+        self.__adapter = adapter
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        if request.method != "GET" or stream or request.url is None:
+            return self.__adapter.send(request, stream=stream, **kwargs)
+
+        url = request.url
+        cached = self.__cache.get(url)
+        if cached:
+            if cached.etag:
+                request.headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request.headers["If-Modified-Since"] = cached.last_modified
+
+        response = self.__adapter.send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and cached:
+            logger.debug(f"Serving {url} from HTTP cache.")
+            return self.__build_cached_response(request, response, cached)
+
+        if response.status_code == 200 and any(header in response.headers for header in _VALIDATOR_HEADERS):
+            self.__cache.put(url, response)
+
+        return response
+
+    def close(self) -> None:
+        self.__adapter.close()
+
+    @staticmethod
+    def __build_cached_response(request: requests.PreparedRequest, not_modified: requests.Response, cached: CachedResponse) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        fresh_headers = {k: v for k, v in not_modified.headers.items() if not k.lower().startswith("content-") and k.lower() != "transfer-encoding"}
+        response.headers = CaseInsensitiveDict({**cached.headers, **fresh_headers})
+        response._content = cached.body
+        response.url = not_modified.url
+        response.request = request
+        response.connection = not_modified.connection
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
@@ -0,0 +1,171 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Generator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from powerpwn.cli.const import LOGGER_NAME
+from powerpwn.powerdump.utils.file_utils import atomic_open, write_atomic
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# bodies of streamed responses are recorded to {recording key}.body
+_BODY_FILE_SUFFIX = ".body"
+# ranged downloads are replayed with the size and digest of their file
+_RECORDED_HEADERS = (
+    "content-md5",
+    "content-range",
+    "content-type",
+    "etag",
+    "last-modified",
+    "retry-after",
+    "x-ms-blob-content-md5",
+    "x-oauth-client-id",
+    "x-oauth-scopes",
+)
+
+
+def recording_key(method: Optional[str], url: Optional[str], body: Any = None, byte_range: Optional[str] = None) -> str:
+    """
+    Identify a request by its method, url, body and Range header, credentials are never part of the key
+    """
+    digest = hashlib.sha256(f"{method} {url}".encode())
+    if body:
+        digest.update(body if isinstance(body, bytes) else str(body).encode())
+    if byte_range:
+        # ranges of the same download are different requests
+        digest.update(f" {byte_range}".encode())
+    return digest.hexdigest()
+
+
+def _request_recording_key(request: requests.PreparedRequest) -> str:
+    return recording_key(request.method, request.url, request.body, request.headers.get("Range"))
+
+
+class HttpRecorder:
+    """
+    Capture request / response pairs to disk, one file per distinct request.
+    Bodies of streamed responses are copied to a sidecar file as they are read, instead of being loaded into memory.
+    """
+
+    def __init__(self, record_path: str) -> None:
+        self.__record_path = record_path
+        os.makedirs(record_path, exist_ok=True)
+
+    def record(self, response: requests.Response, *_: Any, stream: bool = False, **__: Any) -> requests.Response:
+        """
+        requests response hook
+        """
+        request = response.request
+        key = _request_recording_key(request)
+        recording = {
+            "method": request.method,
+            "url": request.url,
+            "status_code": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in _RECORDED_HEADERS},
+        }
+        if stream:
+            recording["body_file"] = key + _BODY_FILE_SUFFIX
+            response.raw = _TeeRaw(response.raw, os.path.join(self.__record_path, recording["body_file"]))
+        else:
+            recording["body"] = base64.b64encode(response.content).decode()
+        write_atomic(os.path.join(self.__record_path, key + ".json"), json.dumps(recording).encode())
+        return response
+
+
+class _TeeRaw:
+    """
+    Raw stream of a response that copies the chunks read from it to a file.
+    A body that is not read to its end, e.g of a response which is only checked for its headers, is recorded up to where reading stopped.
+    """
+
+    def __init__(self, raw: Any, body_path: str) -> None:
+        self.__raw = raw
+        self.__body_path = body_path
+
+    def stream(self, amt: Optional[int] = None, decode_content: Optional[bool] = None) -> Generator[bytes, None, None]:
+        with atomic_open(self.__body_path, "wb") as fp:
+            try:
+                for chunk in self.__raw.stream(amt, decode_content=decode_content):
+                    fp.write(chunk)
+                    yield chunk
+            except GeneratorExit:
+                pass
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__raw, name)
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter that serves responses captured by HttpRecorder, with no network access.
+    Requests that were not recorded get a 404 response.
+    """
+
+    def __init__(self, replay_path: str) -> None:
+        super().__init__()
+        self.__replay_path = replay_path
+
+    def send(self, request: requests.PreparedRequest, *_: Any, **__: Any) -> requests.Response:  # type: ignore[override]
+        recording_path = os.path.join(self.__replay_path, _request_recording_key(request) + ".json")
+
+        response = requests.Response()
+        response.request = request
+        response.url = request.url or ""
+        if os.path.exists(recording_path):
+            with open(recording_path, "r") as fp:
+                recording = json.load(fp)
+            response.status_code = recording["status_code"]
+            response.headers = CaseInsensitiveDict(recording["headers"])
+            body_path = os.path.join(self.__replay_path, recording.get("body_file", ""))
+            if "body_file" in recording and os.path.exists(body_path):
+                # streamed bodies are streamed from their sidecar file
+                response.raw = open(body_path, "rb")
+                response.encoding = get_encoding_from_headers(response.headers)
+                return response
+            # a streamed body which was never read is replayed as empty
+            response._content = base64.b64decode(recording.get("body", ""))
+        else:
+            logger.debug(f"No recording found for {request.method} {request.url}.")
+            response.status_code = 404
+            response.headers = CaseInsensitiveDict({"content-type": "application/json"})
+            response._content = json.dumps({"message": "Request was not recorded."}).encode()
+        # the body is already in memory, streamed reads are served from it
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class HostRedirectAdapter(HTTPAdapter):
+    """
+    Transport adapter that sends every request to a single base url, prefixing the path with the original host.
+    I.e, https://api.powerapps.com/providers/... is sent to {base_url}/api.powerapps.com/providers/...
+    """
+
+    def __init__(self, base_url: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.__base_url = base_url.rstrip("/")
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        if not request.url or request.url.startswith(self.__base_url):
+            return super().send(request, *args, **kwargs)
+
+        url = urlsplit(request.url)
+        redirected_request = request.copy()
+        redirected_request.url = f"{self.__base_url}/{url.netloc}{url.path}" + (f"?{url.query}" if url.query else "")
+
+        # keep the redirect transparent to callers, recorders and caches
+        response = super().send(redirected_request, *args, **kwargs)
+        response.request = request
+        response.url = request.url
+        return response
@@ -6,6 +6,10 @@ def entities_path(cache_path: str = CACHE_PATH) -> str:
     return f"{cache_path}/resources"
 
 
+def entities_db_path(cache_path: str = CACHE_PATH) -> str:
+    return f"{cache_path}/resources.db"
+
+
 def env_entities_path(env_id: str, cache_path: str = CACHE_PATH) -> str:
     return f"{cache_path}/resources/{env_id}"
 
@@ -14,6 +18,34 @@ def env_entity_type_path(env_id: str, entity_type: ResourceType, cache_path: str
     return f"{cache_path}/resources/{env_id}/{entity_type.value}"
 
 
+def manifests_path(cache_path: str = CACHE_PATH) -> str:
+    return f"{cache_path}/manifests"
+
+
+def env_manifest_path(env_id: str, cache_path: str = CACHE_PATH) -> str:
+    return f"{manifests_path(cache_path)}/{env_id}.json"
+
+
+def checkpoints_path(cache_path: str = CACHE_PATH) -> str:
+    return f"{cache_path}/checkpoints"
+
+
+def recon_checkpoint_path(cache_path: str = CACHE_PATH) -> str:
+    return f"{checkpoints_path(cache_path)}/recon.jsonl"
+
+
+def dump_checkpoint_path(cache_path: str = CACHE_PATH) -> str:
+    return f"{checkpoints_path(cache_path)}/dump.jsonl"
+
+
+def specs_path(cache_path: str = CACHE_PATH) -> str:
+    return f"{cache_path}/specs"
+
+
+def http_cache_path(cache_path: str = CACHE_PATH) -> str:
+    return f"{cache_path}/http_cache"
+
+
 def dump_path(cache_path: str = CACHE_PATH) -> str:
     return f"{cache_path}/dump"
 
@@ -0,0 +1,209 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+import requests
+
+from powerpwn.cli.const import LOGGER_NAME, TOOL_NAME
+from powerpwn.powerdump.utils.file_utils import write_atomic
+from powerpwn.powerdump.utils.requests_wrapper import DOWNLOAD_CHUNK_SIZE, send_request
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# files of at least this size are downloaded in concurrent ranges
+RANGED_DOWNLOAD_THRESHOLD = 64 * 1024 * 1024
+RANGE_SIZE = 8 * 1024 * 1024
+DEFAULT_RANGE_WORKERS = 4
+MAX_RANGE_RETRIES = 3
+
+# a download in progress is kept in {path}.part, and the ranges it completed in {path}.part.state
+PART_FILE_SUFFIX = ".part"
+STATE_FILE_SUFFIX = ".part.state"
+
+
+class _RemoteFile(NamedTuple):
+    size: int
+    etag: Optional[str]
+    # base64 MD5 digest of the whole file, if the server provides it
+    md5: Optional[str]
+
+
+class _DownloadState:
+    """
+    Ranges of a file that were completely written to its part file, persisted after every range so a download survives being interrupted
+    """
+
+    def __init__(self, path: str, remote_file: _RemoteFile, range_size: int) -> None:
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__header: Dict[str, Any] = {"size": remote_file.size, "etag": remote_file.etag, "range_size": range_size}
+        self.done: Set[int] = self.__load()
+
+    def mark_done(self, range_index: int) -> None:
+        with self.__lock:
+            self.done.add(range_index)
+            write_atomic(self.__path, json.dumps({**self.__header, "done": sorted(self.done)}).encode())
+
+    def __load(self) -> Set[int]:
+        if not os.path.exists(self.__path):
+            return set()
+        try:
+            with open(self.__path, "r") as fp:
+                state = json.load(fp)
+        except (OSError, json.decoder.JSONDecodeError):
+            return set()
+        # ranges of another version of the file, or of another range size, can not be reused
+        if any(state.get(key) != value for key, value in self.__header.items()):
+            return set()
+        return set(state.get("done", []))
+
+
+def download_in_ranges(
+    session: requests.Session,
+    url: str,
+    path: str,
+    range_size: int = RANGE_SIZE,
+    workers: int = DEFAULT_RANGE_WORKERS,
+    stop: Optional[threading.Event] = None,
+    **kwargs: Any,
+) -> bool:
+    """
+    Download a file with concurrent HTTP Range requests.
+    Completed ranges are recorded next to the file, so an interrupted download resumes where it stopped, and a range that fails is retried.
+    The file is moved to its path only once complete and verified, against the MD5 digest of the server when it provides one.
+    Servers that do not support ranges are downloaded in a single streamed request.
+
+    Args:
+        session (requests.Session): session to send requests with
+        url (str): url of the file
+        path (str): path to write the file to
+        range_size (int): size of every range request
+        workers (int): number of ranges to download concurrently
+        stop (Optional[threading.Event]): once set, ranges which did not start are not downloaded, and the download is left to be resumed
+        kwargs: additional arguments of every request, e.g params
+
+    Returns:
+        bool: whether the file was downloaded, False if the download was stopped
+    """
+    part_path, state_path = path + PART_FILE_SUFFIX, path + STATE_FILE_SUFFIX
+
+    # the first byte tells whether ranges are supported, and the size and version of the file
+    resp = send_request(session, method="get", url=url, headers={"Range": "bytes=0-0"}, stream=True, **kwargs)
+    try:
+        if resp.status_code == 200:
+            logger.debug(f"Ranges are not supported for {url}, it is downloaded in a single request.")
+            with open(part_path, "wb") as fp:
+                for data in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    fp.write(data)
+            _complete(part_path, state_path, path, expected_size=None, expected_md5=None)
+            return True
+        if resp.status_code != 206:
+            raise ValueError(f"Failed to download {url}, status_code={resp.status_code}.")
+        remote_file = _RemoteFile(
+            size=int(resp.headers["Content-Range"].rpartition("/")[2]),
+            etag=resp.headers.get("ETag"),
+            md5=resp.headers.get("x-ms-blob-content-md5") or resp.headers.get("Content-MD5"),
+        )
+    finally:
+        resp.close()
+
+    state = _DownloadState(state_path, remote_file, range_size)
+    if not os.path.exists(part_path) or os.path.getsize(part_path) != remote_file.size:
+        state.done.clear()
+    if not state.done:
+        with open(part_path, "wb") as fp:
+            fp.truncate(remote_file.size)
+
+    ranges = [range_index for range_index in range(-(-remote_file.size // range_size)) if range_index not in state.done]
+    if len(state.done) > 0:
+        logger.info(f"Resuming download of {url}, {len(state.done)} ranges are already downloaded.")
+
+    def _download_range(range_index: int) -> None:
+        if stop is not None and stop.is_set():
+            return
+        start = range_index * range_size
+        end = min(remote_file.size, start + range_size) - 1
+        _download_range_with_retries(session, url, part_path, start, end, **kwargs)
+        state.mark_done(range_index)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{TOOL_NAME}-range") as executor:
+        range_futures = [executor.submit(_download_range, range_index) for range_index in ranges]
+        try:
+            # raise the first failure, completed ranges are kept for the next attempt
+            for range_future in range_futures:
+                range_future.result()
+        finally:
+            # only running ranges are waited for, cancel_futures of Executor.shutdown is not available before python 3.9
+            for range_future in range_futures:
+                range_future.cancel()
+
+    if any(range_index not in state.done for range_index in ranges):
+        # the part file and its state are kept, the download is resumed by the next attempt
+        logger.debug(f"Stopped download of {url}, {len(state.done)} ranges are downloaded.")
+        return False
+
+    _complete(part_path, state_path, path, expected_size=remote_file.size, expected_md5=remote_file.md5)
+    return True
+
+
+def _download_range_with_retries(session: requests.Session, url: str, part_path: str, start: int, end: int, **kwargs: Any) -> None:
+    for attempt in range(MAX_RANGE_RETRIES + 1):
+        try:
+            _download_range(session, url, part_path, start, end, **kwargs)
+            return
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, ValueError) as e:
+            if attempt == MAX_RANGE_RETRIES:
+                raise
+            logger.debug(f"Retrying range {start}-{end} of {url}. {e}")
+
+
+def _download_range(session: requests.Session, url: str, part_path: str, start: int, end: int, **kwargs: Any) -> None:
+    resp = send_request(session, method="get", url=url, headers={"Range": f"bytes={start}-{end}"}, stream=True, **kwargs)
+    try:
+        if resp.status_code != 206:
+            raise ValueError(f"Failed to download range {start}-{end} of {url}, status_code={resp.status_code}.")
+        written = 0
+        with open(part_path, "r+b") as fp:
+            fp.seek(start)
+            for data in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                fp.write(data)
+                written += len(data)
+    finally:
+        resp.close()
+
+    if written != end - start + 1:
+        raise ValueError(f"Range {start}-{end} of {url} is incomplete, received {written} bytes.")
+
+
+def _complete(part_path: str, state_path: str, path: str, expected_size: Optional[int], expected_md5: Optional[str]) -> None:
+    try:
+        if expected_size is not None and os.path.getsize(part_path) != expected_size:
+            raise ValueError(f"Downloaded file {path} has {os.path.getsize(part_path)} bytes, expected {expected_size}.")
+        if expected_md5 is not None and (md5 := _file_md5(part_path)) != expected_md5:
+            raise ValueError(f"Downloaded file {path} has MD5 digest {md5}, expected {expected_md5}.")
+    except ValueError:
+        # a corrupted download can not be resumed
+        _remove_files([part_path, state_path])
+        raise
+
+    os.replace(part_path, path)
+    _remove_files([state_path])
+
+
+def _file_md5(path: str) -> str:
+    md5 = hashlib.md5()  # nosec - used for integrity, not security
+    with open(path, "rb") as fp:
+        while data := fp.read(DOWNLOAD_CHUNK_SIZE):
+            md5.update(data)
+    return base64.b64encode(md5.digest()).decode()
+
+
+def _remove_files(paths: List[str]) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,146 @@
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from powerpwn.cli.const import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+DEFAULT_RATE = 20.0
+MIN_RATE = 0.5
+MAX_RATE = 100.0
+DEFAULT_BURST = 10
+RATE_DECREASE_FACTOR = 0.5
+RATE_INCREASE_STEP = 0.1
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class TokenBucket:
+    """
+    A thread safe token bucket with an adaptive refill rate.
+    The rate is halved whenever the host throttles and recovers additively on every successful request (AIMD).
+    Concurrent requests throttled by the same event, i.e within the hold or refill period of the last decrease, halve the rate once.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, min_rate: float = MIN_RATE, max_rate: float = MAX_RATE) -> None:
+        self.__lock = threading.Lock()
+        self.__rate = rate
+        self.__burst = burst
+        self.__min_rate = min_rate
+        self.__max_rate = max_rate
+        self.__tokens = float(burst)
+        self.__last_refill = time.monotonic()
+        self.__blocked_until = 0.0
+        # throttles until then belong to the throttle event which last decreased the rate
+        self.__decreased_until = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
+    def acquire(self) -> None:
+        """
+        Block until a request is allowed to be sent
+        """
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                if now >= self.__blocked_until:
+                    self.__refill(now)
+                    if self.__tokens >= 1:
+                        self.__tokens -= 1
+                        return
+                    wait = (1 - self.__tokens) / self.__rate
+                else:
+                    wait = self.__blocked_until - now
+            time.sleep(wait)
+
+    def block(self, seconds: float) -> None:
+        """
+        Hold every request to this host for the given amount of seconds and slow down the refill rate, once per throttle event
+
+        Args:
+            seconds (float): seconds to wait before sending the next request
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__blocked_until = max(self.__blocked_until, now + seconds)
+            if now >= self.__decreased_until:
+                self.__rate = max(self.__min_rate, self.__rate * RATE_DECREASE_FACTOR)
+                self.__decreased_until = max(self.__blocked_until, now + 1 / self.__rate)
+            self.__tokens = 0.0
+            self.__last_refill = self.__blocked_until
+
+    def reward(self) -> None:
+        with self.__lock:
+            self.__rate = min(self.__max_rate, self.__rate + RATE_INCREASE_STEP)
+
+    def __refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.__last_refill)
+        self.__tokens = min(float(self.__burst), self.__tokens + elapsed * self.__rate)
+        self.__last_refill = now
+
+
+class RateLimiter:
+    """
+    Process-wide per host rate limiter, shared by every worker sending requests to the same host
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        self.__lock = threading.Lock()
+        self.__rate = rate
+        self.__burst = burst
+        self.__buckets: Dict[str, TokenBucket] = dict()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        with self.__lock:
+            if host not in self.__buckets:
+                self.__buckets[host] = TokenBucket(rate=self.__rate, burst=self.__burst)
+            return self.__buckets[host]
+
+    def acquire(self, url: str) -> None:
+        self.bucket(url).acquire()
+
+    def on_success(self, url: str) -> None:
+        self.bucket(url).reward()
+
+    def on_throttled(self, url: str, attempt: int, seconds_to_wait: Optional[float] = None) -> float:
+        """
+        Register a throttled request, all following requests to the same host will wait before being sent
+
+        Args:
+            url (str): throttled request url
+            attempt (int): number of retries already made for this request
+            seconds_to_wait (Optional[float]): wait requested by the service, if any
+
+        Returns:
+            float: seconds all requests to the host are held for
+        """
+        if seconds_to_wait is None:
+            seconds_to_wait = backoff_with_jitter(attempt)
+        else:
+            # add jitter so that workers released together do not throttle again together
+            seconds_to_wait += random.uniform(0, 1)  # nosec
+
+        bucket = self.bucket(url)
+        bucket.block(seconds_to_wait)
+        logger.info(f"API throttled by {urlparse(url).netloc}, holding requests for {seconds_to_wait:.1f} seconds (rate={bucket.rate:.1f} req/s).")
+        return seconds_to_wait
+
+
+def backoff_with_jitter(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt (int): number of retries already made
+    """
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2**attempt))  # nosec
+
+
+rate_limiter = RateLimiter()
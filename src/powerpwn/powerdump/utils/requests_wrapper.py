@@ -1,20 +1,139 @@
+import email.utils
 import logging
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Generator, Iterator, List, NamedTuple, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from powerpwn.cli.const import LOGGER_NAME, TOOL_NAME
+from powerpwn.powerdump.utils.const import POWER_APPS_API_URL
+from powerpwn.powerdump.utils.http_cache import ConditionalRequestAdapter, HttpValidatorCache
+from powerpwn.powerdump.utils.http_recorder import HostRedirectAdapter, HttpRecorder, ReplayAdapter
+from powerpwn.powerdump.utils.rate_limiter import rate_limiter
 
 logger = logging.getLogger(LOGGER_NAME)
 
+MAX_RETRIES = 10
+DEFAULT_POOL_MAXSIZE = 16
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
-def init_session(token: str) -> requests.Session:
+
+class TransportOptions(NamedTuple):
+    """
+    record_path: capture every request / response pair to this directory
+    replay_path: serve responses captured to this directory instead of sending requests
+    redirect_url: send every request to this base url, e.g. a local stand-in server
+    """
+
+    record_path: Optional[str] = None
+    replay_path: Optional[str] = None
+    redirect_url: Optional[str] = None
+
+
+def init_session(
+    token: str, http_cache_path: Optional[str] = None, transport: TransportOptions = TransportOptions(), pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+) -> requests.Session:
     session = requests.Session()
     session.headers = {"accept": "application/json", "Authorization": token, "User-Agent": TOOL_NAME}
+
+    if transport.replay_path:
+        replay_adapter = ReplayAdapter(transport.replay_path)
+        session.mount("https://", replay_adapter)
+        session.mount("http://", replay_adapter)
+        return session
+
+    adapter_kwargs = {"pool_connections": pool_maxsize, "pool_maxsize": pool_maxsize}
+    adapter = HostRedirectAdapter(transport.redirect_url, **adapter_kwargs) if transport.redirect_url else HTTPAdapter(**adapter_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if http_cache_path:
+        # revalidate Power Apps resource listings and connector specs instead of downloading them again
+        session.mount(POWER_APPS_API_URL, ConditionalRequestAdapter(HttpValidatorCache(http_cache_path), adapter))
+
+    if transport.record_path:
+        session.hooks["response"].append(HttpRecorder(transport.record_path).record)
+
     return session
 
 
+class PageIterator:
+    """
+    Iterate over a paginated listing one page at a time, so only the current page is held in memory.
+    The next page is requested with the value of property_for_pagination: when it is a link (nextLink style) it replaces the request url,
+    otherwise (continuationToken style) it is passed as a query parameter of the same name.
+    success is False if any of the page requests failed.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        expected_status_prefix: str = "200",
+        property_to_extract_data: str = "value",
+        property_for_pagination: str = "continuationToken",
+        **kwargs,
+    ) -> None:
+        self.__session = session
+        self.__expected_status_prefix = expected_status_prefix
+        self.__property_to_extract_data = property_to_extract_data
+        self.__property_for_pagination = property_for_pagination
+        self.__kwargs = kwargs
+        self.success = False
+
+    def __iter__(self) -> Iterator[List[Dict[str, Any]]]:
+        request_kwargs = self.__kwargs
+        has_items = False
+        cont_token = None
+
+        while True:
+            self.success, _, resp_obj = request_and_verify(
+                session=self.__session, expected_status_prefix=self.__expected_status_prefix, method="get", **request_kwargs
+            )
+            if not self.success:
+                return
+
+            if self.__property_to_extract_data not in resp_obj and has_items:
+                raise ValueError("Inconsistent responses.")
+            if self.__property_to_extract_data not in resp_obj and not has_items:
+                logger.warning(f"Expected an array response, received an object: {resp_obj}. Request: {self.__kwargs}.")
+                page = [resp_obj]
+            else:
+                page = resp_obj[self.__property_to_extract_data]
+
+            has_items = has_items or len(page) > 0
+            next_page = resp_obj.get(self.__property_for_pagination)
+            yield page
+
+            if next_page in (None, "", cont_token):
+                return
+            cont_token = next_page
+            request_kwargs = next_page_kwargs(request_kwargs, self.__property_for_pagination, next_page)
+
+    def items(self) -> Iterator[Dict[str, Any]]:
+        for page in self:
+            yield from page
+
+
+def next_page_kwargs(request_kwargs: Dict[str, Any], property_for_pagination: str, next_page: str) -> Dict[str, Any]:
+    """
+    Build the request of the next page of a paginated listing
+
+    Args:
+        request_kwargs (Dict[str, Any]): request of the current page
+        property_for_pagination (str): name of the pagination property in the response
+        next_page (str): value of the pagination property in the response
+
+    Returns:
+        Dict[str, Any]: request of the next page
+    """
+    if next_page.startswith("https://") or next_page.startswith("http://"):
+        # links already carry the original query parameters
+        return {**request_kwargs, "url": next_page, "params": {}}
+
+    return {**request_kwargs, "params": {**(request_kwargs.get("params") or {}), property_for_pagination: next_page}}
+
+
 def consecutive_gets(
     session: requests.Session,
     expected_status_prefix: str = "200",
@@ -22,51 +141,94 @@ def consecutive_gets(
     property_for_pagination: str = "continuationToken",
     **kwargs,
 ):
-    value: List[Dict[str, Any]] = []
-    success = False
-    cont_token = ""  # nosec
-
-    resp_obj = {property_for_pagination: "NOT_EMPTY"}
-    while resp_obj.get(property_for_pagination) not in (None, cont_token):
-        cont_token = resp_obj.get(property_for_pagination, "")
+    pages = PageIterator(
+        session,
+        expected_status_prefix=expected_status_prefix,
+        property_to_extract_data=property_to_extract_data,
+        property_for_pagination=property_for_pagination,
+        **kwargs,
+    )
+    value: List[Dict[str, Any]] = list(pages.items())
 
-        success, _, resp_obj = request_and_verify(session=session, expected_status_prefix=expected_status_prefix, method="get", **kwargs)
-        if not success:
-            break
+    return pages.success, value
 
-        if property_to_extract_data not in resp_obj and value != []:
-            raise ValueError("Inconsistent responses.")
-        if property_to_extract_data not in resp_obj and value == []:
-            logger.warning(f"Expected an array response, received an object: {resp_obj}. Request: {kwargs}.")
-            success = True
-            value += [resp_obj]
-        else:
-            success = True
-            value += resp_obj[property_to_extract_data]
 
-    return success, value
+def request_and_verify(
+    session: requests.Session, expected_status_prefix: str = "200", is_json_resp: bool = True, is_raw_resp: bool = False, **kwargs
+):
+    """
+    Send a request and verify its status code
 
+    Args:
+        session (requests.Session): session to send the request with
+        expected_status_prefix (str): prefix of the status codes of successful responses
+        is_json_resp (bool): decode the response as JSON, otherwise it is returned as text
+        is_raw_resp (bool): return the response body as an iterator of raw byte chunks, which are read from the network as they are consumed.
+                            The body is never decoded, nor held in memory in full.
 
-def request_and_verify(session: requests.Session, expected_status_prefix: str = "200", is_json_resp: bool = True, **kwargs):
+    Returns:
+        success, response headers and response body
+    """
     success = False
     resp_obj = None
     resp_head = None
 
-    logger.debug(f"Triggering request ({kwargs}).")
-    resp = session.request(**kwargs)
-    resp_obj = __get_resp_obj(resp) if is_json_resp else resp.text
+    if is_raw_resp:
+        kwargs["stream"] = True
+    resp = send_request(session, **kwargs)
     if str(resp.status_code).startswith(expected_status_prefix):
         resp_head = resp.headers
         success = True
+        if is_raw_resp:
+            return success, resp_head, __iter_raw_content(resp)
     else:
-        if resp.status_code == 429:
-            __handle_throttling(resp_obj)
-            return request_and_verify(session, expected_status_prefix, **kwargs)
         logger.info(f"Failed at request ({kwargs}) with status_code={resp.status_code} and content={str(resp.content)}.")
 
+    resp_obj = __get_resp_obj(resp) if is_json_resp and not is_raw_resp else resp.text
+    resp.close()
     return success, resp_head, resp_obj
 
 
+def send_request(session: requests.Session, max_retries: int = MAX_RETRIES, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared per host rate limiter, retrying throttled requests
+
+    Args:
+        session (requests.Session): session to send the request with
+        max_retries (int): retry budget for throttled requests
+
+    Returns:
+        requests.Response: the last response received
+    """
+    url = kwargs["url"]
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire(url)
+
+        logger.debug(f"Triggering request ({kwargs}).")
+        resp = session.request(**kwargs)
+        if resp.status_code != 429:
+            # failures, e.g 5xx responses of an overloaded host, do not speed the host up
+            if resp.status_code < 400:
+                rate_limiter.on_success(url)
+            return resp
+
+        if attempt < max_retries:
+            rate_limiter.on_throttled(url, attempt, __get_throttling_wait(resp))
+            # release the connection of a streamed response before retrying
+            resp.close()
+
+    logger.warning(f"Retry budget of {max_retries} exhausted for throttled request ({kwargs}).")
+    return resp
+
+
+def __iter_raw_content(resp: requests.Response) -> Generator[bytes, None, None]:
+    try:
+        # decode_unicode is off, chunks are the bytes sent by the server
+        yield from resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+    finally:
+        resp.close()
+
+
 def __get_resp_obj(resp) -> Optional[Dict]:
     resp_obj = None
     try:
@@ -77,12 +239,22 @@ def __get_resp_obj(resp) -> Optional[Dict]:
     return resp_obj
 
 
-def __handle_throttling(resp_obj) -> None:
-    message = resp_obj.get("message", "") if resp_obj else ""
+def __get_throttling_wait(resp: requests.Response) -> Optional[float]:
+    if retry_after := resp.headers.get("Retry-After"):
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            logger.debug(f"Failed to parse Retry-After header: {retry_after}.")
+
+    resp_obj = __get_resp_obj(resp)
+    message = resp_obj.get("message", "") if isinstance(resp_obj, dict) else ""
     throttling_message_prefix = "Rate limit is exceeded. Try again in "
     if throttling_message_prefix in message:
-        seconds_to_wait = int(message.partition(throttling_message_prefix)[2].partition(" seconds")[0])
-        logger.info(f"API throttled, going to sleep {seconds_to_wait + 1} before retry")
-        time.sleep(seconds_to_wait + 1)
-    else:
-        time.sleep(20)
+        try:
+            return float(message.partition(throttling_message_prefix)[2].partition(" seconds")[0]) + 1
+        except ValueError:
+            logger.debug(f"Failed to parse throttling message: {message}.")
+
+    return None
@@ -0,0 +1,179 @@
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple, Type
+
+from powerpwn.powerdump.collect.models.canvas_app_entity import CanvasApp
+from powerpwn.powerdump.collect.models.connection_entity import Connection
+from powerpwn.powerdump.collect.models.connector_entity import Connector
+from powerpwn.powerdump.collect.models.resource_entity_base import BodyLoader, ResourceEntityBase
+from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
+from powerpwn.powerdump.utils.entity_store import EntityStamps, IEntityStore, entity_index, open_entity_store
+from powerpwn.powerdump.utils.json_utils import loads
+from powerpwn.powerdump.utils.spec_store import SPEC_REF_KEY, SpecStore, dereference_connector
+
+ENTITY_TYPE_TO_MODEL: Dict[ResourceType, Type[ResourceEntityBase]] = {
+    ResourceType.connection: Connection,
+    ResourceType.canvas_app: CanvasApp,
+    ResourceType.connector: Connector,
+}
+
+# when more entities changed, they are read in a single scan of the store rather than one by one
+_BULK_READ_THRESHOLD = 100
+
+_EntityKey = Tuple[str, str]
+
+
+class _EntityIndex:
+    """
+    Entities of a single type, indexed by (env_id, entity_id), environment, connector id and creator principal id
+    """
+
+    def __init__(self) -> None:
+        self.entities: Dict[_EntityKey, ResourceEntityBase] = dict()
+        self.stamps: EntityStamps = dict()
+        self.by_env: Dict[str, Dict[_EntityKey, None]] = dict()
+        self.by_connector: Dict[str, Dict[_EntityKey, None]] = dict()
+        self.by_principal: Dict[str, Dict[_EntityKey, None]] = dict()
+
+    def put(self, key: _EntityKey, entity: ResourceEntityBase, stamp: int) -> None:
+        self.remove(key)
+        self.entities[key] = entity
+        self.stamps[key] = stamp
+        index = entity_index(entity)
+        for keys_index, value in ((self.by_env, key[0]), (self.by_connector, index["connector_id"]), (self.by_principal, index["created_by"])):
+            if value is not None:
+                keys_index.setdefault(value, dict())[key] = None
+
+    def remove(self, key: _EntityKey) -> None:
+        if (entity := self.entities.pop(key, None)) is None:
+            return
+        self.stamps.pop(key, None)
+        index = entity_index(entity)
+        for keys_index, value in ((self.by_env, key[0]), (self.by_connector, index["connector_id"]), (self.by_principal, index["created_by"])):
+            if value is not None and value in keys_index:
+                keys_index[value].pop(key, None)
+                if not keys_index[value]:
+                    del keys_index[value]
+
+    def query(self, env_id: Optional[str], connector_id: Optional[str], created_by: Optional[str]) -> List[ResourceEntityBase]:
+        candidates = [
+            keys_index.get(value, dict())
+            for keys_index, value in ((self.by_env, env_id), (self.by_connector, connector_id), (self.by_principal, created_by))
+            if value is not None
+        ]
+        if not candidates:
+            return list(self.entities.values())
+
+        smallest = min(candidates, key=len)
+        return [self.entities[key] for key in smallest if all(key in keys for keys in candidates)]
+
+
+class ResourceCatalog:
+    """
+    An in-memory catalog of the resources cached by recon, indexed by environment, connector id, entity id and creator principal.
+    Every resource is parsed once, a refresh parses again only resources whose record changed since they were loaded.
+    Only the headers of resources are read, their bodies, e.g raw_json and connector specs, are read on first access.
+    Entities are shared by all callers, and must not be modified.
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        self.__cache_path = cache_path
+        self.__lock = threading.Lock()
+        self.__store: Optional[IEntityStore] = None
+        self.__generation: Optional[Hashable] = None
+        self.__indexes: Dict[ResourceType, _EntityIndex] = {entity_type: _EntityIndex() for entity_type in ENTITY_TYPE_TO_MODEL}
+
+    def refresh(self) -> None:
+        """
+        Load resources that were added or changed since the last refresh, and drop removed resources
+        """
+        with self.__lock:
+            store = open_entity_store(self.__cache_path)
+            if self.__store is None or not isinstance(store, type(self.__store)):
+                # the cache was cleared and collected again into a different store
+                self.__indexes = {entity_type: _EntityIndex() for entity_type in ENTITY_TYPE_TO_MODEL}
+                self.__generation = None
+            self.__store = store
+
+            generation = store.generation()
+            if generation == self.__generation:
+                return
+
+            spec_store = SpecStore(self.__cache_path)
+            for entity_type, index in self.__indexes.items():
+                self.__refresh_index(store, spec_store, entity_type, index)
+            self.__generation = generation
+
+    def entities(
+        self, entity_type: ResourceType, env_id: Optional[str] = None, connector_id: Optional[str] = None, created_by: Optional[str] = None
+    ) -> List[ResourceEntityBase]:
+        with self.__lock:
+            return self.__indexes[entity_type].query(env_id, connector_id, created_by)
+
+    def get(self, entity_type: ResourceType, env_id: str, entity_id: str) -> Optional[ResourceEntityBase]:
+        with self.__lock:
+            return self.__indexes[entity_type].entities.get((env_id, entity_id))
+
+    def environment_ids(self) -> List[str]:
+        with self.__lock:
+            return self.__store.environment_ids() if self.__store is not None else []
+
+    def __refresh_index(self, store: IEntityStore, spec_store: SpecStore, entity_type: ResourceType, index: _EntityIndex) -> None:
+        stamps = store.stamps(entity_type)
+        for removed_key in set(index.stamps) - set(stamps):
+            index.remove(removed_key)
+
+        changed: Set[_EntityKey] = {key for key, stamp in stamps.items() if index.stamps.get(key) != stamp}
+        if not changed:
+            return
+
+        if len(changed) > _BULK_READ_THRESHOLD:
+            records = ((record.env_id or "", record.entity_id, record.content) for record in store.read_all(entity_type))
+        else:
+            records = ((env_id, entity_id, store.read(env_id, entity_type, entity_id)) for env_id, entity_id in changed)
+
+        model = ENTITY_TYPE_TO_MODEL[entity_type]
+        for env_id, entity_id, content in records:
+            key = (env_id, entity_id)
+            if key not in changed or content is None:
+                continue
+            raw_entity = loads(content)
+            if "raw_json" in raw_entity:
+                # a record written before bodies were stored apart, loaded in full
+                if entity_type == ResourceType.connector:
+                    raw_entity = dereference_connector(raw_entity, spec_store)
+                # records were written by recon, so they are only validated if written by another data model version
+                entity = model.parse_trusted(raw_entity)
+            else:
+                body_loader = _body_loader(store, spec_store, entity_type, env_id, entity_id, raw_entity.pop(SPEC_REF_KEY, None))
+                entity = model.parse_header(raw_entity, body_loader)
+            index.put(key, entity, stamps[key])
+
+
+def _body_loader(
+    store: IEntityStore, spec_store: SpecStore, entity_type: ResourceType, env_id: str, entity_id: str, spec_hash: Optional[str]
+) -> BodyLoader:
+    def _load_body() -> Dict[str, Any]:
+        body = store.read_body(env_id, entity_type, entity_id)
+        raw_json = loads(body) if body is not None else dict()
+        if spec_hash is None:
+            return {"raw_json": raw_json}
+        swagger = spec_store.get(spec_hash)
+        raw_json.setdefault("properties", {})["swagger"] = swagger
+        return {"raw_json": raw_json, "swagger": swagger}
+
+    return _load_body
+
+
+_catalogs: Dict[str, ResourceCatalog] = dict()
+_catalogs_lock = threading.Lock()
+
+
+def get_resource_catalog(cache_path: str) -> ResourceCatalog:
+    """
+    The refreshed resource catalog of a cache path, catalogs are kept for the lifetime of the process
+    """
+    with _catalogs_lock:
+        if (catalog := _catalogs.get(cache_path)) is None:
+            catalog = _catalogs[cache_path] = ResourceCatalog(cache_path)
+    catalog.refresh()
+    return catalog
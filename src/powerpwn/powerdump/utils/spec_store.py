@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+from powerpwn.powerdump.collect.models.connector_entity import Connector
+from powerpwn.powerdump.utils.file_utils import write_atomic
+from powerpwn.powerdump.utils.json_utils import loads
+from powerpwn.powerdump.utils.path_utils import specs_path
+
+# key of the spec hash in connector records whose swagger is kept in the spec store
+SPEC_REF_KEY = "swagger_ref"
+# total size of the spec contents kept in memory, specs of a large tenant are read from disk again once evicted
+SPEC_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class SpecStore:
+    """
+    A content-addressed store of connector OpenAPI specs, shared by all environments of a tenant.
+    Identical specs, e.g of the same Microsoft connector in different environments, are stored once.
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        self.__specs_path = specs_path(cache_path)
+
+    def put(self, swagger: Dict[str, Any]) -> str:
+        """
+        Store a spec, unless an identical spec is already stored
+
+        Returns:
+            str: content hash to reference the spec with
+        """
+        content = json.dumps(swagger, sort_keys=True).encode()
+        spec_hash = hashlib.sha256(content).hexdigest()
+        spec_path = self.__spec_path(spec_hash)
+        if not os.path.exists(spec_path):
+            os.makedirs(self.__specs_path, exist_ok=True)
+            write_atomic(spec_path, content)
+        return spec_hash
+
+    def get(self, spec_hash: str) -> Dict[str, Any]:
+        # every call returns a new object, so callers are free to modify it
+        return loads(_spec_cache.read(self.__spec_path(spec_hash)))
+
+    def __spec_path(self, spec_hash: str) -> str:
+        return os.path.join(self.__specs_path, f"{spec_hash}.json")
+
+
+class _SpecCache:
+    """
+    A thread safe LRU cache of spec contents, bounded by their total size rather than by their number, as a single spec may be several MB.
+    Specs are content-addressed and never change once written, so their content is safe to cache.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.__max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__contents: "OrderedDict[str, bytes]" = OrderedDict()
+        self.__total_bytes = 0
+
+    def read(self, spec_path: str) -> bytes:
+        with self.__lock:
+            if spec_path in self.__contents:
+                self.__contents.move_to_end(spec_path)
+                return self.__contents[spec_path]
+
+        with open(spec_path, "rb") as fp:
+            content = fp.read()
+
+        with self.__lock:
+            if spec_path not in self.__contents and len(content) <= self.__max_bytes:
+                self.__contents[spec_path] = content
+                self.__total_bytes += len(content)
+                while self.__total_bytes > self.__max_bytes:
+                    _, evicted = self.__contents.popitem(last=False)
+                    self.__total_bytes -= len(evicted)
+        return content
+
+    @property
+    def total_bytes(self) -> int:
+        return self.__total_bytes
+
+
+_spec_cache = _SpecCache(SPEC_CACHE_MAX_BYTES)
+
+
+def reference_connector(connector: Connector, spec_store: SpecStore) -> str:
+    """
+    Serialize a connector record with its swagger moved to the spec store
+    """
+    raw_connector = json.loads(connector.json(exclude={"swagger": True, "raw_json": {"properties": {"swagger"}}}))
+    raw_connector[SPEC_REF_KEY] = spec_store.put(connector.swagger)
+    return json.dumps(raw_connector)
+
+
+def dereference_connector(raw_connector: Dict[str, Any], spec_store: SpecStore) -> Dict[str, Any]:
+    """
+    Fill in the swagger of a connector record that references the spec store, records with an inline swagger are returned as is
+    """
+    if (spec_hash := raw_connector.pop(SPEC_REF_KEY, None)) is not None:
+        swagger = spec_store.get(spec_hash)
+        raw_connector["swagger"] = swagger
+        raw_connector["raw_json"].setdefault("properties", {})["swagger"] = swagger
+    return raw_connector
@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+import pytest
+from pydantic import ValidationError
+
+from powerpwn.powerdump.collect.models.canvas_app_entity import CanvasApp
+from powerpwn.powerdump.collect.models.connection_entity import Connection
+from powerpwn.powerdump.collect.models.resource_entity_base import ResourceEntityBase
+from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils.const import DATA_MODEL_VERSION
+from powerpwn.powerdump.utils.entity_store import open_entity_store
+from powerpwn.powerdump.utils.json_utils import loads
+
+from .conftest import recon_emulated_tenant
+
+
+def test_trusted_parse_matches_validated_parse(tmp_path, unthrottled) -> None:
+    recon_emulated_tenant(SyntheticTenant(environments=1, connections_per_environment=11, canvas_apps_per_environment=4), str(tmp_path))
+
+    entity_store = open_entity_store(str(tmp_path))
+    for entity_type, model in ((ResourceType.connection, Connection), (ResourceType.canvas_app, CanvasApp)):
+        for record in entity_store.read_all(entity_type, include_body=True):
+            raw_entity = {**loads(record.content), "raw_json": loads(record.body)}
+            trusted = model.parse_trusted(raw_entity)
+            assert trusted == model.parse_obj(raw_entity)
+            assert trusted.json(exclude=set(model.BODY_FIELDS)) == record.content
+
+
+def test_other_data_model_versions_are_validated() -> None:
+    with pytest.raises(ValidationError):
+        Connection.parse_trusted({"data_model_version": "0.0.0", "entity_id": "connection"})
+    with pytest.raises(ValidationError):
+        Connection.parse_trusted({"entity_id": "connection"})
+
+
+def test_body_is_loaded_once_by_concurrent_readers() -> None:
+    loads_count = 0
+    readers = 8
+    barrier = threading.Barrier(readers)
+
+    def _slow_body_loader() -> Dict[str, Any]:
+        nonlocal loads_count
+        loads_count += 1
+        # other readers find the body missing while it is loaded
+        time.sleep(0.05)
+        return {"raw_json": {"name": "connection"}}
+
+    header = {"data_model_version": DATA_MODEL_VERSION, "entity_type": ResourceType.canvas_app, "entity_id": "app", "display_name": "app"}
+    entity = ResourceEntityBase.parse_header(header, _slow_body_loader)
+
+    def _read_body(_: int) -> Dict[str, Any]:
+        barrier.wait()
+        return entity.raw_json
+
+    with ThreadPoolExecutor(max_workers=readers) as executor:
+        bodies = list(executor.map(_read_body, range(readers)))
+
+    assert bodies == [{"name": "connection"}] * readers
+    assert loads_count == 1
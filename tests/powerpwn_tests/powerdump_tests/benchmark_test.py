@@ -0,0 +1,21 @@
+from powerpwn.powerdump.emulator import benchmark
+
+
+def test_benchmarks_cover_collection_loading_and_rendering(tmp_path) -> None:
+    results = benchmark.run_benchmarks(scale=40, work_dir=str(tmp_path), profile_memory=False)
+
+    names = {result.name for result in results}
+    assert {"ResourcesCollector.collect_and_cache", "DataCollector.collect", "register_specs", "Connector.processed_swagger"} <= names
+    assert {"model_loaders.load_connections", "gui.full_resources_table", "gui.get_resource_page.connector"} <= names
+    assert next(result for result in results if result.name == "model_loaders.load_connectors").items == len(benchmark.CONNECTOR_IDS)
+
+
+def test_compare_results_with_baseline(tmp_path) -> None:
+    baseline_path = str(tmp_path / "baseline.json")
+    benchmark.write_results([benchmark.BenchmarkResult(name="register_specs", scale=40, seconds=2.0, peak_memory_bytes=100, items=1)], baseline_path)
+
+    lines = benchmark.compare_results(
+        [benchmark.BenchmarkResult(name="register_specs", scale=40, seconds=1.0, peak_memory_bytes=200, items=1)], baseline_path
+    )
+
+    assert lines == ["register_specs @ 40: 2.000s -> 1.000s (0.50x), peak memory 2.00x"]
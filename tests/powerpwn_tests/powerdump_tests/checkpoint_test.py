@@ -0,0 +1,110 @@
+import os
+import threading
+from typing import Any, List
+
+import pytest
+
+from powerpwn.cli.const import TOOL_NAME
+from powerpwn.powerdump.collect.data_collectors.connections_data_collectors import connections_data_collector
+from powerpwn.powerdump.collect.data_collectors.data_collector import DataCollector
+from powerpwn.powerdump.collect.resources_collectors.resources_collector import ResourcesCollector
+from powerpwn.powerdump.emulator.server import EmulatorServer
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils.checkpoint import Checkpoint
+from powerpwn.powerdump.utils.file_utils import atomic_open
+from powerpwn.powerdump.utils.path_utils import collected_data_path, dump_checkpoint_path, recon_checkpoint_path
+from powerpwn.powerdump.utils.requests_wrapper import TransportOptions
+
+from .conftest import recon_emulated_tenant
+from .emulator_test import _assert_same_tree
+
+
+def test_checkpoint_survives_partial_last_line(tmp_path) -> None:
+    path = str(tmp_path / "checkpoint.jsonl")
+    checkpoint = Checkpoint(path)
+    checkpoint.mark_done("env", "connection")
+    with open(path, "a") as fp:
+        fp.write('["env", "conn')
+
+    checkpoint = Checkpoint(path)
+    assert checkpoint.is_done("env", "connection") and len(checkpoint) == 1
+    checkpoint.mark_done("env", "other")
+    assert Checkpoint(path).is_done("env", "other")
+
+
+def _dump_threads() -> List[threading.Thread]:
+    return [thread for thread in threading.enumerate() if thread.name.startswith(TOOL_NAME)]
+
+
+def _join_dump_threads() -> None:
+    for thread in _dump_threads():
+        thread.join()
+
+
+def test_interrupted_dump_is_resumed(tmp_path, monkeypatch, unthrottled) -> None:
+    tenant = SyntheticTenant(environments=1, connections_per_environment=8, records_per_connection=2, canvas_apps_per_environment=0)
+    full_path, resumed_path = str(tmp_path / "full"), str(tmp_path / "resumed")
+    writes: List[str] = []
+
+    def _interrupting_atomic_open(path: str, *args: Any, **kwargs: Any) -> Any:
+        if len(writes) >= 5:
+            raise KeyboardInterrupt()
+        writes.append(path)
+        return atomic_open(path, *args, **kwargs)
+
+    with EmulatorServer(tenant) as server:
+        transport = TransportOptions(redirect_url=server.url)
+        for cache_path in (full_path, resumed_path):
+            ResourcesCollector(cache_path=cache_path, token="emulated", transport=transport).collect_and_cache()
+        DataCollector(cache_path=full_path, token="emulated", transport=transport).collect()
+
+        monkeypatch.setattr(connections_data_collector, "atomic_open", _interrupting_atomic_open)
+        with pytest.raises(KeyboardInterrupt):
+            DataCollector(cache_path=resumed_path, token="emulated", transport=transport).collect()
+        # the interrupted run does not wait for running connections, they stop between records
+        _join_dump_threads()
+
+        resumed_writes: List[str] = []
+        monkeypatch.setattr(
+            connections_data_collector, "atomic_open", lambda path, *args, **kwargs: resumed_writes.append(path) or atomic_open(path, *args, **kwargs)
+        )
+        DataCollector(cache_path=resumed_path, token="emulated", transport=transport, resume=True).collect()
+
+    assert not set(writes) & set(resumed_writes)
+    assert len(writes) + len(resumed_writes) == sum(len(files) for _, _, files in os.walk(collected_data_path(full_path)))
+    _assert_same_tree(collected_data_path(full_path), collected_data_path(resumed_path))
+    # completed runs leave no checkpoint behind to resume from
+    for cache_path in (full_path, resumed_path):
+        assert not os.path.exists(recon_checkpoint_path(cache_path)) and not os.path.exists(dump_checkpoint_path(cache_path))
+
+
+def test_interrupted_dump_does_not_wait_for_running_connections(tmp_path, monkeypatch, unthrottled) -> None:
+    cache_path = str(tmp_path)
+    tenant = SyntheticTenant(environments=1, connections_per_environment=11, records_per_connection=20, canvas_apps_per_environment=0)
+    recon_emulated_tenant(tenant, cache_path)
+    writes: List[str] = []
+    writes_after_interrupt: List[str] = []
+    interrupted, returned = threading.Event(), threading.Event()
+
+    def _interrupting_atomic_open(path: str, *args: Any, **kwargs: Any) -> Any:
+        if interrupted.is_set():
+            # running connections are still dumping a record when the run returns
+            returned.wait(timeout=5)
+            writes_after_interrupt.append(path)
+        elif len(writes) >= 5 and threading.current_thread().name.startswith(f"{TOOL_NAME}-dump"):
+            # interrupt from a connection, not from a record worker that is joined with the other records of its connection
+            interrupted.set()
+            raise KeyboardInterrupt()
+        writes.append(path)
+        return atomic_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(connections_data_collector, "atomic_open", _interrupting_atomic_open)
+    with EmulatorServer(tenant) as server:
+        with pytest.raises(KeyboardInterrupt):
+            DataCollector(cache_path=cache_path, token="emulated", transport=TransportOptions(redirect_url=server.url)).collect()
+        running_threads = _dump_threads()
+        returned.set()
+        _join_dump_threads()
+
+    # running connections stop between records, at most the record each of them was dumping is written
+    assert len(writes_after_interrupt) <= len(running_threads)
@@ -0,0 +1,183 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from powerpwn.powerdump.utils.concurrency import KeyedLimiter, capped_map, ordered_map, walk_tree
+
+
+def test_ordered_map_keeps_input_order() -> None:
+    def _slow_for_small_items(item: int) -> int:
+        time.sleep(0.01 * (5 - item))
+        return item * 2
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(ordered_map(_slow_for_small_items, range(5), executor, max_in_flight=5))
+
+    assert results == [(item, item * 2) for item in range(5)]
+
+
+def test_ordered_map_bounds_pending_calls() -> None:
+    lock = threading.Lock()
+    pending = 0
+    max_pending = 0
+
+    def _track(item: int) -> int:
+        nonlocal pending, max_pending
+        with lock:
+            pending += 1
+            max_pending = max(max_pending, pending)
+        time.sleep(0.005)
+        with lock:
+            pending -= 1
+        return item
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert [result for _, result in ordered_map(_track, range(20), executor, max_in_flight=3)] == list(range(20))
+
+    assert max_pending <= 3
+
+
+def test_ordered_map_raises_failures() -> None:
+    def _fail_on_two(item: int) -> int:
+        if item == 2:
+            raise RuntimeError("failed")
+        return item
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(RuntimeError):
+            list(ordered_map(_fail_on_two, range(5), executor, max_in_flight=2))
+
+
+def test_capped_map_bounds_pending_calls_per_key() -> None:
+    lock = threading.Lock()
+    pending = {"slow": 0, "fast": 0}
+    max_pending = {"slow": 0, "fast": 0}
+    fast_done_at_slow_count = []
+    slow_done = 0
+
+    def _track(item: str) -> str:
+        nonlocal slow_done
+        with lock:
+            pending[item] += 1
+            max_pending[item] = max(max_pending[item], pending[item])
+        time.sleep(0.05 if item == "slow" else 0.005)
+        with lock:
+            pending[item] -= 1
+            if item == "slow":
+                slow_done += 1
+            else:
+                fast_done_at_slow_count.append(slow_done)
+        return item
+
+    # slow items come first, fast items are still dumped alongside them
+    items = ["slow"] * 6 + ["fast"] * 6
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(capped_map(_track, items, executor, max_in_flight=4, key=lambda item: item, max_per_key=2))
+
+    assert sorted(item for item, _ in results) == sorted(items)
+    assert max_pending == {"slow": 2, "fast": 2}
+    assert fast_done_at_slow_count[0] < 6
+
+
+def test_keyed_limiter_bounds_holders_per_key() -> None:
+    limiter = KeyedLimiter(2)
+    lock = threading.Lock()
+    holders = {"a": 0, "b": 0}
+    max_holders = {"a": 0, "b": 0}
+
+    def _hold(key: str) -> None:
+        with limiter.hold(key):
+            with lock:
+                holders[key] += 1
+                max_holders[key] = max(max_holders[key], holders[key])
+            time.sleep(0.005)
+            with lock:
+                holders[key] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(_hold, ["a", "b"] * 8))
+
+    assert max_holders == {"a": 2, "b": 2}
+
+
+def test_capped_map_keys_take_turns() -> None:
+    started = []
+
+    def _track(item: str) -> str:
+        started.append(item)
+        return item
+
+    # one call at a time, so every turn is taken by the next key, not by the first key that has items left
+    items = ["a"] * 3 + ["b"] * 3 + ["c"] * 3
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        list(capped_map(_track, items, executor, max_in_flight=1, key=lambda item: item, max_per_key=3))
+
+    assert started == ["a", "b", "c"] * 3
+
+
+def test_capped_map_serves_keys_by_priority() -> None:
+    lock = threading.Lock()
+    started = []
+
+    def _track(item: str) -> str:
+        with lock:
+            started.append(item)
+        time.sleep(0.01)
+        return item
+
+    # bulk items are listed first, and only take the turns that secrets can not
+    items = ["bulk"] * 4 + ["secret"] * 4
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(
+            capped_map(
+                _track, items, executor, max_in_flight=3, key=lambda item: item, max_per_key=2, key_priority=lambda key: 0 if key == "secret" else 1
+            )
+        )
+
+    assert sorted(item for item, _ in results) == sorted(items)
+    assert started[:2] == ["secret", "secret"] and started[2] == "bulk"
+    assert started.index("bulk") < len(started) - started[::-1].index("secret")
+
+
+def _binary_tree(depth: int):
+    # folders are tuples of their path, files are strings
+    def _list_children(folder: tuple):
+        if len(folder) == depth:
+            return [f"{'/'.join(folder)}/file"]
+        return [folder + (str(index),) for index in range(2)] + [f"{'/'.join(folder)}/file"]
+
+    return _list_children
+
+
+def test_walk_tree_yields_every_item_with_bounded_listings() -> None:
+    lock = threading.Lock()
+    pending = 0
+    max_pending = 0
+    list_children = _binary_tree(depth=4)
+
+    def _track(folder: tuple):
+        nonlocal pending, max_pending
+        with lock:
+            pending += 1
+            max_pending = max(max_pending, pending)
+        time.sleep(0.005)
+        with lock:
+            pending -= 1
+        return list_children(folder)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        items = list(walk_tree(_track, ("root",), lambda child: isinstance(child, tuple), executor, max_in_flight=3))
+
+    assert len(items) == len(set(items)) == 2**4 - 1
+    assert 1 < max_pending <= 3
+
+
+def test_walk_tree_limits() -> None:
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        shallow_items = list(walk_tree(_binary_tree(depth=4), ("root",), lambda child: isinstance(child, tuple), executor, 4, max_depth=1))
+        few_items = list(walk_tree(_binary_tree(depth=4), ("root",), lambda child: isinstance(child, tuple), executor, 4, max_items=5))
+
+    assert sorted(shallow_items) == ["root/0/file", "root/1/file", "root/file"]
+    assert len(few_items) == 5
@@ -0,0 +1,40 @@
+from typing import Any
+
+import pytest
+
+from powerpwn.powerdump.collect.data_collectors.data_collector import DataCollector
+from powerpwn.powerdump.collect.resources_collectors.resources_collector import ResourcesCollector
+from powerpwn.powerdump.emulator.server import EmulatorServer
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils import requests_wrapper
+from powerpwn.powerdump.utils.rate_limiter import MAX_RATE, RateLimiter
+from powerpwn.powerdump.utils.requests_wrapper import TransportOptions
+
+
+@pytest.fixture
+def unthrottled(monkeypatch) -> None:
+    # the emulator is served locally, it does not need the rate limits of the real services
+    monkeypatch.setattr(requests_wrapper, "rate_limiter", RateLimiter(rate=MAX_RATE, burst=1000))
+
+
+def recon_emulated_tenant(tenant: SyntheticTenant, cache_path: str, **kwargs: Any) -> None:
+    """
+    Collect the resources of an emulated tenant into cache_path
+
+    Args:
+        tenant (SyntheticTenant): tenant to emulate
+        cache_path (str): path to collect resources to
+        kwargs: additional arguments of ResourcesCollector, e.g store
+    """
+    with EmulatorServer(tenant) as server:
+        ResourcesCollector(cache_path=cache_path, token="emulated", transport=TransportOptions(redirect_url=server.url), **kwargs).collect_and_cache()
+
+
+def dump_emulated_tenant(tenant: SyntheticTenant, cache_path: str) -> None:
+    """
+    Collect the resources of an emulated tenant into cache_path, and dump the data of its connections
+    """
+    with EmulatorServer(tenant) as server:
+        transport = TransportOptions(redirect_url=server.url)
+        ResourcesCollector(cache_path=cache_path, token="emulated", transport=transport).collect_and_cache()
+        DataCollector(cache_path=cache_path, token="emulated", transport=transport).collect()
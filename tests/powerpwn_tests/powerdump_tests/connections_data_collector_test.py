@@ -0,0 +1,145 @@
+import json
+import os
+import pathlib
+import re
+from typing import List
+
+import pytest
+
+from powerpwn.powerdump.collect.data_collectors.connections_data_collectors.connectors import gmail, shared_sql
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils.concurrency import KeyedLimiter
+from powerpwn.powerdump.utils.path_utils import collected_data_path
+
+from .conftest import dump_emulated_tenant
+
+
+def test_tabular_dumps_are_streamed_as_json_lines(tmp_path, unthrottled) -> None:
+    cache_path = str(tmp_path)
+    # rows span several pages
+    tenant = SyntheticTenant(environments=1, connections_per_environment=11, records_per_connection=2, rows_per_record=10, page_size=4)
+    dump_emulated_tenant(tenant, cache_path)
+
+    connections_path = os.path.join(collected_data_path(cache_path), "env-0000", "connections")
+    for api_name in ("shared_sql", "shared_documentdb", "shared_azuretables"):
+        dumps = list(pathlib.Path(connections_path, api_name).rglob("*.jsonl"))
+        assert len(dumps) == tenant.records_per_connection
+        for dump in dumps:
+            rows = [json.loads(line) for line in dump.read_text().splitlines()]
+            assert [row["Value"] for row in rows] == list(range(tenant.rows_per_record))
+
+
+def test_files_and_attachments_are_dumped_as_raw_bytes(tmp_path, unthrottled) -> None:
+    cache_path = str(tmp_path)
+    tenant = SyntheticTenant(environments=1, connections_per_environment=11, records_per_connection=3, rows_per_record=4)
+    dump_emulated_tenant(tenant, cache_path)
+
+    connections_path = os.path.join(collected_data_path(cache_path), "env-0000", "connections")
+    files = list(pathlib.Path(connections_path, "shared_azureblob").rglob("*.bin"))
+    attachments = list(pathlib.Path(connections_path, "shared_gmail").rglob("attachment/**/*.bin"))
+    assert len(files) == tenant.records_per_connection and attachments
+    # content is every byte value, which is corrupted by any text decoding
+    for dump in files + attachments:
+        assert dump.read_bytes().startswith(bytes(range(256)) * tenant.rows_per_record)
+
+
+# servers may cap responses below the page size, and return the rest of a page with a nextLink
+@pytest.mark.parametrize("max_rows_per_response", [None, 2])
+def test_sql_tables_are_dumped_in_concurrent_pages(tmp_path, monkeypatch, max_rows_per_response, unthrottled) -> None:
+    # rows span several full pages, and an empty one past the last row
+    monkeypatch.setattr(shared_sql, "SQL_PAGE_SIZE", 3)
+    monkeypatch.setattr(shared_sql, "_server_limiter", KeyedLimiter(2))
+    cache_path = str(tmp_path)
+    tenant = SyntheticTenant(
+        environments=1, connections_per_environment=11, records_per_connection=5, rows_per_record=12, max_rows_per_response=max_rows_per_response
+    )
+    dump_emulated_tenant(tenant, cache_path)
+
+    # tables of both databases are dumped
+    dumps = list(pathlib.Path(collected_data_path(cache_path), "env-0000", "connections", "shared_sql").rglob("*.jsonl"))
+    assert sorted(dump.name.split("-")[0] for dump in dumps) == ["db0", "db0", "db0", "db1", "db1"]
+    for dump in dumps:
+        rows = [json.loads(line) for line in dump.read_text().splitlines()]
+        assert [row["Value"] for row in rows] == list(range(tenant.rows_per_record))
+
+
+def test_emails_and_their_attachments_are_dumped_from_one_fetch(tmp_path, monkeypatch, unthrottled) -> None:
+    fetched_email_ids = []
+    request_and_verify = gmail.request_and_verify
+
+    def _record_fetches(**kwargs):
+        if re.search(r"/Mail/[^/]+-mail-\d+$", kwargs["url"]):
+            fetched_email_ids.append(kwargs["url"].rpartition("/")[2])
+        return request_and_verify(**kwargs)
+
+    monkeypatch.setattr(gmail, "request_and_verify", _record_fetches)
+    cache_path = str(tmp_path)
+    # emails have up to 2 attachments
+    tenant = SyntheticTenant(environments=1, connections_per_environment=11, records_per_connection=6)
+    dump_emulated_tenant(tenant, cache_path)
+
+    gmail_path = pathlib.Path(collected_data_path(cache_path), "env-0000", "connections", "shared_gmail")
+    assert len(list(gmail_path.rglob("email/*"))) == tenant.records_per_connection
+    assert {attachment.name for attachment in gmail_path.rglob("attachment/*")} == {"attachment0.bin.bin", "attachment1.bin.bin"}
+    assert len(fetched_email_ids) == len(set(fetched_email_ids)) == tenant.records_per_connection
+
+
+def _record_email_queries(monkeypatch) -> List[str]:
+    queries: List[str] = []
+    request_and_verify = gmail.request_and_verify
+
+    def _record_queries(**kwargs):
+        if kwargs["url"].endswith("/Mail/LastReceived"):
+            queries.append(kwargs["params"]["subject"])
+        return request_and_verify(**kwargs)
+
+    monkeypatch.setattr(gmail, "request_and_verify", _record_queries)
+    return queries
+
+
+# connections which do not honor date windows are scanned by excluding subjects
+@pytest.mark.parametrize("gmail_date_windows", [True, False])
+def test_email_scans_use_bounded_queries(tmp_path, monkeypatch, gmail_date_windows, unthrottled) -> None:
+    queries = _record_email_queries(monkeypatch)
+    cache_path = str(tmp_path)
+    tenant = SyntheticTenant(environments=1, connections_per_environment=11, records_per_connection=60, gmail_date_windows=gmail_date_windows)
+    dump_emulated_tenant(tenant, cache_path)
+
+    gmail_path = pathlib.Path(collected_data_path(cache_path), "env-0000", "connections", "shared_gmail")
+    assert len(list(gmail_path.rglob("email/*"))) == tenant.records_per_connection
+    if gmail_date_windows:
+        # every email is found by one request, and a window query excludes no more than the emails received in the same second.
+        # A scan ends with an empty window, and windows which matched emails are not checked by excluding subjects.
+        window_queries = [query for query in queries if query == "" or query.startswith(" before:")]
+        assert len(window_queries) == tenant.records_per_connection + 4
+        assert max(query.count(" -") for query in window_queries) <= 2
+        assert len(queries) == len(window_queries)
+
+
+@pytest.mark.parametrize("gmail_date_windows", [True, False])
+def test_email_queries_do_not_grow_with_the_mailbox(tmp_path, monkeypatch, gmail_date_windows, unthrottled) -> None:
+    monkeypatch.setattr(gmail, "MAX_EXCLUDED_SUBJECTS", 20)
+    queries = _record_email_queries(monkeypatch)
+    cache_path = str(tmp_path)
+    # the first connections are SQL, blob and Gmail, all with small records
+    tenant = SyntheticTenant(
+        environments=1, connections_per_environment=3, records_per_connection=200, rows_per_record=1, gmail_date_windows=gmail_date_windows
+    )
+    dump_emulated_tenant(tenant, cache_path)
+
+    gmail_path = pathlib.Path(collected_data_path(cache_path), "env-0000", "connections", "shared_gmail")
+    if gmail_date_windows:
+        assert len(list(gmail_path.rglob("email/*"))) == tenant.records_per_connection
+        assert max(len(query) for query in queries) <= len(" before:0000000000") + len(" -Subject 000") * 2
+    else:
+        # scans stop at the cap rather than exclude every subject of the mailbox
+        assert max(query.count(" -") for query in queries) == gmail.MAX_EXCLUDED_SUBJECTS
+
+
+def test_key_vault_secrets_are_dumped_concurrently(tmp_path, unthrottled) -> None:
+    cache_path = str(tmp_path)
+    tenant = SyntheticTenant(environments=1, connections_per_environment=11, records_per_connection=20)
+    dump_emulated_tenant(tenant, cache_path)
+
+    secrets = list(pathlib.Path(collected_data_path(cache_path), "env-0000", "connections", "shared_keyvault").rglob("secret/*.txt"))
+    assert {secret.read_text() for secret in secrets} == {f"value-of-secret-item{index}" for index in range(tenant.records_per_connection)}
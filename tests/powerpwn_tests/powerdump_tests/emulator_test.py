@@ -0,0 +1,49 @@
+import filecmp
+import os
+
+from powerpwn.powerdump.collect.data_collectors.data_collector import DataCollector
+from powerpwn.powerdump.collect.resources_collectors.resources_collector import ResourcesCollector
+from powerpwn.powerdump.emulator.server import EmulatorServer
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils.path_utils import collected_data_path, entities_path
+from powerpwn.powerdump.utils.requests_wrapper import TransportOptions
+
+
+def _collect(cache_path: str, transport: TransportOptions) -> None:
+    ResourcesCollector(cache_path=cache_path, token="emulated", transport=transport).collect_and_cache()
+    DataCollector(cache_path=cache_path, token="emulated", transport=transport).collect()
+
+
+def _assert_same_tree(left: str, right: str) -> None:
+    comparison = filecmp.dircmp(left, right)
+    assert not comparison.left_only and not comparison.right_only and not comparison.diff_files
+    for sub_dir in comparison.common_dirs:
+        _assert_same_tree(os.path.join(left, sub_dir), os.path.join(right, sub_dir))
+
+
+def test_recon_and_dump_against_emulator_replay(tmp_path, unthrottled) -> None:
+    tenant = SyntheticTenant(environments=1, connections_per_environment=11, records_per_connection=3, canvas_apps_per_environment=2, page_size=4)
+    recorded_path, replayed_path, record_path = str(tmp_path / "recorded"), str(tmp_path / "replayed"), str(tmp_path / "recording")
+
+    with EmulatorServer(tenant) as server:
+        _collect(recorded_path, TransportOptions(record_path=record_path, redirect_url=server.url))
+    _collect(replayed_path, TransportOptions(replay_path=record_path))
+
+    connections = os.listdir(os.path.join(entities_path(recorded_path), "env-0000", "connection"))
+    assert len(connections) == tenant.connections_per_environment
+    assert os.listdir(os.path.join(collected_data_path(recorded_path), "env-0000", "connections"))
+    _assert_same_tree(entities_path(recorded_path), entities_path(replayed_path))
+    _assert_same_tree(collected_data_path(recorded_path), collected_data_path(replayed_path))
+
+
+def test_concurrent_recon_matches_sequential_recon(tmp_path, unthrottled) -> None:
+    tenant = SyntheticTenant(environments=3, connections_per_environment=5, records_per_connection=1, canvas_apps_per_environment=2)
+    sequential_path, concurrent_path = str(tmp_path / "sequential"), str(tmp_path / "concurrent")
+
+    with EmulatorServer(tenant) as server:
+        transport = TransportOptions(redirect_url=server.url)
+        ResourcesCollector(cache_path=sequential_path, token="emulated", transport=transport, workers=1).collect_and_cache()
+        ResourcesCollector(cache_path=concurrent_path, token="emulated", transport=transport, workers=3).collect_and_cache()
+
+    assert sorted(os.listdir(entities_path(concurrent_path))) == tenant.environment_ids()
+    _assert_same_tree(entities_path(sequential_path), entities_path(concurrent_path))
@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils import model_loaders
+from powerpwn.powerdump.utils.entity_store import BODIES_DIR_SUFFIX, EntityStoreType, JsonEntityStore, export_entities, open_entity_store
+from powerpwn.powerdump.utils.path_utils import entities_db_path, entities_path, specs_path
+from powerpwn.powerdump.utils.spec_store import SpecStore
+
+from .conftest import recon_emulated_tenant
+
+
+def test_sqlite_store_matches_json_store(tmp_path, unthrottled) -> None:
+    tenant = SyntheticTenant(environments=2, connections_per_environment=14, canvas_apps_per_environment=4)
+    json_path, sqlite_path, export_path = str(tmp_path / "json"), str(tmp_path / "sqlite"), str(tmp_path / "export")
+
+    recon_emulated_tenant(tenant, json_path)
+    recon_emulated_tenant(tenant, sqlite_path, store=EntityStoreType.sqlite)
+
+    assert os.path.exists(entities_db_path(sqlite_path)) and not os.path.exists(entities_path(sqlite_path))
+    assert sorted(model_loaders.get_environment_ids(sqlite_path)) == tenant.environment_ids()
+    for loader in (model_loaders.load_connections, model_loaders.load_logic_flows, model_loaders.load_canvasapps, model_loaders.load_connectors):
+        assert sorted(entity.json() for entity in loader(sqlite_path)) == sorted(entity.json() for entity in loader(json_path))
+
+    for cache_path in (json_path, sqlite_path):
+        sql_connections = list(model_loaders.load_connections(cache_path, env_id="env-0001", connector_id="shared_sql"))
+        assert sorted(connection.connection_id for connection in sql_connections) == ["env-0001-conn-00000000", "env-0001-conn-00000011"]
+        created_by = list(model_loaders.load_connections(cache_path, created_by="user-00000003"))
+        assert sorted(connection.connection_id for connection in created_by) == ["env-0000-conn-00000003", "env-0001-conn-00000003"]
+        assert model_loaders.get_connection(cache_path, "env-0000", "env-0000-conn-00000003").connection_id == "env-0000-conn-00000003"
+
+    # an export holds the bodies and specs of its entities, and is loaded without the cache it was exported from
+    exported = export_entities(open_entity_store(sqlite_path), JsonEntityStore(entities_path(export_path)), SpecStore(sqlite_path))
+    assert exported == sum(len(files) for dir_path, _, files in os.walk(entities_path(json_path)) if not dir_path.endswith(BODIES_DIR_SUFFIX))
+    assert not os.path.exists(specs_path(export_path))
+    for loader in (model_loaders.load_connections, model_loaders.load_logic_flows, model_loaders.load_canvasapps, model_loaders.load_connectors):
+        # exported records hold the same entities, with their fields in another order
+        exported_entities = sorted(json.dumps(json.loads(entity.json()), sort_keys=True) for entity in loader(export_path))
+        assert exported_entities == sorted(json.dumps(json.loads(entity.json()), sort_keys=True) for entity in loader(json_path))
+
+
+def test_store_type_can_not_change_without_clearing(tmp_path) -> None:
+    JsonEntityStore(entities_path(str(tmp_path))).write("env", ResourceType.connection, [])
+    with pytest.raises(ValueError):
+        open_entity_store(str(tmp_path), EntityStoreType.sqlite)
+    assert isinstance(open_entity_store(str(tmp_path)), JsonEntityStore)
@@ -0,0 +1,31 @@
+import responses
+
+from powerpwn.powerdump.utils.requests_wrapper import init_session
+
+URL = "https://api.powerapps.com/providers/Microsoft.PowerApps/apis/shared_sql"
+
+
+@responses.activate
+def test_not_modified_response_is_served_from_cache(tmp_path) -> None:
+    responses.get(URL, json={"name": "shared_sql"}, headers={"ETag": '"v1"'})
+    responses.get(URL, status=304, match=[responses.matchers.header_matcher({"If-None-Match": '"v1"'})])
+
+    session = init_session("token", http_cache_path=str(tmp_path))
+    first = session.get(URL)
+    second = session.get(URL)
+
+    assert first.json() == second.json() == {"name": "shared_sql"}
+    assert second.status_code == 200
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_responses_without_validators_are_not_cached(tmp_path) -> None:
+    responses.get(URL, json={"name": "shared_sql"})
+
+    session = init_session("token", http_cache_path=str(tmp_path))
+    session.get(URL)
+    session.get(URL)
+
+    assert "If-None-Match" not in responses.calls[1].request.headers
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+import requests
+
+from powerpwn.powerdump.emulator.server import EmulatorServer
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils import ranged_download
+from powerpwn.powerdump.utils.requests_wrapper import TransportOptions, init_session
+
+from .ranged_download_test import FILE_ID, URL
+
+
+def test_streamed_responses_are_recorded_without_buffering(tmp_path, monkeypatch, unthrottled) -> None:
+    tenant = SyntheticTenant(rows_per_record=8)
+    record_path, recorded_path, replayed_path = str(tmp_path / "recording"), str(tmp_path / "recorded.bin"), str(tmp_path / "replayed.bin")
+    with EmulatorServer(tenant) as server:
+        session = init_session(token="emulated", transport=TransportOptions(record_path=record_path, redirect_url=server.url))
+        with monkeypatch.context() as patch:
+            # bodies of streamed responses are only read in chunks
+            patch.setattr(requests.Response, "content", property(lambda _: pytest.fail("A streamed response was loaded into memory.")))
+            ranged_download.download_in_ranges(session, URL, recorded_path, range_size=100, workers=4)
+
+    # bodies are recorded next to their recordings, as far as they were read, the size probe of the download is not read
+    recordings = [json.loads((tmp_path / "recording" / name).read_text()) for name in os.listdir(record_path) if name.endswith(".json")]
+    assert recordings and all("body" not in recording for recording in recordings)
+    body_paths = [os.path.join(record_path, recording["body_file"]) for recording in recordings]
+    assert sum(os.path.getsize(path) for path in body_paths if os.path.exists(path)) == len(tenant.file_content(FILE_ID))
+
+    # every range is replayed from its own recording
+    session = init_session(token="emulated", transport=TransportOptions(replay_path=record_path))
+    ranged_download.download_in_ranges(session, URL, replayed_path, range_size=100, workers=4)
+    with open(replayed_path, "rb") as fp:
+        assert fp.read() == tenant.file_content(FILE_ID)
@@ -0,0 +1,95 @@
+import os
+import threading
+from typing import Any, List
+
+import pytest
+import requests
+
+from powerpwn.powerdump.emulator.server import EmulatorServer
+from powerpwn.powerdump.emulator.synthetic_tenant import EMULATED_APIM_HOST, SyntheticTenant
+from powerpwn.powerdump.utils import ranged_download
+from powerpwn.powerdump.utils.requests_wrapper import TransportOptions, init_session
+
+FILE_ID = "root-file0"
+URL = f"https://{EMULATED_APIM_HOST}/apim/azureblob/connection/v2/datasets/account/files/{FILE_ID}/content"
+
+
+def test_download_in_ranges(tmp_path, unthrottled) -> None:
+    tenant = SyntheticTenant(rows_per_record=8)
+    path = str(tmp_path / "file.bin")
+    with EmulatorServer(tenant) as server:
+        session = init_session(token="emulated", transport=TransportOptions(redirect_url=server.url))
+        ranged_download.download_in_ranges(session, URL, path, range_size=100, workers=4)
+
+    with open(path, "rb") as fp:
+        assert fp.read() == tenant.file_content(FILE_ID)
+    assert os.listdir(tmp_path) == ["file.bin"]
+
+
+def test_interrupted_download_resumes_completed_ranges(tmp_path, monkeypatch, unthrottled) -> None:
+    tenant = SyntheticTenant(rows_per_record=8)
+    path = str(tmp_path / "file.bin")
+    download_range = ranged_download._download_range
+    ranges: List[int] = []
+
+    def _dropping_download_range(session: Any, url: str, part_path: str, start: int, end: int, **kwargs: Any) -> None:
+        if start >= 1000:
+            raise requests.exceptions.ConnectionError("connection dropped")
+        download_range(session, url, part_path, start, end, **kwargs)
+
+    with EmulatorServer(tenant) as server:
+        session = init_session(token="emulated", transport=TransportOptions(redirect_url=server.url))
+        monkeypatch.setattr(ranged_download, "_download_range", _dropping_download_range)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            ranged_download.download_in_ranges(session, URL, path, range_size=100, workers=1)
+        assert not os.path.exists(path) and os.path.exists(path + ranged_download.STATE_FILE_SUFFIX)
+
+        monkeypatch.setattr(ranged_download, "_download_range", lambda *args, **kwargs: ranges.append(args[3]) or download_range(*args, **kwargs))
+        ranged_download.download_in_ranges(session, URL, path, range_size=100, workers=4)
+
+    with open(path, "rb") as fp:
+        assert fp.read() == tenant.file_content(FILE_ID)
+    assert min(ranges) == 1000
+    assert os.listdir(tmp_path) == ["file.bin"]
+
+
+def test_stopped_download_is_resumed(tmp_path, monkeypatch, unthrottled) -> None:
+    tenant = SyntheticTenant(rows_per_record=8)
+    path = str(tmp_path / "file.bin")
+    download_range = ranged_download._download_range
+    stop = threading.Event()
+    ranges: List[int] = []
+
+    def _stopping_download_range(session: Any, url: str, part_path: str, start: int, end: int, **kwargs: Any) -> None:
+        ranges.append(start)
+        if len(ranges) == 3:
+            stop.set()
+        download_range(session, url, part_path, start, end, **kwargs)
+
+    with EmulatorServer(tenant) as server:
+        session = init_session(token="emulated", transport=TransportOptions(redirect_url=server.url))
+        monkeypatch.setattr(ranged_download, "_download_range", _stopping_download_range)
+        assert not ranged_download.download_in_ranges(session, URL, path, range_size=100, workers=2, stop=stop)
+        # ranges which did not start once the download was stopped are not downloaded
+        assert len(ranges) <= 4
+        assert not os.path.exists(path) and os.path.exists(path + ranged_download.STATE_FILE_SUFFIX)
+
+        stopped_ranges = len(ranges)
+        ranges.clear()
+        assert ranged_download.download_in_ranges(session, URL, path, range_size=100, workers=4, stop=threading.Event())
+
+    with open(path, "rb") as fp:
+        assert fp.read() == tenant.file_content(FILE_ID)
+    assert len(ranges) == -(-len(tenant.file_content(FILE_ID)) // 100) - stopped_ranges
+    assert os.listdir(tmp_path) == ["file.bin"]
+
+
+def test_corrupted_download_is_discarded(tmp_path, monkeypatch, unthrottled) -> None:
+    monkeypatch.setattr(ranged_download, "_file_md5", lambda _: "corrupted")
+    path = str(tmp_path / "file.bin")
+    with EmulatorServer(SyntheticTenant()) as server:
+        session = init_session(token="emulated", transport=TransportOptions(redirect_url=server.url))
+        with pytest.raises(ValueError):
+            ranged_download.download_in_ranges(session, URL, path, range_size=100)
+
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,58 @@
+import json
+import os
+from typing import Any, Callable, List
+
+from powerpwn.powerdump.collect.resources_collectors import canvas_apps_collector, connectors_collector
+from powerpwn.powerdump.emulator.synthetic_tenant import CONNECTOR_IDS, SyntheticTenant
+from powerpwn.powerdump.utils.path_utils import entities_path, env_manifest_path
+
+from .conftest import recon_emulated_tenant
+
+
+def _counting(func: Callable[..., Any], calls: List[Any]) -> Callable[..., Any]:
+    def _wrapper(*args: Any, **kwargs: Any) -> Any:
+        calls.append(args)
+        return func(*args, **kwargs)
+
+    return _wrapper
+
+
+def test_incremental_recon_skips_unchanged_and_tombstones_deleted(tmp_path, monkeypatch, unthrottled) -> None:
+    cache_path = str(tmp_path)
+    env_path = os.path.join(entities_path(cache_path), "env-0000")
+    recon_emulated_tenant(
+        SyntheticTenant(environments=1, connections_per_environment=len(CONNECTOR_IDS), canvas_apps_per_environment=4), cache_path, incremental=True
+    )
+    assert len(os.listdir(os.path.join(env_path, "connector"))) == len(CONNECTOR_IDS)
+
+    rbac_calls: List[Any] = []
+    spec_calls: List[Any] = []
+    monkeypatch.setattr(canvas_apps_collector, "list_canvas_app_rbac", _counting(canvas_apps_collector.list_canvas_app_rbac, rbac_calls))
+    monkeypatch.setattr(connectors_collector, "get_connector", _counting(connectors_collector.get_connector, spec_calls))
+    # the last two connections and their connectors were deleted
+    recon_emulated_tenant(
+        SyntheticTenant(environments=1, connections_per_environment=len(CONNECTOR_IDS) - 2, canvas_apps_per_environment=4),
+        cache_path,
+        incremental=True,
+    )
+
+    assert not rbac_calls and not spec_calls
+    assert len(os.listdir(os.path.join(env_path, "canvas_app"))) == 2
+    assert len(os.listdir(os.path.join(env_path, "connection"))) == len(CONNECTOR_IDS) - 2
+    assert sorted(os.listdir(os.path.join(env_path, "connector"))) == sorted(f"{connector_id}.json" for connector_id in CONNECTOR_IDS[:-2])
+
+    with open(env_manifest_path("env-0000", cache_path)) as fp:
+        connections = json.load(fp)["entities"]["connection"]
+    deleted = sorted(connection_id for connection_id, entry in connections.items() if entry["deleted_at"] is not None)
+    assert deleted == [SyntheticTenant.connection_id("env-0000", index) for index in range(len(CONNECTOR_IDS) - 2, len(CONNECTOR_IDS))]
+
+
+def test_full_recon_fetches_everything_again(tmp_path, monkeypatch, unthrottled) -> None:
+    tenant = SyntheticTenant(environments=1, connections_per_environment=3, canvas_apps_per_environment=2)
+    recon_emulated_tenant(tenant, str(tmp_path), incremental=True)
+
+    rbac_calls: List[Any] = []
+    monkeypatch.setattr(canvas_apps_collector, "list_canvas_app_rbac", _counting(canvas_apps_collector.list_canvas_app_rbac, rbac_calls))
+    recon_emulated_tenant(tenant, str(tmp_path), incremental=False)
+
+    assert len(rbac_calls) == tenant.canvas_apps_per_environment
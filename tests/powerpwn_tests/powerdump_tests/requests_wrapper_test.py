@@ -0,0 +1,120 @@
+import asyncio
+import random
+import time
+
+import responses
+from responses import matchers
+
+from powerpwn.powerdump.utils import async_requests_wrapper, requests_wrapper
+from powerpwn.powerdump.utils.rate_limiter import DEFAULT_RATE, RATE_DECREASE_FACTOR, RateLimiter
+from powerpwn.powerdump.utils.requests_wrapper import init_session
+
+URL = "https://example.azure-apim.net/apim/test/connection_id/items"
+
+
+@responses.activate
+def test_async_request_and_verify_matches_sync() -> None:
+    responses.get(URL, json={"value": [1, 2]}, headers={"x-test": "1"})
+
+    sync_success, sync_headers, sync_body = requests_wrapper.request_and_verify(session=init_session("token"), method="get", url=URL)
+
+    async def _run():
+        async with async_requests_wrapper.init_async_session("token", max_concurrency=2) as session:
+            return await async_requests_wrapper.request_and_verify(session=session, method="get", url=URL)
+
+    async_success, async_headers, async_body = asyncio.run(_run())
+
+    assert sync_success == async_success
+    assert sync_headers["x-test"] == async_headers["x-test"]
+    assert sync_body == async_body
+
+
+@responses.activate
+def test_async_consecutive_gets_concurrently() -> None:
+    for i in range(5):
+        responses.get(f"{URL}/{i}", json={"value": [i]})
+
+    async def _run():
+        async with async_requests_wrapper.init_async_session("token", max_concurrency=2) as session:
+            return await async_requests_wrapper.gather_bounded(
+                (async_requests_wrapper.consecutive_gets(session=session, url=f"{URL}/{i}") for i in range(5)), limit=2
+            )
+
+    results = asyncio.run(_run())
+
+    assert results == [(True, [i]) for i in range(5)]
+
+
+@responses.activate
+def test_throttled_request_is_retried(monkeypatch) -> None:
+    monkeypatch.setattr(requests_wrapper, "rate_limiter", RateLimiter())
+    monkeypatch.setattr(random, "uniform", lambda a, b: 0)
+    responses.get(URL, status=429, headers={"Retry-After": "0"})
+    responses.get(URL, json={"value": []})
+
+    success, _, body = requests_wrapper.request_and_verify(session=init_session("token"), method="get", url=URL)
+
+    assert success
+    assert body == {"value": []}
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_throttled_request_retry_budget(monkeypatch) -> None:
+    monkeypatch.setattr(requests_wrapper, "rate_limiter", RateLimiter())
+    monkeypatch.setattr(random, "uniform", lambda a, b: 0)
+    responses.get(URL, status=429, json={"message": "Rate limit is exceeded. Try again in 0 seconds."})
+
+    resp = requests_wrapper.send_request(init_session("token"), max_retries=2, method="get", url=URL)
+
+    assert resp.status_code == 429
+    assert len(responses.calls) == 3
+
+
+def test_concurrent_throttles_halve_the_rate_once(monkeypatch) -> None:
+    monkeypatch.setattr(random, "uniform", lambda a, b: 0)
+    limiter = RateLimiter()
+
+    # requests in flight together are throttled by the same event
+    for attempt in range(8):
+        limiter.on_throttled(URL, attempt=0, seconds_to_wait=0)
+    assert limiter.bucket(URL).rate == DEFAULT_RATE * RATE_DECREASE_FACTOR
+
+    # a throttle after the refill period of the last decrease is a new event
+    time.sleep(1.5 / limiter.bucket(URL).rate)
+    limiter.on_throttled(URL, attempt=0, seconds_to_wait=0)
+    assert limiter.bucket(URL).rate == DEFAULT_RATE * RATE_DECREASE_FACTOR**2
+
+
+@responses.activate
+def test_only_successful_responses_raise_the_rate(monkeypatch) -> None:
+    monkeypatch.setattr(requests_wrapper, "rate_limiter", RateLimiter())
+    responses.get(URL, status=503)
+    responses.get(f"{URL}/ok", json={"value": []})
+
+    requests_wrapper.send_request(init_session("token"), method="get", url=URL)
+    assert requests_wrapper.rate_limiter.bucket(URL).rate == DEFAULT_RATE
+    requests_wrapper.send_request(init_session("token"), method="get", url=f"{URL}/ok")
+    assert requests_wrapper.rate_limiter.bucket(URL).rate > DEFAULT_RATE
+
+
+@responses.activate
+def test_page_iterator_follows_next_link() -> None:
+    responses.get(URL, json={"value": [1, 2], "nextLink": f"{URL}?page=2"}, match=[matchers.query_param_matcher({"top": "2"})])
+    responses.get(URL, json={"value": [3]}, match=[matchers.query_param_matcher({"page": "2"})])
+
+    pages = requests_wrapper.PageIterator(init_session("token"), property_for_pagination="nextLink", url=URL, params={"top": "2"})
+
+    assert list(pages) == [[1, 2], [3]]
+    assert pages.success
+
+
+@responses.activate
+def test_consecutive_gets_follows_continuation_token() -> None:
+    responses.get(URL, json={"value": [1, 2], "continuationToken": "abc"}, match=[matchers.query_param_matcher({})])
+    responses.get(URL, json={"value": [3]}, match=[matchers.query_param_matcher({"continuationToken": "abc"})])
+
+    success, value = requests_wrapper.consecutive_gets(session=init_session("token"), url=URL)
+
+    assert success
+    assert value == [1, 2, 3]
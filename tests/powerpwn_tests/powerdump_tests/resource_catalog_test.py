@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils import model_loaders
+from powerpwn.powerdump.utils.entity_store import EntityRecord, EntityStoreType, JsonEntityStore, SqliteEntityStore, open_entity_store
+from powerpwn.powerdump.utils.resource_catalog import get_resource_catalog
+from powerpwn.powerdump.utils.spec_store import SpecStore
+
+from .conftest import recon_emulated_tenant
+
+
+@pytest.mark.parametrize("store", list(EntityStoreType))
+def test_catalog_reloads_only_changed_entities(tmp_path, store: EntityStoreType, unthrottled) -> None:
+    cache_path = str(tmp_path)
+    recon_emulated_tenant(SyntheticTenant(environments=2, connections_per_environment=11, canvas_apps_per_environment=2), cache_path, store=store)
+
+    connections = {connection.connection_id: connection for connection in model_loaders.load_connections(cache_path)}
+    assert len(connections) == 22
+    assert [flow.connection_id for flow in model_loaders.load_logic_flows(cache_path, env_id="env-0001")] == ["env-0001-conn-00000009"]
+    assert all(connection is connections[connection.connection_id] for connection in model_loaders.load_connections(cache_path))
+
+    changed_id, removed_id = "env-0000-conn-00000001", "env-0000-conn-00000002"
+    raw_connection = json.loads(connections[changed_id].json())
+    raw_connection["display_name"] = "renamed"
+    entity_store = open_entity_store(cache_path)
+    entity_store.write("env-0000", ResourceType.connection, [EntityRecord(entity_id=changed_id, content=json.dumps(raw_connection))])
+    entity_store.remove("env-0000", ResourceType.connection, [removed_id])
+
+    reloaded = {connection.connection_id: connection for connection in model_loaders.load_connections(cache_path)}
+    assert removed_id not in reloaded and len(reloaded) == 21
+    assert reloaded[changed_id].display_name == "renamed"
+    assert model_loaders.get_connection(cache_path, "env-0000", changed_id) is reloaded[changed_id]
+    assert all(connection is connections[connection_id] for connection_id, connection in reloaded.items() if connection_id != changed_id)
+    with pytest.raises(FileNotFoundError):
+        model_loaders.get_connection(cache_path, "env-0000", removed_id)
+
+
+def test_catalog_indexes_by_creator(tmp_path, unthrottled) -> None:
+    cache_path = str(tmp_path)
+    recon_emulated_tenant(SyntheticTenant(environments=1, connections_per_environment=4, canvas_apps_per_environment=4), cache_path)
+
+    catalog = get_resource_catalog(cache_path)
+    assert [app.entity_id for app in catalog.entities(ResourceType.canvas_app, created_by="user-00000002")] == ["env-0000-app-00000002"]
+    assert [connection.entity_id for connection in catalog.entities(ResourceType.connection, env_id="env-0000", created_by="user-00000003")] == [
+        "env-0000-conn-00000003"
+    ]
+    assert not catalog.entities(ResourceType.connection, env_id="env-0001", created_by="user-00000003")
+
+
+@pytest.mark.parametrize("store", list(EntityStoreType))
+def test_catalog_loads_bodies_on_first_access(tmp_path, monkeypatch, store: EntityStoreType, unthrottled) -> None:
+    cache_path = str(tmp_path)
+    recon_emulated_tenant(SyntheticTenant(environments=1, connections_per_environment=11, canvas_apps_per_environment=2), cache_path, store=store)
+
+    body_reads = []
+    for store_class in (JsonEntityStore, SqliteEntityStore):
+        monkeypatch.setattr(store_class, "read_body", _counting(store_class.read_body, body_reads))
+    spec_reads = []
+    monkeypatch.setattr(SpecStore, "get", _counting(SpecStore.get, spec_reads))
+
+    connections = list(model_loaders.load_connections(cache_path))
+    connectors = list(model_loaders.load_connectors(cache_path))
+    assert len(model_loaders.map_connector_id_and_env_id_to_connection_ids(model_loaders.load_connections(cache_path))) == 11
+    assert [connector.api_name for connector in connectors if connector.api_name == "shared_sql"] == ["shared_sql"]
+    assert not body_reads and not spec_reads
+
+    connector = next(connector for connector in connectors if connector.api_name == "shared_sql")
+    assert connector.swagger["paths"] and connector.raw_json["properties"]["swagger"] is connector.swagger
+    assert connections[0].raw_json["name"] == connections[0].connection_id
+    assert len(body_reads) == 2 and len(spec_reads) == 1
+
+    # loaded bodies are kept
+    assert connector.swagger is connector.raw_json["properties"]["swagger"] and connections[0].raw_json
+    assert len(body_reads) == 2
+
+
+def _counting(func, calls):
+    def _wrapper(*args, **kwargs):
+        calls.append(args)
+        return func(*args, **kwargs)
+
+    return _wrapper
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import responses
+
+from powerpwn.powerdump.collect.resources_collectors.connections_collector import ConnectionsCollector
+from powerpwn.powerdump.collect.resources_collectors.connectors_collector import ConnectorsCollector
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils.requests_wrapper import init_session
+
+POWER_APPS_URL = "https://api.powerapps.com/providers/Microsoft.PowerApps"
+ENV_ID = "env-0000"
+
+
+@responses.activate
+def test_connector_specs_are_prefetched_once_per_new_connector() -> None:
+    tenant = SyntheticTenant(environments=1, connections_per_environment=6)
+    responses.get(f"{POWER_APPS_URL}/connections", json={"value": [tenant.connection(ENV_ID, index) for index in range(6)]})
+    for connector_id in ("shared_sql", "shared_azureblob", "shared_gmail", "shared_keyvault", "shared_azuretables", "shared_azurequeues"):
+        responses.get(f"{POWER_APPS_URL}/apis/{connector_id}", json=tenant.connector(connector_id))
+    session = init_session("token")
+
+    connector_id_to_connection_ids: Dict[str, List[str]] = dict()
+    new_connector_ids: List[str] = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        connectors_collector = ConnectorsCollector(connector_id_to_connection_ids, executor=executor)
+
+        def _on_new_connector_id(connector_id: str) -> None:
+            new_connector_ids.append(connector_id)
+            connectors_collector.prefetch(session, ENV_ID, connector_id)
+
+        connections = list(ConnectionsCollector(connector_id_to_connection_ids, on_new_connector_id=_on_new_connector_id).collect(session, ENV_ID))
+        connectors = list(connectors_collector.collect(session, ENV_ID))
+
+    assert len(connections) == 6
+    assert new_connector_ids == list(connector_id_to_connection_ids.keys())
+    assert [connector.api_name for connector in connectors] == new_connector_ids
+    assert len([call for call in responses.calls if "/apis/" in call.request.url]) == len(new_connector_ids)
@@ -0,0 +1,73 @@
+import os
+import pathlib
+
+from powerpwn.powerdump.collect.models.connector_entity import Connector
+from powerpwn.powerdump.collect.resources_collectors.enums.resource_type import ResourceType
+from powerpwn.powerdump.emulator.synthetic_tenant import SyntheticTenant
+from powerpwn.powerdump.utils.model_loaders import get_connector, load_connectors
+from powerpwn.powerdump.utils.path_utils import env_entity_type_path, specs_path
+from powerpwn.powerdump.utils.spec_store import SpecStore, _SpecCache, reference_connector
+
+
+def _connector(environment_id: str, connector_id: str = "shared_sql") -> Connector:
+    raw_connector = SyntheticTenant.connector(connector_id)
+    return Connector(
+        api_name=connector_id,
+        display_name=connector_id,
+        environment_id=environment_id,
+        created_at=raw_connector["properties"]["createdTime"],
+        last_modified_at=raw_connector["properties"]["changedTime"],
+        created_by=raw_connector["properties"]["publisher"],
+        version=raw_connector["properties"]["swagger"]["info"]["version"],
+        swagger=raw_connector["properties"]["swagger"],
+        entity_id=connector_id,
+        entity_type=ResourceType.connector,
+        raw_json=raw_connector,
+    )
+
+
+def _write(cache_path: str, connector: Connector, content: str) -> None:
+    connectors_path = env_entity_type_path(connector.environment_id, ResourceType.connector, cache_path)
+    os.makedirs(connectors_path, exist_ok=True)
+    with open(os.path.join(connectors_path, f"{connector.api_name}.json"), "w") as fp:
+        fp.write(content)
+
+
+def test_identical_specs_are_stored_once_and_resolved_transparently(tmp_path) -> None:
+    cache_path = str(tmp_path)
+    spec_store = SpecStore(cache_path)
+    connectors = [_connector("env-0000"), _connector("env-0001")]
+    for connector in connectors:
+        _write(cache_path, connector, reference_connector(connector, spec_store))
+
+    assert len(os.listdir(specs_path(cache_path))) == 1
+    for connector in connectors:
+        loaded = get_connector(cache_path, connector.environment_id, connector.api_name)
+        assert loaded == connector
+        assert loaded.raw_json["properties"]["swagger"] == connector.swagger
+    assert sorted(connector.environment_id for connector in load_connectors(cache_path)) == ["env-0000", "env-0001"]
+
+
+def test_inline_spec_records_are_still_loaded(tmp_path) -> None:
+    connector = _connector("env-0000")
+    _write(str(tmp_path), connector, connector.json())
+
+    assert get_connector(str(tmp_path), "env-0000", "shared_sql") == connector
+
+
+def test_spec_cache_is_bounded_by_size(tmp_path) -> None:
+    spec_cache = _SpecCache(max_bytes=100)
+    spec_paths = []
+    for index, size in enumerate((40, 40, 40, 200)):
+        spec_path = tmp_path / f"spec{index}.json"
+        spec_path.write_bytes(b"x" * size)
+        spec_paths.append(str(spec_path))
+
+    for spec_path in spec_paths:
+        assert spec_cache.read(spec_path) == pathlib.Path(spec_path).read_bytes()
+        assert spec_cache.total_bytes <= 100
+
+    # least recently read specs are evicted, and specs larger than the cache are not cached at all
+    assert spec_cache.total_bytes == 80
+    os.remove(spec_paths[2])
+    assert spec_cache.read(spec_paths[2]) == b"x" * 40